@@ -0,0 +1,153 @@
+# Copyright (C) 2023-present The Project Contributors
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#    http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+import datetime as dt
+from dataclasses import dataclass, field
+from typing import Any, Dict, List
+
+import numpy as np
+
+from confirms.core.calendar.business_day_convention import BusinessDayConvention
+
+_OUT_OF_RANGE = np.iinfo(np.int32).min
+"""Adjusted day number for days whose roll would leave the lookup tables."""
+
+
+@dataclass
+class BusinessCalendar:
+    """Business day calendar with lookup tables precomputed for every day in a range of years.
+
+    The tables hold the business day flag and the adjusted day for each business day convention,
+    so adjusting any number of dates is a single array lookup per date.
+    """
+
+    name: str = field(default=None)
+    """Calendar name, e.g. currency or financial center code."""
+
+    holidays: List[dt.date] = field(default=None)
+    """Holidays in addition to non-business days of the week."""
+
+    weekmask: str = field(default="1111100")
+    """Business days of the week from Monday to Sunday."""
+
+    start_year: int = field(default=1950)
+    """First year in the lookup tables."""
+
+    end_year: int = field(default=2100)
+    """Last year in the lookup tables, the tables also extend into the next year for rolls past year end."""
+
+    _start_day: int = field(default=None)
+    _is_business: np.ndarray = field(default=None)
+    _adjusted: Dict[BusinessDayConvention, np.ndarray] = field(default=None)
+
+    @staticmethod
+    def combine(*calendars: "BusinessCalendar") -> "BusinessCalendar":
+        """Calendar where a day is a business day only if it is a business day in every calendar."""
+
+        if not calendars:
+            raise RuntimeError("At least one calendar is required.")
+        start_year = max(calendar.start_year for calendar in calendars)
+        end_year = min(calendar.end_year for calendar in calendars)
+        if start_year > end_year:
+            raise RuntimeError("Year ranges of combined calendars do not overlap.")
+
+        # Weekmasks are combined by requiring each day of week to be a business day in every calendar
+        weekmask = "".join(
+            "1" if all(calendar.weekmask[day] == "1" for calendar in calendars) else "0" for day in range(7)
+        )
+        holidays = sorted({holiday for calendar in calendars for holiday in calendar.holidays or []})
+        return BusinessCalendar(
+            name="+".join(calendar.name or "" for calendar in calendars),
+            holidays=holidays,
+            weekmask=weekmask,
+            start_year=start_year,
+            end_year=end_year,
+        )
+
+    def build(self) -> None:
+        """Precompute lookup tables after fields have been set, called automatically on first use."""
+
+        # Skip if already built
+        if self._adjusted is not None:
+            return
+
+        start = np.datetime64(f"{self.start_year:04d}-01-01", "D")
+        end = np.datetime64(f"{self.end_year + 2:04d}-01-01", "D")
+        days = np.arange(start, end)
+        holidays = np.asarray(self.holidays if self.holidays is not None else [], dtype="datetime64[D]")
+        is_business = np.is_busday(days, weekmask=self.weekmask, holidays=holidays)
+        if not is_business.any():
+            raise RuntimeError(f"Calendar {self.name} has no business days.")
+
+        # Nearest business day index at or after and at or before each day, out of range values
+        # mark days beyond the first or last business day in the table
+        index = np.arange(len(days), dtype=np.int64)
+        following = np.minimum.accumulate(np.where(is_business, index, len(days))[::-1])[::-1]
+        preceding = np.maximum.accumulate(np.where(is_business, index, -1))
+
+        # Modified rolls use the opposite direction when the roll changes the month
+        months = days.astype("datetime64[M]")
+        following_valid = following < len(days)
+        preceding_valid = preceding >= 0
+        following_changes_month = ~following_valid | (months[np.minimum(following, len(days) - 1)] != months)
+        preceding_changes_month = ~preceding_valid | (months[np.maximum(preceding, 0)] != months)
+        modified_following = np.where(following_changes_month, preceding, following)
+        modified_preceding = np.where(preceding_changes_month, following, preceding)
+
+        start_day = int(start.astype(np.int64))
+        self._start_day = start_day
+        self._is_business = is_business
+        self._adjusted = {
+            BusinessDayConvention.FOLLOWING: self._to_day_numbers(following, len(days), start_day),
+            BusinessDayConvention.MODIFIED_FOLLOWING: self._to_day_numbers(modified_following, len(days), start_day),
+            BusinessDayConvention.PRECEDING: self._to_day_numbers(preceding, len(days), start_day),
+            BusinessDayConvention.MODIFIED_PRECEDING: self._to_day_numbers(modified_preceding, len(days), start_day),
+        }
+
+    def is_business_day(self, dates: Any) -> np.ndarray:
+        """Business day flag for each date as datetime64, dt.date or ISO 8601 string."""
+
+        self.build()
+        return self._is_business[self._get_index(dates)]
+
+    def adjust(self, dates: Any, convention: BusinessDayConvention) -> np.ndarray:
+        """Adjust dates as datetime64, dt.date or ISO 8601 string using the business day convention,
+        returns datetime64[D] array."""
+
+        dates = np.asarray(dates, dtype="datetime64[D]")
+        if convention == BusinessDayConvention.NONE:
+            return dates.copy()
+
+        self.build()
+        adjusted = self._adjusted[convention][self._get_index(dates)]
+        if np.any(adjusted == _OUT_OF_RANGE):
+            raise RuntimeError(f"Date adjustment requires business days outside the range of calendar {self.name}.")
+        return adjusted.astype("datetime64[D]")
+
+    def _get_index(self, dates: Any) -> np.ndarray:
+        """Position of each date in the lookup tables."""
+
+        index = np.asarray(dates, dtype="datetime64[D]").astype(np.int64) - self._start_day
+        if index.size > 0 and (index.min() < 0 or index.max() >= len(self._is_business)):
+            raise RuntimeError(
+                f"Date is outside the range from {self.start_year} to {self.end_year} of calendar {self.name}."
+            )
+        return index
+
+    @staticmethod
+    def _to_day_numbers(index: np.ndarray, day_count: int, start_day: int) -> np.ndarray:
+        """Convert table positions to int32 days since 1970-01-01, positions outside the table are marked."""
+
+        valid = (index >= 0) & (index < day_count)
+        return np.where(valid, index + start_day, _OUT_OF_RANGE).astype(np.int32)
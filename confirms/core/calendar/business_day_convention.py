@@ -0,0 +1,34 @@
+# Copyright (C) 2023-present The Project Contributors
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#    http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+from enum import Enum
+
+
+class BusinessDayConvention(Enum):
+    """Rule for adjusting a date that falls on a non-business day."""
+
+    NONE = "none"
+    """Date is not adjusted."""
+
+    FOLLOWING = "following"
+    """Next business day."""
+
+    MODIFIED_FOLLOWING = "modified_following"
+    """Next business day unless it is in the next month, in which case previous business day."""
+
+    PRECEDING = "preceding"
+    """Previous business day."""
+
+    MODIFIED_PRECEDING = "modified_preceding"
+    """Previous business day unless it is in the previous month, in which case next business day."""
@@ -0,0 +1,30 @@
+# Copyright (C) 2023-present The Project Contributors
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#    http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+from dataclasses import dataclass, field
+
+from confirms.core.cascade.answer_validator import AnswerValidator
+from confirms.core.extraction.answer_extractor import AnswerExtractor
+
+
+@dataclass(frozen=True)
+class ExtractorAnswerValidator(AnswerValidator):
+    """Accepts answers from which the extractor resolves a canonical value without its fallback LLM."""
+
+    extractor: AnswerExtractor = field(default=None)
+    """Answer extractor, its fallback LLM is not used for validation."""
+
+    def is_valid(self, answer: str) -> bool:
+        """Return True if the patterns of the extractor resolve the answer."""
+        return self.extractor.resolve(answer) is not None
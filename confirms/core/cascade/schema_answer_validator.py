@@ -0,0 +1,35 @@
+# Copyright (C) 2023-present The Project Contributors
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#    http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+from dataclasses import dataclass, field
+
+from confirms.core.cascade.answer_validator import AnswerValidator
+from confirms.core.schema.compiled_schema import CompiledSchema
+
+
+@dataclass(frozen=True)
+class SchemaAnswerValidator(AnswerValidator):
+    """Accepts answers that are accepted by the compiled schema grammar and decode into valid parameters."""
+
+    schema: CompiledSchema = field(default=None)
+    """Compiled schema whose decoder must accept the answer."""
+
+    def is_valid(self, answer: str) -> bool:
+        """Return True if the answer can be decoded by the schema."""
+
+        try:
+            self.schema.decode(answer)
+        except (RuntimeError, ValueError):
+            return False
+        return True
@@ -0,0 +1,129 @@
+# Copyright (C) 2023-present The Project Contributors
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#    http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+from dataclasses import dataclass, field
+from typing import List, Optional
+
+from langchain import PromptTemplate
+
+from confirms.core.context.token_counter import TokenCounter
+
+
+@dataclass
+class ContextPacker:
+    """Chooses the smallest context size that fits prompt and answer, and packs inputs into windows that fit.
+
+    Context sizes are powers of two from min_n_ctx up to the largest context size of the model,
+    because llama.cpp memory and prompt evaluation cost grow with context size. Inputs that are too
+    long for a single window are split at token boundaries with overlap between consecutive windows.
+    """
+
+    token_counter: TokenCounter = field(default=None)
+    """Tokenizer of the model family."""
+
+    answer_tokens: int = field(default=256)
+    """Tokens reserved for the answer."""
+
+    min_n_ctx: int = field(default=512)
+    """Smallest context size in tokens."""
+
+    max_n_ctx: int = field(default=None)
+    """Largest context size in tokens, defaults to the largest context size of the model if not set."""
+
+    overlap_tokens: int = field(default=64)
+    """Tokens repeated at the start of the next window when an input is split."""
+
+    separator: str = field(default="\n\n")
+    """Text between inputs packed into the same window."""
+
+    def get_max_n_ctx(self) -> int:
+        """Largest context size in tokens."""
+        return self.max_n_ctx if self.max_n_ctx is not None else self.token_counter.get_max_n_ctx()
+
+    def get_n_ctx(self, prompt: str) -> int:
+        """Smallest context size that fits the prompt and the answer, raises RuntimeError if none does."""
+        return self.get_n_ctx_for_tokens(self.token_counter.count(prompt))
+
+    def get_n_ctx_for_tokens(self, prompt_tokens: int) -> int:
+        """Smallest context size that fits the number of prompt tokens and the answer, raises RuntimeError
+        if none does."""
+
+        max_n_ctx = self.get_max_n_ctx()
+        required = prompt_tokens + self.answer_tokens
+        if required > max_n_ctx:
+            raise RuntimeError(
+                f"Prompt of {prompt_tokens} tokens and answer of {self.answer_tokens} tokens exceed "
+                f"the largest context size of {max_n_ctx} tokens, use ContextPacker.pack to split the input."
+            )
+
+        n_ctx = self.min_n_ctx
+        while n_ctx < required:
+            n_ctx *= 2
+        return min(n_ctx, max_n_ctx)
+
+    def get_window_tokens(self, *, prompt: Optional[PromptTemplate] = None) -> int:
+        """Number of input tokens that fit in the largest context together with the prompt and the answer."""
+
+        if prompt is not None:
+            prompt_tokens = self.token_counter.count(prompt.format(**{name: "" for name in prompt.input_variables}))
+        else:
+            prompt_tokens = self.token_counter.count("")
+        window_tokens = self.get_max_n_ctx() - self.answer_tokens - prompt_tokens
+        if window_tokens <= self.overlap_tokens:
+            raise RuntimeError(
+                f"Prompt of {prompt_tokens} tokens and answer of {self.answer_tokens} tokens leave no room "
+                f"for the input in the largest context size of {self.get_max_n_ctx()} tokens."
+            )
+        return window_tokens
+
+    def pack(self, inputs: List[str], *, prompt: Optional[PromptTemplate] = None) -> List[str]:
+        """Pack consecutive inputs into as few windows as possible, each fits in the largest context
+        together with the prompt and the answer."""
+
+        window_tokens = self.get_window_tokens(prompt=prompt)
+        windows = []
+        window = None
+        for text in inputs:
+            pieces = self.split(text, window_tokens) if len(self.token_counter.encode(text)) > window_tokens else [text]
+            for piece in pieces:
+                candidate = piece if window is None else window + self.separator + piece
+                # Count the joined text because tokens may merge across the separator
+                if window is None or len(self.token_counter.encode(candidate)) <= window_tokens:
+                    window = candidate
+                else:
+                    windows.append(window)
+                    window = piece
+        if window is not None:
+            windows.append(window)
+        return windows
+
+    def split(self, text: str, window_tokens: int) -> List[str]:
+        """Split text into windows of at most window_tokens tokens, each window after the first
+        starts with the last overlap_tokens tokens of the previous one."""
+
+        tokens = self.token_counter.encode(text)
+        step = max(1, window_tokens - self.overlap_tokens)
+        windows = []
+        start = 0
+        while True:
+            end = min(start + window_tokens, len(tokens))
+            window = self.token_counter.decode(tokens[start:end])
+            # Decoded text may tokenize differently at the edges, shorten until it fits
+            while end > start + 1 and len(self.token_counter.encode(window)) > window_tokens:
+                end -= 1
+                window = self.token_counter.decode(tokens[start:end])
+            windows.append(window)
+            if end >= len(tokens):
+                return windows
+            start = max(start + 1, min(start + step, end - self.overlap_tokens))
@@ -0,0 +1,88 @@
+# Copyright (C) 2023-present The Project Contributors
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#    http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+import ctypes
+import threading
+from dataclasses import dataclass, field
+from typing import List
+
+import llama_cpp
+
+from confirms.core.context.token_counter import TokenCounter
+
+
+@dataclass(frozen=True)
+class LlamaTokenCounter(TokenCounter):
+    """Tokens of llama.cpp models counted with the tokenizer stored in the GGUF file.
+
+    Only the vocabulary is loaded, without weights or context, once per model file in each process.
+    """
+
+    model_path: str = field(default=None)
+    """Path to the GGUF model file."""
+
+    _models = {}
+    _models_lock = threading.Lock()
+
+    def encode(self, text: str) -> List[int]:
+        """Tokens of the text without the BOS token added at the start of a prompt."""
+        return self._tokenize(text, add_bos=False)
+
+    def decode(self, tokens: List[int]) -> str:
+        """Text of the tokens, bytes of characters split between tokens at either end are dropped."""
+
+        model = self._get_model()
+        size = 64
+        buffer = (ctypes.c_char * size)()
+        pieces = []
+        for token in tokens:
+            n = llama_cpp.llama_token_to_piece(model, llama_cpp.llama_token(token), buffer, size)
+            pieces.append(bytes(buffer[:n]))
+        return b"".join(pieces).decode("utf-8", errors="ignore")
+
+    def count(self, text: str) -> int:
+        """Number of tokens when the text is the entire prompt, including the BOS token."""
+        return len(self._tokenize(text, add_bos=True))
+
+    def get_max_n_ctx(self) -> int:
+        """Context size in tokens the model was trained with."""
+        return llama_cpp.llama_n_ctx_train(self._get_model())
+
+    def _tokenize(self, text: str, *, add_bos: bool) -> List[int]:
+        """Tokenize text the same way as llama.cpp tokenizes the prompt."""
+
+        data = text.encode("utf-8")
+        # Each token covers at least one byte, plus BOS
+        n_max = len(data) + 1
+        tokens = (llama_cpp.llama_token * n_max)()
+        n_tokens = llama_cpp.llama_tokenize(self._get_model(), data, len(data), tokens, n_max, add_bos)
+        if n_tokens < 0:
+            raise RuntimeError(f"Failed to tokenize text using the vocabulary of {self.model_path}.")
+        return list(tokens[:n_tokens])
+
+    def _get_model(self) -> llama_cpp.llama_model_p:
+        """Vocabulary-only model for the path, loaded on first use."""
+
+        model = LlamaTokenCounter._models.get(self.model_path)
+        if model is None:
+            with LlamaTokenCounter._models_lock:
+                model = LlamaTokenCounter._models.get(self.model_path)
+                if model is None:
+                    params = llama_cpp.llama_model_default_params()
+                    params.vocab_only = True
+                    model = llama_cpp.llama_load_model_from_file(self.model_path.encode("utf-8"), params)
+                    if not model:
+                        raise RuntimeError(f"Failed to load vocabulary from {self.model_path}.")
+                    LlamaTokenCounter._models[self.model_path] = model
+        return model
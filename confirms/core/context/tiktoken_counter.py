@@ -0,0 +1,54 @@
+# Copyright (C) 2023-present The Project Contributors
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#    http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+from dataclasses import dataclass, field
+from functools import lru_cache
+from typing import Any, List
+
+import tiktoken
+
+from confirms.core.context.token_counter import TokenCounter
+
+_MAX_N_CTX = {"gpt-3.5-turbo": 4096, "gpt-4": 8192}
+"""Context size of each GPT model type, model types not listed use the smallest size."""
+
+
+@dataclass(frozen=True)
+class TiktokenCounter(TokenCounter):
+    """Tokens of GPT models counted with tiktoken, using cl100k_base for unknown model types."""
+
+    model_type: str = field(default=None)
+    """Model type in the format accepted by the vendor API (e.g. `gpt-4`)."""
+
+    def encode(self, text: str) -> List[int]:
+        """Tokens of the text without special tokens added at the start of a prompt."""
+        return _get_encoding(self.model_type).encode(text)
+
+    def decode(self, tokens: List[int]) -> str:
+        """Text of the tokens, bytes of characters split between tokens at either end are dropped."""
+        return _get_encoding(self.model_type).decode_bytes(tokens).decode("utf-8", errors="ignore")
+
+    def get_max_n_ctx(self) -> int:
+        """Largest context size in tokens supported by the model."""
+        return _MAX_N_CTX.get(self.model_type, min(_MAX_N_CTX.values()))
+
+
+@lru_cache(maxsize=None)
+def _get_encoding(model_type: str) -> Any:
+    """Tiktoken encoding for the model type, using cl100k_base for unknown model types."""
+
+    try:
+        return tiktoken.encoding_for_model(model_type)
+    except KeyError:
+        return tiktoken.get_encoding("cl100k_base")
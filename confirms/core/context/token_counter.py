@@ -0,0 +1,36 @@
+# Copyright (C) 2023-present The Project Contributors
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#    http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+from abc import ABC, abstractmethod
+from typing import List
+
+
+class TokenCounter(ABC):
+    """Converts text to and from the tokens of a model family."""
+
+    @abstractmethod
+    def encode(self, text: str) -> List[int]:
+        """Tokens of the text without special tokens added at the start of a prompt."""
+
+    @abstractmethod
+    def decode(self, tokens: List[int]) -> str:
+        """Text of the tokens, bytes of characters split between tokens at either end are dropped."""
+
+    @abstractmethod
+    def get_max_n_ctx(self) -> int:
+        """Largest context size in tokens supported by the model."""
+
+    def count(self, text: str) -> int:
+        """Number of tokens when the text is the entire prompt, including special tokens added by the model."""
+        return len(self.encode(text))
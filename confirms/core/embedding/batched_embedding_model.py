@@ -0,0 +1,165 @@
+# Copyright (C) 2023-present The Project Contributors
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#    http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+import multiprocessing
+import threading
+import time
+from concurrent.futures import Executor, ProcessPoolExecutor, ThreadPoolExecutor
+from dataclasses import dataclass, field
+from typing import List, Optional
+
+import numpy as np
+import pandas as pd
+
+from confirms.core.embedding.embedding_model import EmbeddingModel
+
+_worker_model: Optional[EmbeddingModel] = None
+"""Embedding model of the current worker process."""
+
+
+def _init_worker(embedding_model: EmbeddingModel) -> None:
+    """Keep the model in the worker process, so that it is loaded once per worker rather than once per batch."""
+
+    global _worker_model
+    _worker_model = embedding_model
+
+
+def _embed_batch(texts: List[str]) -> np.ndarray:
+    """Embed a batch using the model of the current worker process."""
+    return _worker_model.embed_documents(texts)
+
+
+@dataclass
+class BatchedEmbeddingModel(EmbeddingModel):
+    """Embeds texts in batches of similar length, optionally spreading batches over a pool of workers.
+
+    Texts are sorted by length before they are split into batches, so that each batch is padded
+    only to the length of its own longest text, and results are returned in input order. Local
+    models that are CPU bound use a process pool, while API models use concurrent requests
+    from a thread pool.
+    """
+
+    embedding_model: EmbeddingModel = field(default=None)
+    """Model that embeds each batch, must be picklable and load its weights lazily when use_processes is set."""
+
+    batch_size: int = field(default=32)
+    """Maximum number of texts in a batch."""
+
+    max_workers: int = field(default=None)
+    """Number of batches embedded concurrently, batches are embedded one by one in the calling thread if not set."""
+
+    use_processes: bool = field(default=False)
+    """Use a process pool for local models, otherwise a thread pool for API models."""
+
+    chunk_count: int = field(default=0)
+    """Number of texts embedded by documents embedding calls."""
+
+    embed_sec: float = field(default=0.0)
+    """Time spent in documents embedding calls."""
+
+    _executor: Executor = field(default=None)
+    _lock: threading.Lock = field(default_factory=threading.Lock)
+
+    def __post_init__(self):
+        """Use the id of the wrapped model because batching does not change the vectors."""
+
+        if self.embedding_model_id is None:
+            self.embedding_model_id = self.embedding_model.embedding_model_id
+
+    @property
+    def chunks_per_sec(self) -> float:
+        """Throughput of documents embedding calls so far."""
+        return self.chunk_count / self.embed_sec if self.embed_sec > 0.0 else 0.0
+
+    def embed_documents(self, texts: List[str]) -> np.ndarray:
+        """Embeddings of the texts as float32 array with one row per text in input order."""
+
+        if not texts:
+            return np.empty((0, 0), dtype=np.float32)
+
+        start = time.perf_counter()
+        order = np.argsort([len(text) for text in texts], kind="stable")
+        batches = [
+            [texts[index] for index in order[batch_start : batch_start + self.batch_size]]
+            for batch_start in range(0, len(texts), self.batch_size)
+        ]
+
+        if self.max_workers is None:
+            batch_vectors = [self.embedding_model.embed_documents(batch) for batch in batches]
+        elif self.use_processes:
+            batch_vectors = list(self._get_executor().map(_embed_batch, batches))
+        else:
+            batch_vectors = list(self._get_executor().map(self.embedding_model.embed_documents, batches))
+
+        sorted_vectors = np.concatenate([np.asarray(vectors, dtype=np.float32) for vectors in batch_vectors])
+        vectors = np.empty_like(sorted_vectors)
+        vectors[order] = sorted_vectors
+
+        with self._lock:
+            self.chunk_count += len(texts)
+            self.embed_sec += time.perf_counter() - start
+        return vectors
+
+    def embed_query(self, text: str) -> np.ndarray:
+        """Embedding of the query as float32 array, computed in the calling thread."""
+        return self.embedding_model.embed_query(text)
+
+    def benchmark(self, texts: List[str], batch_sizes: List[int]) -> pd.DataFrame:
+        """Embed the texts with each batch size and return chunks per second for each, the original
+        batch size is restored afterwards."""
+
+        original_batch_size = self.batch_size
+        rows = []
+        try:
+            for batch_size in batch_sizes:
+                self.batch_size = batch_size
+                start = time.perf_counter()
+                self.embed_documents(texts)
+                elapsed_sec = time.perf_counter() - start
+                rows.append(
+                    {
+                        "batch_size": batch_size,
+                        "chunks": len(texts),
+                        "elapsed_sec": elapsed_sec,
+                        "chunks_per_sec": len(texts) / elapsed_sec if elapsed_sec > 0.0 else float("inf"),
+                    }
+                )
+        finally:
+            self.batch_size = original_batch_size
+        return pd.DataFrame(rows)
+
+    def close(self) -> None:
+        """Shut down the worker pool, a new pool is created on next use."""
+
+        with self._lock:
+            executor, self._executor = self._executor, None
+        if executor is not None:
+            executor.shutdown(wait=True)
+
+    def _get_executor(self) -> Executor:
+        """Worker pool created on first use and reused, so that worker processes load the model only once."""
+
+        with self._lock:
+            if self._executor is None:
+                if self.use_processes:
+                    # Spawn rather than fork because model libraries start threads in the parent process
+                    self._executor = ProcessPoolExecutor(
+                        max_workers=self.max_workers,
+                        mp_context=multiprocessing.get_context("spawn"),
+                        initializer=_init_worker,
+                        initargs=(self.embedding_model,),
+                    )
+                else:
+                    self._executor = ThreadPoolExecutor(max_workers=self.max_workers)
+            return self._executor
@@ -0,0 +1,69 @@
+# Copyright (C) 2023-present The Project Contributors
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#    http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+from dataclasses import dataclass, field
+from typing import List
+
+import numpy as np
+
+from confirms.core.embedding.embedding_cache import EmbeddingCache
+from confirms.core.embedding.embedding_model import EmbeddingModel
+
+
+@dataclass
+class CachedEmbeddingModel(EmbeddingModel):
+    """Embedding model that looks up document embeddings in a persistent cache and only embeds the misses.
+
+    Chunks repeated within a batch or across documents (e.g. standard clauses and definitions)
+    are embedded once. Query embeddings are not cached.
+    """
+
+    embedding_model: EmbeddingModel = field(default=None)
+    """Model that embeds texts not found in the cache."""
+
+    cache: EmbeddingCache = field(default=None)
+    """Cache of document embeddings, uses default location if not set."""
+
+    def __post_init__(self):
+        """Use the id of the wrapped model because cached vectors are the same, and create default cache."""
+
+        if self.embedding_model_id is None:
+            self.embedding_model_id = self.embedding_model.embedding_model_id
+        if self.cache is None:
+            self.cache = EmbeddingCache(embedding_model_id=self.embedding_model_id)
+
+    def embed_documents(self, texts: List[str]) -> np.ndarray:
+        """Embeddings of the texts as float32 array with one row per text, only texts whose
+        normalized content is not cached are embedded."""
+
+        if not texts:
+            return np.empty((0, 0), dtype=np.float32)
+
+        keys = [EmbeddingCache.get_key(self.embedding_model_id, text) for text in texts]
+        rows = self.cache.lookup(keys)
+
+        # Embed each distinct missing text once
+        missing = {}
+        for key, text, row in zip(keys, texts, rows):
+            if row < 0 and key not in missing:
+                missing[key] = text
+        if missing:
+            vectors = self.embedding_model.embed_documents(list(missing.values()))
+            new_rows = dict(zip(missing.keys(), self.cache.put_many(list(missing.keys()), vectors)))
+            rows = np.array([new_rows[key] if row < 0 else row for key, row in zip(keys, rows)], dtype=np.int64)
+        return self.cache.get_vectors(rows)
+
+    def embed_query(self, text: str) -> np.ndarray:
+        """Embedding of the query as float32 array, not cached."""
+        return self.embedding_model.embed_query(text)
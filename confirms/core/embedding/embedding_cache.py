@@ -0,0 +1,196 @@
+# Copyright (C) 2023-present The Project Contributors
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#    http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+import hashlib
+import json
+import os
+import re
+import threading
+import unicodedata
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Dict, List
+
+import numpy as np
+
+_KEY_BYTES = 16
+"""Size of the content hash that identifies a cached vector."""
+
+
+@dataclass
+class EmbeddingCache:
+    """Persistent content-addressed cache of float32 embedding vectors for a single embedding model.
+
+    Vectors are stored in a memory-mapped array file in the order they were added, and the key of each
+    row is appended to a separate key file only after the vector has been written, so an interrupted
+    write never leaves a key without its vector. The cache is shared by threads of one process.
+    """
+
+    embedding_model_id: str = field(default=None)
+    """Embedding model whose vectors are cached, vectors of each model are stored in a separate directory."""
+
+    cache_dir: str = field(default=None)
+    """Root directory of embedding caches, defaults to project_root/cache/embedding if not set."""
+
+    initial_capacity: int = field(default=1024)
+    """Number of rows allocated in a new vector file, capacity is doubled when it is full."""
+
+    hits: int = field(default=0)
+    """Number of lookups that found a cached vector."""
+
+    misses: int = field(default=0)
+    """Number of lookups that did not find a cached vector."""
+
+    _rows: Dict[bytes, int] = field(default=None)
+    _vectors: np.memmap = field(default=None)
+    _dimension: int = field(default=None)
+    _lock: threading.RLock = field(default_factory=threading.RLock)
+
+    @staticmethod
+    def normalize(text: str) -> str:
+        """Text with Unicode compatibility normalization and whitespace runs collapsed to a single space,
+        so that chunks differing only in layout share a vector."""
+        return " ".join(unicodedata.normalize("NFKC", text).split())
+
+    @staticmethod
+    def get_key(embedding_model_id: str, text: str) -> bytes:
+        """Hash of the embedding model id and the normalized text."""
+
+        data = f"{embedding_model_id}\0{EmbeddingCache.normalize(text)}".encode("utf-8")
+        return hashlib.blake2b(data, digest_size=_KEY_BYTES).digest()
+
+    def open(self):
+        """Open or create the cache directory for the embedding model after fields have been set."""
+
+        with self._lock:
+            # Skip if already open
+            if self._rows is not None:
+                return
+
+            if self.cache_dir is None:
+                project_dir = Path(os.path.dirname(__file__)).parent.parent.parent
+                self.cache_dir = os.path.join(project_dir, "cache", "embedding")
+            os.makedirs(self._get_model_dir(), exist_ok=True)
+
+            manifest_path = self._get_path("manifest.json")
+            if os.path.exists(manifest_path):
+                with open(manifest_path, "r", encoding="utf-8") as file:
+                    self._dimension = json.load(file)["dimension"]
+
+            # A key partially written when the process was interrupted is ignored
+            keys_path = self._get_path("keys.bin")
+            key_count = os.path.getsize(keys_path) // _KEY_BYTES if os.path.exists(keys_path) else 0
+            with open(keys_path, "ab") as file:
+                file.truncate(key_count * _KEY_BYTES)
+            with open(keys_path, "rb") as file:
+                data = file.read()
+            self._rows = {data[row * _KEY_BYTES : (row + 1) * _KEY_BYTES]: row for row in range(key_count)}
+            if self._dimension is not None:
+                self._map_vectors()
+
+    def get_size(self) -> int:
+        """Number of cached vectors."""
+
+        self.open()
+        with self._lock:
+            return len(self._rows)
+
+    def lookup(self, keys: List[bytes]) -> np.ndarray:
+        """Row of each key in the vector file, or -1 if the key is not cached."""
+
+        self.open()
+        with self._lock:
+            rows = np.fromiter((self._rows.get(key, -1) for key in keys), dtype=np.int64, count=len(keys))
+            found = int(np.count_nonzero(rows >= 0))
+            self.hits += found
+            self.misses += len(keys) - found
+            return rows
+
+    def get_vectors(self, rows: np.ndarray) -> np.ndarray:
+        """Copy of the vectors in the specified rows."""
+
+        self.open()
+        with self._lock:
+            if self._vectors is None:
+                return np.empty((len(rows), 0), dtype=np.float32)
+            return np.asarray(self._vectors[rows], dtype=np.float32)
+
+    def put_many(self, keys: List[bytes], vectors: np.ndarray) -> np.ndarray:
+        """Add vectors for the keys that are not cached yet, and return the row of each key."""
+
+        self.open()
+        vectors = np.asarray(vectors, dtype=np.float32)
+        with self._lock:
+            if self._dimension is None:
+                self._dimension = vectors.shape[1]
+                with open(self._get_path("manifest.json"), "w", encoding="utf-8") as file:
+                    json.dump({"embedding_model_id": self.embedding_model_id, "dimension": self._dimension}, file)
+                self._map_vectors()
+            elif vectors.shape[1] != self._dimension:
+                raise RuntimeError(
+                    f"Embedding cache for {self.embedding_model_id} has dimension {self._dimension}, "
+                    f"vectors of dimension {vectors.shape[1]} cannot be added."
+                )
+
+            new_keys = {}
+            for key, vector in zip(keys, vectors):
+                if key not in self._rows and key not in new_keys:
+                    new_keys[key] = vector
+            if new_keys:
+                self._append(new_keys)
+            return np.fromiter((self._rows[key] for key in keys), dtype=np.int64, count=len(keys))
+
+    def _append(self, new_keys: Dict[bytes, np.ndarray]) -> None:
+        """Append vectors and then their keys (the caller must hold the lock)."""
+
+        start = len(self._rows)
+        end = start + len(new_keys)
+        if end > len(self._vectors):
+            self._map_vectors(min_capacity=end)
+        self._vectors[start:end] = np.stack(list(new_keys.values()))
+        self._vectors.flush()
+
+        # Keys are appended after vectors are flushed, so every key on disk has its vector
+        with open(self._get_path("keys.bin"), "ab") as file:
+            file.write(b"".join(new_keys.keys()))
+        for row, key in enumerate(new_keys.keys(), start):
+            self._rows[key] = row
+
+    def _map_vectors(self, *, min_capacity: int = 0) -> None:
+        """Memory-map the vector file, growing it to at least the specified number of rows
+        (the caller must hold the lock)."""
+
+        vectors_path = self._get_path("vectors.f32")
+        row_bytes = self._dimension * np.dtype(np.float32).itemsize
+        capacity = os.path.getsize(vectors_path) // row_bytes if os.path.exists(vectors_path) else 0
+        if capacity < max(min_capacity, 1):
+            new_capacity = max(capacity, self.initial_capacity)
+            while new_capacity < min_capacity:
+                new_capacity *= 2
+            self._vectors = None
+            with open(vectors_path, "ab") as file:
+                file.truncate(new_capacity * row_bytes)
+            capacity = new_capacity
+        self._vectors = np.memmap(vectors_path, dtype=np.float32, mode="r+", shape=(capacity, self._dimension))
+
+    def _get_model_dir(self) -> str:
+        """Directory of the embedding model, the readable part of the name is followed by a hash of the id."""
+
+        readable = re.sub(r"[^\w.-]", "_", self.embedding_model_id)
+        id_hash = hashlib.sha256(self.embedding_model_id.encode("utf-8")).hexdigest()[:8]
+        return os.path.join(self.cache_dir, f"{readable}-{id_hash}")
+
+    def _get_path(self, filename: str) -> str:
+        """Path to a file in the directory of the embedding model."""
+        return os.path.join(self._get_model_dir(), filename)
@@ -14,6 +14,9 @@
 
 from abc import ABC, abstractmethod
 from dataclasses import dataclass, field
+from typing import List
+
+import numpy as np
 
 
 @dataclass
@@ -22,3 +25,11 @@ class EmbeddingModel(ABC):
 
     embedding_model_id: str = field(default=None)
     """Identifies both model type and model settings."""
+
+    @abstractmethod
+    def embed_documents(self, texts: List[str]) -> np.ndarray:
+        """Embeddings of the texts as float32 array with one row per text."""
+
+    @abstractmethod
+    def embed_query(self, text: str) -> np.ndarray:
+        """Embedding of the query as float32 array, may differ from document embedding of the same text."""
@@ -0,0 +1,44 @@
+# Copyright (C) 2023-present The Project Contributors
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#    http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+from dataclasses import dataclass, field
+from typing import List
+
+import numpy as np
+from langchain.schema.embeddings import Embeddings
+
+from confirms.core.embedding.embedding_model import EmbeddingModel
+
+
+@dataclass
+class LangChainEmbeddingModel(EmbeddingModel):
+    """Embedding model using LangChain adapter such as HuggingFaceEmbeddings or OpenAIEmbeddings."""
+
+    embeddings: Embeddings = field(default=None)
+    """LangChain embeddings adapter."""
+
+    def __post_init__(self):
+        """Derive embedding_model_id from the adapter class and model name if not set."""
+
+        if self.embedding_model_id is None:
+            model_name = getattr(self.embeddings, "model_name", None) or getattr(self.embeddings, "model", None)
+            self.embedding_model_id = f"{type(self.embeddings).__name__}:{model_name}"
+
+    def embed_documents(self, texts: List[str]) -> np.ndarray:
+        """Embeddings of the texts as float32 array with one row per text."""
+        return np.asarray(self.embeddings.embed_documents(texts), dtype=np.float32)
+
+    def embed_query(self, text: str) -> np.ndarray:
+        """Embedding of the query as float32 array, may differ from document embedding of the same text."""
+        return np.asarray(self.embeddings.embed_query(text), dtype=np.float32)
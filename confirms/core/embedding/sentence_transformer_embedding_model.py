@@ -0,0 +1,62 @@
+# Copyright (C) 2023-present The Project Contributors
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#    http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+from dataclasses import dataclass, field
+from typing import Any, Dict, List
+
+import numpy as np
+from sentence_transformers import SentenceTransformer
+
+from confirms.core.embedding.embedding_model import EmbeddingModel
+
+
+@dataclass
+class SentenceTransformerEmbeddingModel(EmbeddingModel):
+    """Local sentence-transformers model, loaded on first use in each process."""
+
+    model_name: str = field(default=None)
+    """Model name on Hugging Face (e.g. `sentence-transformers/all-MiniLM-L6-v2`) or local path."""
+
+    device: str = field(default="cpu")
+    """Device on which the model runs."""
+
+    _model: SentenceTransformer = field(default=None)
+
+    def __post_init__(self):
+        """Derive embedding_model_id from the model name if not set."""
+
+        if self.embedding_model_id is None:
+            self.embedding_model_id = f"SentenceTransformer:{self.model_name}"
+
+    def __getstate__(self) -> Dict[str, Any]:
+        """Exclude the loaded model when passed to a worker process, which loads its own copy."""
+        return dict(self.__dict__, _model=None)
+
+    def load_model(self):
+        """Load model after fields have been set."""
+
+        # Skip if already loaded
+        if self._model is None:
+            self._model = SentenceTransformer(self.model_name, device=self.device)
+
+    def embed_documents(self, texts: List[str]) -> np.ndarray:
+        """Embeddings of the texts as float32 array with one row per text, computed as a single batch."""
+
+        self.load_model()
+        vectors = self._model.encode(texts, batch_size=max(1, len(texts)), convert_to_numpy=True)
+        return np.asarray(vectors, dtype=np.float32)
+
+    def embed_query(self, text: str) -> np.ndarray:
+        """Embedding of the query as float32 array."""
+        return self.embed_documents([text])[0]
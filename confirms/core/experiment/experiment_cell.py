@@ -0,0 +1,49 @@
+# Copyright (C) 2023-present The Project Contributors
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#    http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+from dataclasses import dataclass, field
+
+
+@dataclass(frozen=True)
+class ExperimentCell:
+    """Single completion in the experiment grid."""
+
+    template_name: str = field(default=None)
+    """Name of the prompt template."""
+
+    template: str = field(default=None)
+    """Prompt template with {context} input variable."""
+
+    context_name: str = field(default=None)
+    """Name of the context."""
+
+    context: str = field(default=None)
+    """Context inserted into the prompt template."""
+
+    model_type: str = field(default=None)
+    """LLM type in the format accepted by the vendor API or GGUF model filename including extension."""
+
+    seed: int = field(default=None)
+    """Model seed, also used as replicate number for models that do not accept a seed."""
+
+    temperature: float = field(default=None)
+    """Model temperature, model default is used if not set."""
+
+    def is_local(self) -> bool:
+        """True if the model is loaded locally rather than called through vendor API."""
+        return self.model_type.endswith(".gguf")
+
+    def get_key(self) -> str:
+        """Key that identifies the cell in experiment output."""
+        return f"{self.template_name}|{self.context_name}|{self.model_type}|{self.seed}|{self.temperature}"
@@ -0,0 +1,57 @@
+# Copyright (C) 2023-present The Project Contributors
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#    http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+import itertools
+from dataclasses import dataclass, field
+from typing import Dict, List
+
+from confirms.core.experiment.experiment_cell import ExperimentCell
+
+
+@dataclass
+class ExperimentGrid:
+    """Cartesian product of templates, contexts, model types, seeds and temperatures."""
+
+    templates: Dict[str, str] = field(default=None)
+    """Prompt templates with {context} input variable by name."""
+
+    contexts: Dict[str, str] = field(default=None)
+    """Contexts by name."""
+
+    model_types: List[str] = field(default=None)
+    """LLM types in the format accepted by the vendor API or GGUF model filenames including extension."""
+
+    seeds: List[int] = field(default=None)
+    """Model seeds, a single cell without seed is created for each combination if not set."""
+
+    temperatures: List[float] = field(default=None)
+    """Model temperatures, a single cell with model default temperature is created if not set."""
+
+    def get_cells(self) -> List[ExperimentCell]:
+        """Cells for every combination of grid values."""
+
+        return [
+            ExperimentCell(
+                template_name=template_name,
+                template=self.templates[template_name],
+                context_name=context_name,
+                context=self.contexts[context_name],
+                model_type=model_type,
+                seed=seed,
+                temperature=temperature,
+            )
+            for template_name, context_name, model_type, seed, temperature in itertools.product(
+                self.templates, self.contexts, self.model_types, self.seeds or [None], self.temperatures or [None]
+            )
+        ]
@@ -0,0 +1,190 @@
+# Copyright (C) 2023-present The Project Contributors
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#    http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+import dataclasses
+import datetime as dt
+import json
+import multiprocessing
+import os
+import socket
+import time
+import uuid
+from concurrent.futures import Executor, Future, ProcessPoolExecutor, ThreadPoolExecutor, as_completed
+from dataclasses import dataclass, field
+from typing import Callable, List, Set
+
+import pandas as pd
+from langchain import PromptTemplate
+
+from confirms.core.experiment.experiment_cell import ExperimentCell
+from confirms.core.experiment.experiment_grid import ExperimentGrid
+from confirms.core.llm.gpt_lang_chain_llm import GptLangChainLlm
+from confirms.core.llm.llama_lang_chain_llm import LlamaLangChainLlm
+from confirms.core.llm.llm import Llm
+from confirms.core.results.result_record import ResultRecord
+from confirms.core.results.results_store import ResultsStore
+from confirms.core.settings import Settings
+
+
+def create_llm(cell: ExperimentCell) -> Llm:
+    """Create LLM for the experiment cell based on model type, local models use the same test as scheduling."""
+
+    if cell.is_local():
+        return LlamaLangChainLlm(model_type=cell.model_type, temperature=cell.temperature, seed=cell.seed)
+    elif cell.model_type.startswith("gpt"):
+        return GptLangChainLlm(model_type=cell.model_type, temperature=cell.temperature)
+    else:
+        raise RuntimeError(f"Unknown model type: {cell.model_type}")
+
+
+def _init_worker(llama_threads: int) -> None:
+    """Set the number of threads used by local models in the worker process."""
+    Settings.instance().llama_threads = llama_threads
+
+
+def _run_cell(
+    cell: ExperimentCell, llm_factory: Callable[[ExperimentCell], Llm], *, experiment: str, run_id: str
+) -> ResultRecord:
+    """Run completion for the cell and return result record, this function runs in a worker thread or process."""
+
+    record = ResultRecord(
+        experiment=experiment,
+        key=cell.get_key(),
+        run_id=run_id,
+        hostname=socket.gethostname(),
+        started_at=dt.datetime.now(dt.timezone.utc),
+        **dataclasses.asdict(cell),
+    )
+
+    start = time.perf_counter()
+    try:
+        llm = llm_factory(cell)
+        record.generation_params = json.dumps(llm.get_generation_params(), sort_keys=True, default=str)
+        prompt = PromptTemplate(template=cell.template, input_variables=["context"])
+        record.answer = llm.completion(cell.context, prompt=prompt)
+    except Exception as e:
+        record.error = f"{type(e).__name__}: {e}"
+    record.latency_sec = time.perf_counter() - start
+    return record
+
+
+@dataclass
+class ExperimentRunner:
+    """Runs experiment grid cells in parallel and streams each finished cell to the results store.
+
+    Cells for API models run on a thread pool and cells for local models run on a process pool.
+    The run is resumable, cells already present in the store without error are skipped.
+    """
+
+    experiment: str = field(default=None)
+    """Name of the experiment under which results are stored."""
+
+    store: ResultsStore = field(default=None)
+    """Results store, uses default location if not set."""
+
+    max_threads: int = field(default=8)
+    """Number of threads for cells that call vendor API."""
+
+    max_processes: int = field(default=None)
+    """Number of processes for cells with local models, determined from CPU count and RAM if not set."""
+
+    threads_per_process: int = field(default=None)
+    """Number of threads used by local models in each process, taken from settings if set there,
+    otherwise CPU count divided by the number of processes."""
+
+    llm_factory: Callable[[ExperimentCell], Llm] = field(default=create_llm)
+    """Creates LLM for the cell, must be a module-level function because it is passed to worker processes."""
+
+    def __post_init__(self):
+        """Create default results store."""
+
+        if self.store is None:
+            self.store = ResultsStore()
+
+    def run(self, grid: ExperimentGrid) -> int:
+        """Run cells that are not yet present in the store and return the number of cells run."""
+
+        completed_keys = self.get_completed_keys()
+        cells = [cell for cell in grid.get_cells() if cell.get_key() not in completed_keys]
+        api_cells = [cell for cell in cells if not cell.is_local()]
+        local_cells = [cell for cell in cells if cell.is_local()]
+        run_params = {"experiment": self.experiment, "run_id": uuid.uuid4().hex}
+
+        executors: List[Executor] = []
+        futures: List[Future] = []
+        try:
+            if api_cells:
+                thread_executor = ThreadPoolExecutor(max_workers=self.max_threads)
+                executors.append(thread_executor)
+                futures += [
+                    thread_executor.submit(_run_cell, cell, self.llm_factory, **run_params) for cell in api_cells
+                ]
+            if local_cells:
+                # Spawn rather than fork because llama.cpp and HTTP clients start threads in the parent process,
+                # llama.cpp threads of all processes share the CPU cores rather than each using half of them
+                max_processes = self.max_processes or self._get_default_max_processes(local_cells)
+                threads_per_process = (
+                    self.threads_per_process
+                    or Settings.instance().llama_threads
+                    or max(1, (os.cpu_count() or 1) // max_processes)
+                )
+                process_executor = ProcessPoolExecutor(
+                    max_workers=max_processes,
+                    mp_context=multiprocessing.get_context("spawn"),
+                    initializer=_init_worker,
+                    initargs=(threads_per_process,),
+                )
+                executors.append(process_executor)
+                futures += [
+                    process_executor.submit(_run_cell, cell, self.llm_factory, **run_params) for cell in local_cells
+                ]
+
+            # Write each finished cell to disk immediately, so that cells finished before a crash are not run again
+            for future in as_completed(futures):
+                self.store.append(future.result())
+                self.store.flush()
+        finally:
+            for executor in executors:
+                executor.shutdown(wait=True, cancel_futures=True)
+            self.store.flush()
+        return len(cells)
+
+    def get_completed_keys(self) -> Set[str]:
+        """Keys of cells present in the store without error."""
+
+        df = self.store.read(self.experiment, columns=["key", "error"], latest=True)
+        return set(df.loc[df["error"].isna(), "key"])
+
+    def read_results(self) -> pd.DataFrame:
+        """Results of the experiment, the most recent record is kept for each cell."""
+        return self.store.read(self.experiment, latest=True)
+
+    @staticmethod
+    def _get_default_max_processes(local_cells: List[ExperimentCell]) -> int:
+        """Number of processes that fit the largest local model into RAM, but not more than CPU count."""
+
+        cpu_count = os.cpu_count() or 1
+        try:
+            ram_bytes = os.sysconf("SC_PAGE_SIZE") * os.sysconf("SC_PHYS_PAGES")
+        except (AttributeError, ValueError, OSError):
+            return 1
+
+        settings = Settings.instance()
+        model_paths = {settings.get_model_path(cell.model_type, check_exists=False) for cell in local_cells}
+        model_bytes = max((os.path.getsize(path) for path in model_paths if os.path.exists(path)), default=0)
+        if model_bytes == 0:
+            return 1
+
+        # Leave a quarter of RAM for the operating system and the parent process
+        return max(1, min(cpu_count, int(0.75 * ram_bytes // model_bytes)))
@@ -0,0 +1,110 @@
+# Copyright (C) 2023-present The Project Contributors
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#    http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+import re
+from abc import ABC, abstractmethod
+from dataclasses import dataclass, field
+from typing import Any, Optional
+
+import numpy as np
+import pandas as pd
+
+from confirms.core.llm.llm import Llm
+
+_WHITESPACE = re.compile(r"\s+")
+"""Runs of whitespace including newlines."""
+
+
+@dataclass
+class AnswerExtractor(ABC):
+    """Maps raw model outputs to canonical values with precompiled regular expressions applied
+    to an entire column at once, and sends only the outputs it cannot resolve to a fallback LLM.
+
+    An output is resolved when all matches in it map to the same canonical value, outputs with
+    no match or with conflicting matches are unresolved.
+    """
+
+    fallback_llm: Llm = field(default=None)
+    """LLM asked to restate unresolved outputs in canonical form, unresolved outputs are NaN if not set."""
+
+    fallback_prompt: Any = field(default=None)
+    """Optional prompt passed to the fallback LLM with the question in the format the LLM accepts."""
+
+    resolved_count: int = field(default=0)
+    """Number of outputs resolved by the patterns."""
+
+    fallback_count: int = field(default=0)
+    """Number of distinct outputs sent to the fallback LLM."""
+
+    unresolved_count: int = field(default=0)
+    """Number of outputs that remained unresolved."""
+
+    def extract(self, output: Optional[str]) -> Optional[str]:
+        """Canonical value for a single output, or None if it cannot be resolved."""
+
+        value = self.extract_series(pd.Series([output], dtype=object)).iloc[0]
+        return None if pd.isna(value) else value
+
+    def resolve(self, output: Optional[str]) -> Optional[str]:
+        """Canonical value for a single output resolved by the patterns alone without the fallback LLM,
+        or None if it cannot be resolved. Does not update the counts."""
+
+        value = self._resolve(pd.Series([output], dtype=object)).iloc[0]
+        return None if pd.isna(value) else value
+
+    def extract_series(self, outputs: pd.Series) -> pd.Series:
+        """Canonical value for each output with the same index, NaN where the output cannot be resolved."""
+
+        index = outputs.index
+        outputs = outputs.reset_index(drop=True)
+        values = self._resolve(outputs)
+        resolved = values.notna()
+        self.resolved_count += int(resolved.sum())
+
+        residue = outputs[~resolved & outputs.notna()]
+        if self.fallback_llm is not None and len(residue) > 0:
+            # Each distinct output is sent once
+            unique_outputs = pd.Series(residue.unique(), dtype=object)
+            self.fallback_count += len(unique_outputs)
+            questions = [self.get_fallback_question(output) for output in unique_outputs]
+            # Questions that failed are left unresolved
+            answers = self.fallback_llm.batch_completion(questions, prompt=self.fallback_prompt)
+            answers = pd.Series([None if isinstance(answer, Exception) else answer for answer in answers], dtype=object)
+            fallback_values = pd.Series(self._resolve(answers).to_numpy(), index=unique_outputs.to_numpy())
+            values[residue.index] = residue.map(fallback_values)
+
+        self.unresolved_count += int(values.isna().sum())
+        return values.set_axis(index)
+
+    @abstractmethod
+    def get_fallback_question(self, output: str) -> str:
+        """Question that asks the fallback LLM to restate the output in a form the patterns resolve."""
+
+    @abstractmethod
+    def _find_all(self, normalized: pd.Series) -> pd.Series:
+        """Canonical value of each match in the normalized outputs, indexed by output index and match number."""
+
+    @staticmethod
+    def normalize(outputs: pd.Series) -> pd.Series:
+        """Outputs in lowercase with runs of whitespace replaced by a single space."""
+        return outputs.astype("string").str.lower().str.replace(_WHITESPACE, " ", regex=True).str.strip()
+
+    def _resolve(self, outputs: pd.Series) -> pd.Series:
+        """Canonical value for each output that maps to exactly one value, NaN otherwise (the index must be unique)."""
+
+        matches = self._find_all(self.normalize(outputs))
+        by_output = matches.groupby(level=0)
+        first = by_output.first()
+        first[by_output.nunique() > 1] = np.nan
+        return first.reindex(outputs.index).astype(object)
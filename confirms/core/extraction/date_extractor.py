@@ -0,0 +1,66 @@
+# Copyright (C) 2023-present The Project Contributors
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#    http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+import re
+from dataclasses import dataclass
+
+import pandas as pd
+
+from confirms.core.extraction.answer_extractor import AnswerExtractor
+
+_MONTHS = ["jan", "feb", "mar", "apr", "may", "jun", "jul", "aug", "sep", "oct", "nov", "dec"]
+"""Month name prefixes in lowercase."""
+
+_MONTH = rf"(?:{'|'.join(_MONTHS)})[a-z]*\.?"
+_DAY = r"\d{1,2}(?:st|nd|rd|th)?"
+
+_PATTERN = re.compile(
+    r"\b(?:"
+    r"(?P<iso_year>\d{4})-(?P<iso_month>\d{2})-(?P<iso_day>\d{2})"
+    rf"|(?P<dmy_day>{_DAY})(?: of)?[ -](?P<dmy_month>{_MONTH})[-, ]+(?P<dmy_year>\d{{4}})"
+    rf"|(?P<mdy_month>{_MONTH})[ -](?P<mdy_day>{_DAY}),? (?P<mdy_year>\d{{4}})"
+    r")\b"
+)
+"""Pattern for ISO dates and dates with month name in day-month-year or month-day-year order."""
+
+
+@dataclass
+class DateExtractor(AnswerExtractor):
+    """Extracts a date in ISO format (e.g. `2013-07-09`) from outputs such as `9 July 2013`,
+    `18-July-2033` or `On or about December 27, 2023`."""
+
+    def get_fallback_question(self, output: str) -> str:
+        """Question that asks the fallback LLM to restate the output as an ISO date."""
+        return f"Reply only with the date in YYYY-MM-DD format that is stated in the following text: {output}"
+
+    def _find_all(self, normalized: pd.Series) -> pd.Series:
+        """ISO date of each match, matches that are not valid dates are skipped."""
+
+        matches = normalized.str.extractall(_PATTERN)
+        if matches.empty:
+            return pd.Series(index=matches.index, dtype=object)
+
+        month_numbers = {prefix: number for number, prefix in enumerate(_MONTHS, start=1)}
+        year = matches["iso_year"].fillna(matches["dmy_year"]).fillna(matches["mdy_year"])
+        month = (
+            matches["iso_month"]
+            .astype(float)
+            .fillna(matches["dmy_month"].str[:3].map(month_numbers))
+            .fillna(matches["mdy_month"].str[:3].map(month_numbers))
+        )
+        day = matches["iso_day"].fillna(matches["dmy_day"]).fillna(matches["mdy_day"]).str.extract(r"(\d+)")[0]
+        dates = pd.to_datetime(
+            pd.DataFrame({"year": year.astype(float), "month": month, "day": day.astype(float)}), errors="coerce"
+        )
+        return dates.dropna().dt.strftime("%Y-%m-%d")
@@ -0,0 +1,71 @@
+# Copyright (C) 2023-present The Project Contributors
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#    http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+import re
+from dataclasses import dataclass
+from typing import Dict, List
+
+import pandas as pd
+
+from confirms.core.extraction.answer_extractor import AnswerExtractor
+from confirms.core.schedule.payment_frequency import PaymentFrequency
+
+_PHRASES: Dict[PaymentFrequency, List[str]] = {
+    PaymentFrequency.ONE_MONTH: [r"monthly", r"every month", r"once a month", r"1m"],
+    PaymentFrequency.THREE_MONTHS: [
+        r"quarterly",
+        r"every (?:three|3) months",
+        r"four times (?:a|per) year",
+        r"each quarter",
+        r"3m",
+    ],
+    PaymentFrequency.SIX_MONTHS: [
+        r"semi-?annual(?:ly)?",
+        r"half-?yearly",
+        r"bi-?annual(?:ly)?",
+        r"every (?:six|6) months",
+        r"twice (?:a|per) year",
+        r"6m",
+    ],
+    PaymentFrequency.TWELVE_MONTHS: [r"annual(?:ly)?", r"yearly", r"once (?:a|per) year", r"per annum", r"12m"],
+}
+"""Phrases for each payment frequency in lowercase."""
+
+_PATTERN = re.compile(
+    "|".join(rf"(?P<{frequency.name}>\b(?:{'|'.join(phrases)})\b)" for frequency, phrases in _PHRASES.items())
+)
+"""Pattern with a named group for each payment frequency, a semi-annual phrase is matched as a whole
+so the annual phrase it contains is not matched separately."""
+
+_VALUES = {frequency.name: frequency.value for frequency in PaymentFrequency}
+"""Payment frequency value for each group name."""
+
+
+@dataclass
+class FrequencyExtractor(AnswerExtractor):
+    """Extracts payment frequency as PaymentFrequency value (e.g. `3M`) from outputs such as
+    `Sure, based on the information provided in the context, the payment frequency is quarterly.`"""
+
+    def get_fallback_question(self, output: str) -> str:
+        """Question that asks the fallback LLM to restate the output as one frequency word."""
+        return (
+            "Reply with one word, which is one of monthly, quarterly, semi-annual or annual, "
+            f"that is the payment frequency stated in the following text: {output}"
+        )
+
+    def _find_all(self, normalized: pd.Series) -> pd.Series:
+        """Payment frequency value of each match."""
+
+        matches = normalized.str.extractall(_PATTERN)
+        return matches.notna().idxmax(axis=1).map(_VALUES)
@@ -0,0 +1,25 @@
+# Copyright (C) 2023-present The Project Contributors
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#    http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+from abc import ABC, abstractmethod
+
+from confirms.core.instrumentation.llm_span import LlmSpan
+
+
+class LlmInstrumentation(ABC):
+    """Receives a span for each instrumented Llm call after the call is complete."""
+
+    @abstractmethod
+    def on_span(self, span: LlmSpan) -> None:
+        """Process completed span, may be called concurrently from multiple threads."""
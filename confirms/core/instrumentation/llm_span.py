@@ -0,0 +1,149 @@
+# Copyright (C) 2023-present The Project Contributors
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#    http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+import time
+from contextlib import contextmanager
+from contextvars import ContextVar
+from dataclasses import dataclass, field
+from typing import ClassVar, Iterator, Optional
+
+_current_span: ContextVar[Optional["LlmSpan"]] = ContextVar("current_llm_span", default=None)
+
+
+@dataclass
+class LlmSpan:
+    """Timing and token counts for a single LLM call, fields that do not apply to the backend remain None.
+
+    The span is active in the thread or async task that runs the call, so backends and callback
+    handlers record their measurements into `LlmSpan.current()` without passing it explicitly.
+    """
+
+    METRICS: ClassVar[tuple] = (
+        "duration_sec",
+        "load_sec",
+        "queue_sec",
+        "network_sec",
+        "prompt_tokens",
+        "completion_tokens",
+        "prompt_eval_tokens",
+        "prompt_eval_sec",
+        "generation_sec",
+        "time_to_first_token_sec",
+        "tokens_per_sec",
+    )
+    """Numeric measurements that can be aggregated across spans."""
+
+    llm_class: str = field(default=None)
+    """Name of the Llm class that made the call."""
+
+    model_type: str = field(default=None)
+    """LLM type in the format accepted by the vendor API or GGUF model filename including extension."""
+
+    operation: str = field(default=None)
+    """Name of the Llm method that was called, e.g. `completion`."""
+
+    started_at: float = field(default=None)
+    """Start time as seconds since epoch."""
+
+    duration_sec: float = field(default=None)
+    """Total wall clock time of the call."""
+
+    load_sec: float = field(default=None)
+    """Time spent loading the model if it was loaded during this call."""
+
+    queue_sec: float = field(default=None)
+    """Time spent waiting for the client-side rate limiter."""
+
+    network_sec: float = field(default=None)
+    """Time spent in vendor API requests including retries."""
+
+    prompt_tokens: int = field(default=None)
+    """Number of tokens in the prompt."""
+
+    completion_tokens: int = field(default=None)
+    """Number of generated tokens."""
+
+    prompt_eval_tokens: int = field(default=None)
+    """Number of prompt tokens evaluated by a local model, excludes the prefix restored from cache."""
+
+    prompt_eval_sec: float = field(default=None)
+    """Time a local model spent evaluating the prompt."""
+
+    generation_sec: float = field(default=None)
+    """Time a local model spent evaluating generated tokens."""
+
+    time_to_first_token_sec: float = field(default=None)
+    """Time from the start of the call to the first streamed token."""
+
+    cache_hit: bool = field(default=None)
+    """True if the answer was returned from the completion cache, None if the cache was not used."""
+
+    error: str = field(default=None)
+    """Exception type and message if the call failed."""
+
+    _start_counter: float = field(default=None, repr=False)
+
+    def __post_init__(self):
+        """Record start time."""
+
+        if self.started_at is None:
+            self.started_at = time.time()
+        self._start_counter = time.perf_counter()
+
+    @staticmethod
+    def current() -> Optional["LlmSpan"]:
+        """Span of the call running in the current thread or async task, or None if the call is not instrumented."""
+        return _current_span.get()
+
+    @staticmethod
+    def record(metric: str, value: float) -> None:
+        """Add value to the metric of the current span if there is one."""
+
+        span = _current_span.get()
+        if span is not None:
+            span.add(metric, value)
+
+    @contextmanager
+    def activate(self) -> Iterator["LlmSpan"]:
+        """Make this span current inside the block."""
+
+        token = _current_span.set(self)
+        try:
+            yield self
+        finally:
+            _current_span.reset(token)
+
+    def get_elapsed_sec(self) -> float:
+        """Seconds since the start of the span."""
+        return time.perf_counter() - self._start_counter
+
+    def add(self, metric: str, value: float) -> None:
+        """Add value to the metric, treating unset metric as zero."""
+        setattr(self, metric, (getattr(self, metric) or 0) + value)
+
+    @property
+    def tokens_per_sec(self) -> Optional[float]:
+        """Generation speed based on local model timings if available, otherwise on network time."""
+
+        elapsed_sec = self.generation_sec if self.generation_sec is not None else self.network_sec
+        if not self.completion_tokens or not elapsed_sec:
+            return None
+        return self.completion_tokens / elapsed_sec
+
+    def to_dict(self) -> dict:
+        """Public fields and derived metrics as a dictionary."""
+
+        result = {name: value for name, value in vars(self).items() if not name.startswith("_")}
+        result["tokens_per_sec"] = self.tokens_per_sec
+        return result
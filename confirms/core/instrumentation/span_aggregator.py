@@ -0,0 +1,91 @@
+# Copyright (C) 2023-present The Project Contributors
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#    http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+import threading
+from collections import deque
+from dataclasses import dataclass, field
+from typing import Deque, Dict, List, Optional, Sequence
+
+import numpy as np
+import pandas as pd
+
+from confirms.core.instrumentation.llm_instrumentation import LlmInstrumentation
+from confirms.core.instrumentation.llm_span import LlmSpan
+
+
+@dataclass
+class SpanAggregator(LlmInstrumentation):
+    """In-process aggregator of recent spans for each model type with percentile statistics."""
+
+    max_spans: int = field(default=10000)
+    """Number of most recent spans kept for each model type."""
+
+    _spans: Dict[str, Deque[LlmSpan]] = field(default_factory=dict)
+    _lock: threading.Lock = field(default_factory=threading.Lock)
+
+    def on_span(self, span: LlmSpan) -> None:
+        """Add span to the statistics."""
+
+        with self._lock:
+            spans = self._spans.get(span.model_type)
+            if spans is None:
+                spans = deque(maxlen=self.max_spans)
+                self._spans[span.model_type] = spans
+            spans.append(span)
+
+    def get_spans(self, model_type: Optional[str] = None) -> List[LlmSpan]:
+        """Spans for the model type, or for all model types if not specified."""
+
+        with self._lock:
+            if model_type is not None:
+                return list(self._spans.get(model_type, []))
+            return [span for spans in self._spans.values() for span in spans]
+
+    def get_percentiles(
+        self, metric: str, *, model_type: Optional[str] = None, percentiles: Sequence[float] = (50, 90, 99)
+    ) -> Dict[float, float]:
+        """Percentiles of the metric from LlmSpan.METRICS over spans where it is set, empty if there are none."""
+
+        values = [value for span in self.get_spans(model_type) if (value := getattr(span, metric)) is not None]
+        if not values:
+            return {}
+        return dict(zip(percentiles, np.percentile(values, percentiles).tolist()))
+
+    def get_cache_hit_rate(self, model_type: Optional[str] = None) -> Optional[float]:
+        """Fraction of calls that used the completion cache and found the answer there."""
+
+        cache_hits = [span.cache_hit for span in self.get_spans(model_type) if span.cache_hit is not None]
+        return sum(cache_hits) / len(cache_hits) if cache_hits else None
+
+    def get_summary(self, percentiles: Sequence[float] = (50, 90, 99)) -> pd.DataFrame:
+        """Count, mean and percentiles for each model type and metric that has values."""
+
+        rows = []
+        with self._lock:
+            model_spans = {model_type: list(spans) for model_type, spans in self._spans.items()}
+        for model_type, spans in sorted(model_spans.items()):
+            for metric in LlmSpan.METRICS:
+                values = np.array([value for span in spans if (value := getattr(span, metric)) is not None], float)
+                if values.size == 0:
+                    continue
+                row = {"model_type": model_type, "metric": metric, "count": values.size, "mean": values.mean()}
+                row.update(zip([f"p{p:g}" for p in percentiles], np.percentile(values, percentiles)))
+                rows.append(row)
+        return pd.DataFrame(rows)
+
+    def clear(self) -> None:
+        """Remove all spans."""
+
+        with self._lock:
+            self._spans.clear()
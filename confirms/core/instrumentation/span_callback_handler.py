@@ -0,0 +1,61 @@
+# Copyright (C) 2023-present The Project Contributors
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#    http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+from typing import Any, Callable, Dict, List, Optional
+
+from langchain.callbacks.base import BaseCallbackHandler
+from langchain.schema import LLMResult
+
+from confirms.core.instrumentation.llm_span import LlmSpan
+
+
+class SpanCallbackHandler(BaseCallbackHandler):
+    """LangChain callback handler that records token counts and time to first token into the current span.
+
+    Does nothing when there is no current span, so it can remain attached to uninstrumented models.
+    """
+
+    # Run in the calling thread or task so that the current span is visible
+    run_inline = True
+
+    def __init__(self, count_tokens: Optional[Callable[[str], int]] = None):
+        """Create handler, count_tokens must be specified for models that do not report token usage,
+        in which case prompt tokens are counted with it and each streamed token is counted as one."""
+        self.count_tokens = count_tokens
+
+    def on_llm_start(self, serialized: Dict[str, Any], prompts: List[str], **kwargs: Any) -> None:
+        """Count prompt tokens if the model does not report them."""
+
+        span = LlmSpan.current()
+        if span is not None and self.count_tokens is not None:
+            span.add("prompt_tokens", sum(self.count_tokens(prompt) for prompt in prompts))
+
+    def on_llm_new_token(self, token: str, **kwargs: Any) -> None:
+        """Record time to first token and count streamed tokens."""
+
+        span = LlmSpan.current()
+        if span is not None:
+            if span.time_to_first_token_sec is None:
+                span.time_to_first_token_sec = span.get_elapsed_sec()
+            if self.count_tokens is not None:
+                span.add("completion_tokens", 1)
+
+    def on_llm_end(self, response: LLMResult, **kwargs: Any) -> None:
+        """Record token usage reported by the model."""
+
+        span = LlmSpan.current()
+        token_usage = (response.llm_output or {}).get("token_usage")
+        if span is not None and token_usage:
+            span.add("prompt_tokens", token_usage.get("prompt_tokens", 0))
+            span.add("completion_tokens", token_usage.get("completion_tokens", 0))
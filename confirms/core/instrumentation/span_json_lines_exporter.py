@@ -0,0 +1,40 @@
+# Copyright (C) 2023-present The Project Contributors
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#    http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+import json
+import os
+import threading
+from dataclasses import dataclass, field
+
+from confirms.core.instrumentation.llm_instrumentation import LlmInstrumentation
+from confirms.core.instrumentation.llm_span import LlmSpan
+
+
+@dataclass
+class SpanJsonLinesExporter(LlmInstrumentation):
+    """Appends each span to a JSON lines file."""
+
+    output_path: str = field(default=None)
+    """Path to the JSON lines file, created on first span."""
+
+    _lock: threading.Lock = field(default_factory=threading.Lock)
+
+    def on_span(self, span: LlmSpan) -> None:
+        """Append span as one line."""
+
+        line = json.dumps(span.to_dict()) + "\n"
+        with self._lock:
+            os.makedirs(os.path.dirname(os.path.abspath(self.output_path)), exist_ok=True)
+            with open(self.output_path, "a", encoding="utf-8") as file:
+                file.write(line)
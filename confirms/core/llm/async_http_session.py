@@ -0,0 +1,85 @@
+# Copyright (C) 2023-present The Project Contributors
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#    http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+import asyncio
+import threading
+from contextlib import asynccontextmanager
+from dataclasses import dataclass, field
+from typing import AsyncIterator
+
+import aiohttp
+import openai
+
+
+@dataclass
+class AsyncHttpSession:
+    """Pooled aiohttp session shared by async OpenAI API calls.
+
+    Connections are kept alive and reused across requests, and a semaphore limits the number
+    of concurrent requests. Session and semaphore are created for each event loop on first use.
+    """
+
+    max_concurrency: int = field(default=8)
+    """Maximum number of concurrent requests and pooled connections."""
+
+    keepalive_timeout: float = field(default=30.0)
+    """Seconds an idle connection is kept open for reuse."""
+
+    _session: aiohttp.ClientSession = field(default=None)
+    _semaphore: asyncio.Semaphore = field(default=None)
+    _loop: asyncio.AbstractEventLoop = field(default=None)
+
+    _instance = None
+    _instance_lock = threading.Lock()
+
+    @staticmethod
+    def instance() -> "AsyncHttpSession":
+        """Process-wide session instance, modify its fields before the first request to change the defaults."""
+
+        if AsyncHttpSession._instance is None:
+            with AsyncHttpSession._instance_lock:
+                if AsyncHttpSession._instance is None:
+                    AsyncHttpSession._instance = AsyncHttpSession()
+        return AsyncHttpSession._instance
+
+    @asynccontextmanager
+    async def request_slot(self) -> AsyncIterator[aiohttp.ClientSession]:
+        """Wait for a free request slot, then use the pooled session for OpenAI calls made inside the block."""
+
+        self._ensure_session()
+        async with self._semaphore:
+            token = openai.aiosession.set(self._session)
+            try:
+                yield self._session
+            finally:
+                openai.aiosession.reset(token)
+
+    async def close(self) -> None:
+        """Close pooled connections, a new session is created on next use."""
+
+        if self._session is not None and not self._session.closed:
+            await self._session.close()
+        self._session = None
+        self._semaphore = None
+        self._loop = None
+
+    def _ensure_session(self) -> None:
+        """Create session and semaphore if they do not exist or belong to a different event loop."""
+
+        loop = asyncio.get_running_loop()
+        if self._session is None or self._session.closed or self._loop is not loop:
+            connector = aiohttp.TCPConnector(limit=self.max_concurrency, keepalive_timeout=self.keepalive_timeout)
+            self._session = aiohttp.ClientSession(connector=connector)
+            self._semaphore = asyncio.Semaphore(self.max_concurrency)
+            self._loop = loop
@@ -0,0 +1,120 @@
+# Copyright (C) 2023-present The Project Contributors
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#    http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+import dataclasses
+import threading
+import time
+from dataclasses import dataclass, field
+from typing import Any, Dict, List, Optional
+
+from confirms.core.cascade.answer_validator import AnswerValidator
+from confirms.core.llm.cascade_stage_metrics import CascadeStageMetrics
+from confirms.core.llm.llm import Llm
+from confirms.core.vote.vote_params import VoteParams
+
+
+@dataclass
+class CascadeLlm(Llm):
+    """Router that asks the stages in order, from the cheapest to the most capable model, and returns
+    the first answer that passes every validator.
+
+    The same question and prompt are passed to each stage, so the prompt must be in a format every stage
+    accepts (e.g. LangChain prompt template for LangChain models, or None with the prompt in the question).
+    """
+
+    stages: List[Llm] = field(default=None)
+    """Models in the order they are tried, e.g. local 7B with grammar, 13B, gpt-3.5-turbo and gpt-4."""
+
+    validators: List[AnswerValidator] = field(default=None)
+    """Answer must pass every validator to be accepted, the first answer is accepted if not set."""
+
+    vote_params: VoteParams = field(default=None)
+    """If set, each stage samples answers in voting mode and its answer is accepted only if the vote
+    is decided, the first sampled answer that voted for the leading value is returned."""
+
+    _metrics: List[CascadeStageMetrics] = field(default=None)
+    _lock: threading.Lock = field(default_factory=threading.Lock)
+
+    def __post_init__(self):
+        """Set model type from the stages and create metrics for each stage."""
+
+        if not self.stages:
+            raise RuntimeError("Cascade LLM requires at least one stage.")
+        if self.model_type is None:
+            self.model_type = "cascade:" + ",".join(stage.model_type for stage in self.stages)
+        self._metrics = [CascadeStageMetrics(model_type=stage.model_type) for stage in self.stages]
+
+    def load_model(self):
+        """Load the model of every stage, so that escalation does not include load time."""
+
+        for stage in self.stages:
+            stage.load_model()
+
+    def get_metrics(self) -> List[CascadeStageMetrics]:
+        """Copy of the current statistics for each stage in cascade order."""
+
+        with self._lock:
+            return [dataclasses.replace(metrics) for metrics in self._metrics]
+
+    def get_escalation_rates(self) -> Dict[str, float]:
+        """Fraction of questions that escalated past each stage by model type."""
+        return {metrics.model_type: metrics.escalation_rate for metrics in self.get_metrics()}
+
+    def is_deterministic(self) -> bool:
+        """Return True if the same input is guaranteed to produce the same answer for the current settings."""
+        return self.vote_params is None and all(stage.is_deterministic() for stage in self.stages)
+
+    def get_generation_params(self) -> Dict[str, Any]:
+        """Return every setting that affects the answer."""
+        return dict(
+            super().get_generation_params(),
+            stages=[stage.get_generation_params() for stage in self.stages],
+            validators=[repr(validator) for validator in self.validators or []],
+            vote_params=repr(self.vote_params) if self.vote_params is not None else None,
+        )
+
+    def _completion(self, question: str, *, prompt: Optional[Any] = None) -> str:
+        """Answer of the first stage that passes validation, raises RuntimeError if no stage does."""
+
+        rejections = []
+        for stage, metrics in zip(self.stages, self._metrics):
+            start = time.perf_counter()
+            outcome = "failed"
+            try:
+                answer = self._stage_completion(stage, question, prompt=prompt)
+                if answer is not None and all(validator.is_valid(answer) for validator in self.validators or []):
+                    outcome = "accepted"
+                    return answer
+                outcome = "rejected"
+                rejections.append(f"{stage.model_type} answered {answer!r}")
+            except Exception as e:
+                rejections.append(f"{stage.model_type} raised {type(e).__name__}: {e}")
+            finally:
+                with self._lock:
+                    metrics.calls += 1
+                    metrics.total_latency_sec += time.perf_counter() - start
+                    setattr(metrics, outcome, getattr(metrics, outcome) + 1)
+
+        raise RuntimeError(f"No stage of the cascade produced a valid answer: {'; '.join(rejections)}")
+
+    def _stage_completion(self, stage: Llm, question: str, *, prompt: Optional[Any] = None) -> Optional[str]:
+        """Answer of the stage, or None if voting did not decide the answer."""
+
+        if self.vote_params is None:
+            return stage.completion(question, prompt=prompt)
+
+        result = stage.vote_completion(question, prompt=prompt, params=self.vote_params)
+        if not result.is_decided:
+            return None
+        return next(answer for answer in result.answers if self.vote_params.normalize(answer) == result.answer)
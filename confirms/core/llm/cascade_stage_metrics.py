@@ -0,0 +1,43 @@
+# Copyright (C) 2023-present The Project Contributors
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#    http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+from dataclasses import dataclass, field
+
+
+@dataclass
+class CascadeStageMetrics:
+    """Statistics for one stage of the cascade router."""
+
+    model_type: str = field(default=None)
+    """Model type of the stage."""
+
+    calls: int = field(default=0)
+    """Number of questions that reached this stage."""
+
+    accepted: int = field(default=0)
+    """Number of answers that passed validation and were returned."""
+
+    rejected: int = field(default=0)
+    """Number of answers that failed validation, after which the question escalated to the next stage."""
+
+    failed: int = field(default=0)
+    """Number of calls that raised an exception, after which the question escalated to the next stage."""
+
+    total_latency_sec: float = field(default=0.0)
+    """Total time spent in this stage."""
+
+    @property
+    def escalation_rate(self) -> float:
+        """Fraction of questions that reached this stage and escalated to the next stage."""
+        return (self.rejected + self.failed) / self.calls if self.calls > 0 else 0.0
@@ -0,0 +1,162 @@
+# Copyright (C) 2023-present The Project Contributors
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#    http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+import hashlib
+import json
+import os
+import sqlite3
+import threading
+import time
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Any, Dict, Optional
+
+
+@dataclass
+class CompletionCache:
+    """Persistent content-addressed cache of completions stored in SQLite.
+
+    The key is a stable hash of every generation-affecting parameter, see `get_key`.
+    """
+
+    cache_path: str = field(default=None)
+    """Path to the SQLite cache file, defaults to project_root/cache/completion_cache.sqlite if not set."""
+
+    max_entries: int = field(default=None)
+    """Maximum number of cached completions, least recently used entries are evicted first (no limit if not set)."""
+
+    max_age_days: float = field(default=None)
+    """Entries created earlier than this number of days ago are evicted (no limit if not set)."""
+
+    hits: int = field(default=0)
+    """Number of lookups that returned a cached completion."""
+
+    misses: int = field(default=0)
+    """Number of lookups that did not find a cached completion."""
+
+    evictions: int = field(default=0)
+    """Number of entries removed due to size or age limits."""
+
+    _connection: sqlite3.Connection = field(default=None)
+    _lock: threading.RLock = field(default_factory=threading.RLock)
+
+    @staticmethod
+    def get_key(params: Dict[str, Any]) -> str:
+        """Stable hash of the parameters that affect generation (the order of dictionary keys does not matter)."""
+
+        serialized = json.dumps(params, sort_keys=True, ensure_ascii=False, default=str)
+        return hashlib.sha256(serialized.encode("utf-8")).hexdigest()
+
+    def open(self):
+        """Open or create the cache file after fields have been set."""
+
+        with self._lock:
+            # Skip if already open
+            if self._connection is None:
+
+                if self.cache_path is None:
+                    cache_dir = os.path.join(Path(os.path.dirname(__file__)).parent.parent.parent, "cache")
+                    self.cache_path = os.path.join(cache_dir, "completion_cache.sqlite")
+
+                os.makedirs(os.path.dirname(os.path.abspath(self.cache_path)), exist_ok=True)
+                self._connection = sqlite3.connect(self.cache_path, check_same_thread=False)
+                self._connection.execute("PRAGMA journal_mode=WAL")
+                self._connection.execute(
+                    "CREATE TABLE IF NOT EXISTS completion ("
+                    "key TEXT PRIMARY KEY, answer TEXT NOT NULL, created REAL NOT NULL, accessed REAL NOT NULL)"
+                )
+                self._connection.execute("CREATE INDEX IF NOT EXISTS completion_accessed ON completion (accessed)")
+                self._connection.commit()
+
+    def close(self):
+        """Close the cache file, it will be reopened on next access."""
+
+        with self._lock:
+            if self._connection is not None:
+                self._connection.close()
+                self._connection = None
+
+    def get(self, key: str) -> Optional[str]:
+        """Return cached completion for the key or None if not found or expired."""
+
+        self.open()
+        with self._lock:
+            now = time.time()
+            row = self._connection.execute("SELECT answer, created FROM completion WHERE key = ?", (key,)).fetchone()
+            if row is not None and self._is_expired(row[1], now):
+                self._connection.execute("DELETE FROM completion WHERE key = ?", (key,))
+                self._connection.commit()
+                self.evictions += 1
+                row = None
+
+            if row is None:
+                self.misses += 1
+                return None
+
+            self._connection.execute("UPDATE completion SET accessed = ? WHERE key = ?", (now, key))
+            self._connection.commit()
+            self.hits += 1
+            return row[0]
+
+    def put(self, key: str, answer: str) -> None:
+        """Add or replace cached completion for the key, then evict entries exceeding size or age limits."""
+
+        self.open()
+        with self._lock:
+            now = time.time()
+            self._connection.execute(
+                "INSERT OR REPLACE INTO completion (key, answer, created, accessed) VALUES (?, ?, ?, ?)",
+                (key, answer, now, now),
+            )
+            self._evict(now)
+            self._connection.commit()
+
+    def clear(self) -> None:
+        """Remove all entries and reset the counters."""
+
+        self.open()
+        with self._lock:
+            self._connection.execute("DELETE FROM completion")
+            self._connection.commit()
+            self.hits = 0
+            self.misses = 0
+            self.evictions = 0
+
+    def size(self) -> int:
+        """Number of entries currently in the cache."""
+
+        self.open()
+        with self._lock:
+            return self._connection.execute("SELECT COUNT(*) FROM completion").fetchone()[0]
+
+    def _is_expired(self, created: float, now: float) -> bool:
+        """Check if an entry created at the specified time has exceeded max_age_days."""
+        return self.max_age_days is not None and now - created > self.max_age_days * 86400.0
+
+    def _evict(self, now: float) -> None:
+        """Remove entries exceeding age limit, then least recently used entries exceeding size limit."""
+
+        if self.max_age_days is not None:
+            cursor = self._connection.execute(
+                "DELETE FROM completion WHERE created < ?", (now - self.max_age_days * 86400.0,)
+            )
+            self.evictions += cursor.rowcount
+
+        if self.max_entries is not None:
+            cursor = self._connection.execute(
+                "DELETE FROM completion WHERE key IN "
+                "(SELECT key FROM completion ORDER BY accessed DESC LIMIT -1 OFFSET ?)",
+                (self.max_entries,),
+            )
+            self.evictions += cursor.rowcount
@@ -12,13 +12,17 @@
 # See the License for the specific language governing permissions and
 # limitations under the License.
 
+import time
 from dataclasses import dataclass, field
-from typing import List, Optional
+from typing import Any, Dict, Iterator, List, Optional, Union
 
 from langchain import LLMChain, OpenAI, PromptTemplate, ConversationChain
 
+from confirms.core.instrumentation.llm_span import LlmSpan
+from confirms.core.instrumentation.span_callback_handler import SpanCallbackHandler
+from confirms.core.llm.async_http_session import AsyncHttpSession
 from confirms.core.llm.llm import Llm
-from confirms.core.settings import Settings
+from confirms.core.llm.rate_limiter import RateLimiter
 
 
 @dataclass
@@ -28,16 +32,20 @@ class GptLangChainLlm(Llm):
     temperature: float = field(default=None)
     """Model temperature (note that for GPT models zero value does not mean reproducible answers)."""
 
+    max_concurrency: int = field(default=None)
+    """Maximum number of concurrent API requests, defaults to 8 if not set."""
+
     _llm: OpenAI = field(default=None)
 
     def load_model(self):
         """Load model after fields have been set."""
 
-        # Load settings
-        Settings.load()
-
         # Skip if already loaded
         if self._llm is None:
+            start = time.perf_counter()
+
+            # Settings are loaded once per process unless specified for this model
+            settings = self.get_settings()
 
             # Confirm that model type is valid
             gpt_model_types = ["gpt-3.5-turbo", "gpt-4"]
@@ -49,20 +57,85 @@ class GptLangChainLlm(Llm):
 
             self._llm = OpenAI(
                 model_name=self.model_type,
-                temperature=self.temperature if self.temperature is not None else 0.0
+                temperature=self.temperature if self.temperature is not None else 0.0,
+                openai_api_key=settings.openai_api_key,
+                callbacks=[SpanCallbackHandler()],
             )
+            LlmSpan.record("load_sec", time.perf_counter() - start)
+
+    def is_deterministic(self) -> bool:
+        """Return True if the same input is guaranteed to produce the same answer for the current settings."""
+        return self.temperature is None or self.temperature == 0.0
+
+    def get_generation_params(self) -> Dict[str, Any]:
+        """Return every setting that affects the answer."""
+        return dict(super().get_generation_params(), temperature=self.temperature)
+
+    def batch_completion(self, questions: List[str], *, prompt: Optional[Any] = None) -> List[Union[str, Exception]]:
+        """Completion for each question using concurrent API requests, with results returned in input order.
 
-    def completion(self, question: str, *, prompt: Optional[PromptTemplate] = None) -> str:
+        A question that fails produces the exception it raised in place of the answer
+        instead of failing the entire batch.
+        """
+
+        # Load model before starting the threads
+        self.load_model()
+
+        max_workers = self.max_concurrency if self.max_concurrency is not None else 8
+        return self._map_completion(questions, prompt=prompt, max_workers=max_workers)
+
+    def _completion(self, question: str, *, prompt: Optional[PromptTemplate] = None) -> str:
         """Simple completion with optional prompt."""
 
         # Load model (multiple calls do not need to reload)
         self.load_model()
 
+        rate_limiter = RateLimiter.instance()
+        texts = self._get_prompt_texts(question, prompt=prompt)
         if prompt is None:
-            answer = self._llm(question)
+            answer = rate_limiter.call(self.model_type, texts, lambda: self._llm(question))
         else:
             llm_chain = LLMChain(prompt=prompt, llm=self._llm)
-            answer = llm_chain.run(question)
+            answer = rate_limiter.call(self.model_type, texts, lambda: llm_chain.run(question))
+        return answer
+
+    def _stream_completion(self, question: str, *, prompt: Optional[PromptTemplate] = None) -> Iterator[str]:
+        """Answer tokens as they arrive from the API, closing the stream stops reading the response."""
+
+        # Load model (multiple calls do not need to reload)
+        self.load_model()
+
+        prompt_text = self._format_prompt(question, prompt)
+
+        def _open_stream():
+            # The request is sent when the first token is read, so it is read inside the rate limiter call
+            stream = self._llm.stream(prompt_text)
+            return next(stream, None), stream
+
+        first_token, tokens = RateLimiter.instance().call(
+            self.model_type, self._get_prompt_texts(question, prompt=prompt), _open_stream
+        )
+        try:
+            if first_token is not None:
+                yield first_token
+            yield from tokens
+        finally:
+            tokens.close()
+
+    async def _acompletion(self, question: str, *, prompt: Optional[PromptTemplate] = None) -> str:
+        """Async completion with optional prompt using the pooled HTTP session."""
+
+        # Load model (multiple calls do not need to reload)
+        self.load_model()
+
+        rate_limiter = RateLimiter.instance()
+        texts = self._get_prompt_texts(question, prompt=prompt)
+        async with AsyncHttpSession.instance().request_slot():
+            if prompt is None:
+                answer = await rate_limiter.acall(self.model_type, texts, lambda: self._llm.apredict(question))
+            else:
+                llm_chain = LLMChain(prompt=prompt, llm=self._llm)
+                answer = await rate_limiter.acall(self.model_type, texts, lambda: llm_chain.arun(question))
         return answer
 
     def run_conversation_chain(self, prompts: List[str]):
@@ -77,3 +150,8 @@ class GptLangChainLlm(Llm):
             results.append(conversation.run(prompt))
 
         return results
+
+    @staticmethod
+    def _get_prompt_texts(question: str, *, prompt: Optional[PromptTemplate] = None) -> List[str]:
+        """Texts sent to the model, used to estimate the number of tokens."""
+        return [question] if prompt is None else [question, prompt.template]
@@ -13,13 +13,18 @@
 # limitations under the License.
 
 import json
+import time
 from dataclasses import dataclass, field
-from typing import Dict, Optional
+from typing import Any, Dict, Iterator, List, Optional, Union
 
 import openai
 
+from confirms.core.instrumentation.llm_span import LlmSpan
+from confirms.core.llm.async_http_session import AsyncHttpSession
 from confirms.core.llm.llm import Llm
-from confirms.core.settings import Settings
+from confirms.core.llm.rate_limiter import RateLimiter
+from confirms.core.schedule.interest_schedule_params import InterestScheduleParams
+from confirms.core.schema.schema_compiler import SchemaCompiler
 
 
 @dataclass
@@ -29,6 +34,9 @@ class GptNativeLlm(Llm):
     temperature: float = field(default=None)
     """Model temperature (note that for GPT models zero value does not mean reproducible answers)."""
 
+    max_concurrency: int = field(default=None)
+    """Maximum number of concurrent API requests, defaults to 8 if not set."""
+
     _llm: bool = field(default=None)
 
     def load_model(self):
@@ -36,6 +44,7 @@ class GptNativeLlm(Llm):
 
         # Skip if already loaded
         if self._llm is None:
+            start = time.perf_counter()
             gpt_model_types = ["gpt-3.5-turbo", "gpt-4"]
             if self.model_type not in gpt_model_types:
                 raise RuntimeError(
@@ -45,29 +54,180 @@ class GptNativeLlm(Llm):
 
             # Native OpenAI API calls are stateless. This means no object is needed at this time.
             self._llm = True
+            LlmSpan.record("load_sec", time.perf_counter() - start)
+
+    def is_deterministic(self) -> bool:
+        """Return True if the same input is guaranteed to produce the same answer for the current settings."""
+        return self.temperature == 0.0
+
+    def get_generation_params(self) -> Dict[str, Any]:
+        """Return every setting that affects the answer."""
+        return dict(super().get_generation_params(), temperature=self.temperature)
+
+    def batch_completion(self, questions: List[str], *, prompt: Optional[Any] = None) -> List[Union[str, Exception]]:
+        """Completion for each question using concurrent API requests, with results returned in input order.
+
+        A question that fails produces the exception it raised in place of the answer
+        instead of failing the entire batch.
+        """
+
+        # Load model before starting the threads
+        self.load_model()
+
+        max_workers = self.max_concurrency if self.max_concurrency is not None else 8
+        return self._map_completion(questions, prompt=prompt, max_workers=max_workers)
 
-    def completion(self, question: str, *, prompt: Optional[str] = None) -> str:
+    def _completion(self, question: str, *, prompt: Optional[str] = None) -> str:
         """Simple completion with optional prompt."""
 
-        # Load settings
-        Settings.load()
+        # Settings are loaded once per process unless specified for this model
+        settings = self.get_settings()
 
-        if prompt is not None:
-            messages = [{"role": "system", "content": prompt}]
-        else:
-            messages = []
+        messages = self._get_messages(question, prompt=prompt)
+        rate_limiter = RateLimiter.instance()
+        texts = [message["content"] for message in messages]
+        response = rate_limiter.call(
+            self.model_type,
+            texts,
+            lambda: openai.ChatCompletion.create(
+                model=self.model_type,
+                messages=messages,
+                api_key=settings.openai_api_key,
+                **self._get_model_params(),
+            ),
+        )
+        self._record_usage(response)
+        answer = response['choices'][0]['message']['content']
+        return answer
 
-        messages = messages + [{"role": "user", "content": question}]
+    def _stream_completion(self, question: str, *, prompt: Optional[str] = None) -> Iterator[str]:
+        """Answer tokens as they arrive from the API, closing the stream stops reading the response."""
+
+        # Settings are loaded once per process unless specified for this model
+        settings = self.get_settings()
+
+        messages = self._get_messages(question, prompt=prompt)
+        rate_limiter = RateLimiter.instance()
+        texts = [message["content"] for message in messages]
+        response = rate_limiter.call(
+            self.model_type,
+            texts,
+            lambda: openai.ChatCompletion.create(
+                model=self.model_type,
+                messages=messages,
+                api_key=settings.openai_api_key,
+                stream=True,
+                **self._get_model_params(),
+            ),
+        )
+        try:
+            for chunk in response:
+                content = chunk["choices"][0]["delta"].get("content")
+                if content:
+                    # Streamed responses do not report usage, each chunk contains one token
+                    LlmSpan.record("completion_tokens", 1)
+                    yield content
+        finally:
+            response.close()
 
-        response = openai.ChatCompletion.create(model=self.model_type, messages=messages)
+    async def _acompletion(self, question: str, *, prompt: Optional[str] = None) -> str:
+        """Async completion with optional prompt using the pooled HTTP session."""
+
+        # Settings are loaded once per process unless specified for this model
+        settings = self.get_settings()
+
+        messages = self._get_messages(question, prompt=prompt)
+        rate_limiter = RateLimiter.instance()
+        texts = [message["content"] for message in messages]
+        async with AsyncHttpSession.instance().request_slot():
+            response = await rate_limiter.acall(
+                self.model_type,
+                texts,
+                lambda: openai.ChatCompletion.acreate(
+                    model=self.model_type,
+                    messages=messages,
+                    api_key=settings.openai_api_key,
+                    **self._get_model_params(),
+                ),
+            )
+        self._record_usage(response)
         answer = response['choices'][0]['message']['content']
         return answer
 
     def function_completion(self, question: str, *, prompt: Optional[str] = None) -> Dict[str, str]:
         """Completion with functions."""
 
-        # Load settings
-        Settings.load()
+        with self._trace("function_completion"):
+            return self._function_completion(question, prompt=prompt)
+
+    async def afunction_completion(self, question: str, *, prompt: Optional[str] = None) -> Dict[str, str]:
+        """Async completion with functions using the pooled HTTP session."""
+
+        with self._trace("afunction_completion"):
+            return await self._afunction_completion(question, prompt=prompt)
+
+    def _function_completion(self, question: str, *, prompt: Optional[str] = None) -> Dict[str, str]:
+        """Completion with functions without instrumentation."""
+
+        # Settings are loaded once per process unless specified for this model
+        settings = self.get_settings()
+
+        messages = self._get_messages(question, prompt=prompt)
+        functions = self._get_functions()
+        rate_limiter = RateLimiter.instance()
+        texts = [message["content"] for message in messages] + [json.dumps(functions)]
+        response = rate_limiter.call(
+            self.model_type,
+            texts,
+            lambda: openai.ChatCompletion.create(
+                model=self.model_type,
+                messages=messages,
+                functions=functions,
+                function_call="auto",  # auto is default, but we'll be explicit
+                api_key=settings.openai_api_key,
+                **self._get_model_params(),
+            ),
+        )
+        self._record_usage(response)
+        return self._get_function_result(response)
+
+    async def _afunction_completion(self, question: str, *, prompt: Optional[str] = None) -> Dict[str, str]:
+        """Async completion with functions without instrumentation."""
+
+        # Settings are loaded once per process unless specified for this model
+        settings = self.get_settings()
+
+        messages = self._get_messages(question, prompt=prompt)
+        functions = self._get_functions()
+        rate_limiter = RateLimiter.instance()
+        texts = [message["content"] for message in messages] + [json.dumps(functions)]
+        async with AsyncHttpSession.instance().request_slot():
+            response = await rate_limiter.acall(
+                self.model_type,
+                texts,
+                lambda: openai.ChatCompletion.acreate(
+                    model=self.model_type,
+                    messages=messages,
+                    functions=functions,
+                    function_call="auto",  # auto is default, but we'll be explicit
+                    api_key=settings.openai_api_key,
+                    **self._get_model_params(),
+                ),
+            )
+        self._record_usage(response)
+        return self._get_function_result(response)
+
+    def _get_model_params(self) -> Dict[str, Any]:
+        """Optional model parameters, API defaults are used for parameters that are not set."""
+
+        params = {}
+        if self.temperature is not None:
+            params["temperature"] = self.temperature
+        return params
+
+    @staticmethod
+    def _get_messages(question: str, *, prompt: Optional[str] = None) -> List[Dict[str, str]]:
+        """Messages for the chat completion API with optional system prompt."""
 
         if prompt is not None:
             messages = [{"role": "system", "content": prompt}]
@@ -75,30 +235,19 @@ class GptNativeLlm(Llm):
             messages = []
 
         messages = messages + [{"role": "user", "content": question}]
+        return messages
+
+    @staticmethod
+    def _get_functions() -> List[Dict[str, Any]]:
+        """Function schemas for completion with functions."""
+
+        interest_schedule = SchemaCompiler.instance().compile(
+            InterestScheduleParams,
+            function_name="get_interest_schedule",
+            description="Calculates and returns interest schedule from function parameters",
+        )
         functions = [
-            {
-                "name": "get_interest_schedule",
-                "description": "Calculates and returns interest schedule from function parameters",
-                "parameters": {
-                    "type": "object",
-                    "properties": {
-                        "first_unadjusted_payment_date": {
-                            "type": "string",
-                            "description": "First unadjusted payment date using ISO 8601 date format yyyy-mm-dd.",
-                        },
-                        "last_unadjusted_payment_date": {
-                            "type": "string",
-                            "description": "Last unadjusted payment date using ISO 8601 date format yyyy-mm-dd.",
-                        },
-                        "payment_frequency": {
-                            "type": "string",
-                            "description": "Payment frequency expressed as the number of months followed by capital M",
-                            "enum": ["1M", "3M", "6M", "12M"],
-                        },
-                    },
-                    "required": ["first_unadjusted_payment_date", "last_unadjusted_payment_date", "payment_frequency"],
-                },
-            },
+            interest_schedule.function_schema,
             {
                 "name": "get_payment_frequency",
                 "description": "Extract payment frequency from description",
@@ -114,12 +263,21 @@ class GptNativeLlm(Llm):
                 },
             },
         ]
-        response = openai.ChatCompletion.create(
-            model=self.model_type,
-            messages=messages,
-            functions=functions,
-            function_call="auto",  # auto is default, but we'll be explicit
-        )
+        return functions
+
+    @staticmethod
+    def _record_usage(response: Dict[str, Any]) -> None:
+        """Record token usage reported by the API into the current span."""
+
+        usage = response.get("usage")
+        if usage:
+            LlmSpan.record("prompt_tokens", usage.get("prompt_tokens", 0))
+            LlmSpan.record("completion_tokens", usage.get("completion_tokens", 0))
+
+    @staticmethod
+    def _get_function_result(response: Dict[str, Any]) -> Dict[str, str]:
+        """Function arguments from the response with function name added under `function` key."""
+
         response_message = response["choices"][0]["message"]
 
         if response_message.get("function_call"):
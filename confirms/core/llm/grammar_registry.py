@@ -0,0 +1,144 @@
+# Copyright (C) 2023-present The Project Contributors
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#    http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+import os
+import threading
+from contextlib import contextmanager
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Dict, Iterator, List
+
+from llama_cpp import LlamaGrammar, llama_grammar
+
+
+@dataclass
+class GrammarRegistry:
+    """Process-wide registry of GBNF grammars that are read, parsed and validated once per grammar file.
+
+    Compiled grammars hold sampling state, so each concurrent call gets its own compiled grammar
+    from a free list that is refilled when the call ends. New compiled grammars are created
+    from the cached parse result without parsing the file again.
+    """
+
+    grammar_dir: str = field(default=None)
+    """Directory of grammar files, defaults to project_root/grammar if not set."""
+
+    _parsed: Dict[str, llama_grammar.parse_state] = field(default_factory=dict)
+    _free: Dict[str, List[LlamaGrammar]] = field(default_factory=dict)
+    _lock: threading.RLock = field(default_factory=threading.RLock)
+
+    _instance = None
+    _instance_lock = threading.Lock()
+
+    def __post_init__(self):
+        """Set default grammar directory."""
+
+        if self.grammar_dir is None:
+            self.grammar_dir = os.path.join(Path(os.path.dirname(__file__)).parent.parent.parent, "grammar")
+
+    @staticmethod
+    def instance() -> "GrammarRegistry":
+        """Process-wide registry for the default grammar directory."""
+
+        if GrammarRegistry._instance is None:
+            with GrammarRegistry._instance_lock:
+                if GrammarRegistry._instance is None:
+                    GrammarRegistry._instance = GrammarRegistry()
+        return GrammarRegistry._instance
+
+    @contextmanager
+    def acquire(self, grammar_file: str) -> Iterator[LlamaGrammar]:
+        """Compiled grammar for exclusive use inside the block, llama.cpp resets its state at the start
+        of each completion."""
+
+        with self._lock:
+            parsed = self._get_parsed(grammar_file)
+            free = self._free.setdefault(grammar_file, [])
+            grammar = free.pop() if free else LlamaGrammar(parsed)
+        try:
+            yield grammar
+        finally:
+            with self._lock:
+                self._free[grammar_file].append(grammar)
+
+    def register(self, grammar_file: str, text: str) -> None:
+        """Parse and validate grammar text generated in code and make it available under the specified name
+        in place of a file, raises RuntimeError if it is not valid."""
+
+        parsed = self._parse(text, grammar_file)
+        with self._lock:
+            self._parsed[grammar_file] = parsed
+            self._free[grammar_file] = []
+
+    def validate(self, grammar_file: str) -> None:
+        """Parse and validate the grammar file if not done already, raises RuntimeError if it is not valid."""
+
+        with self._lock:
+            self._get_parsed(grammar_file)
+
+    def validate_all(self) -> List[str]:
+        """Validate every .gbnf file in the grammar directory and return their names,
+        raises RuntimeError listing every grammar that is not valid."""
+
+        grammar_files = sorted(name for name in os.listdir(self.grammar_dir) if name.endswith(".gbnf"))
+        errors = []
+        for grammar_file in grammar_files:
+            try:
+                self.validate(grammar_file)
+            except RuntimeError as e:
+                errors.append(str(e))
+        if errors:
+            raise RuntimeError("\n".join(errors))
+        return grammar_files
+
+    def _get_parsed(self, grammar_file: str) -> llama_grammar.parse_state:
+        """Cached parse result for the grammar file (the caller must hold the lock)."""
+
+        parsed = self._parsed.get(grammar_file)
+        if parsed is None:
+            grammar_path = os.path.join(self.grammar_dir, grammar_file)
+            if not os.path.exists(grammar_path):
+                raise RuntimeError(f"Grammar file {grammar_file} is not found in {self.grammar_dir}.")
+            with open(grammar_path, "r", encoding="utf-8") as file:
+                parsed = self._parse(file.read(), grammar_file)
+            self._parsed[grammar_file] = parsed
+        return parsed
+
+    @staticmethod
+    def _parse(text: str, grammar_file: str) -> llama_grammar.parse_state:
+        """Parse grammar text and check that root and every referenced rule are defined."""
+
+        # Use the parser steps directly because llama_grammar.parse prints errors and returns empty state
+        try:
+            state = llama_grammar.parse_state()
+            pos = llama_grammar.parse_space(llama_grammar.const_char_p(text), True)
+            while pos[0]:
+                pos = llama_grammar.parse_rule(state, pos)
+        except Exception as e:
+            raise RuntimeError(f"Grammar {grammar_file} cannot be parsed: {e}")
+
+        if state.rules.empty():
+            raise RuntimeError(f"Grammar {grammar_file} does not contain any rules.")
+
+        symbol_ids = {name: symbol_id for name, symbol_id in state.symbol_ids.items()}
+        if "root" not in symbol_ids:
+            raise RuntimeError(f"Grammar {grammar_file} does not define root rule.")
+        undefined = [
+            name
+            for name, symbol_id in symbol_ids.items()
+            if symbol_id >= state.rules.size() or state.rules[symbol_id].empty()
+        ]
+        if undefined:
+            raise RuntimeError(f"Grammar {grammar_file} references undefined rules: {', '.join(sorted(undefined))}.")
+        return state
@@ -13,16 +13,26 @@
 # limitations under the License.
 
 import os
+import time
+from contextlib import contextmanager, nullcontext
 from dataclasses import dataclass, field
-from typing import Optional
+from typing import Any, Dict, Iterator, List, Optional, Tuple, Union
 
+import llama_cpp
 from huggingface_hub import hf_hub_download
 from langchain import LlamaCpp, LLMChain, PromptTemplate
-from langchain.callbacks import StreamingStdOutCallbackHandler
-from langchain.callbacks.manager import CallbackManager
+from llama_cpp import Llama
 
+from confirms.core.context.context_packer import ContextPacker
+from confirms.core.context.llama_token_counter import LlamaTokenCounter
+from confirms.core.instrumentation.llm_span import LlmSpan
+from confirms.core.instrumentation.span_callback_handler import SpanCallbackHandler
+from confirms.core.llm.grammar_registry import GrammarRegistry
+from confirms.core.llm.llama_model_key import LlamaModelKey
+from confirms.core.llm.llama_model_pool import LlamaModelPool
 from confirms.core.llm.llm import Llm
-from confirms.core.settings import Settings
+from confirms.core.vote.vote_params import VoteParams
+from confirms.core.vote.vote_result import VoteResult
 
 
 @dataclass
@@ -36,76 +46,307 @@ class LlamaLangChainLlm(Llm):
     """Model seed (use the same seed to reproduce the answer)."""
 
     grammar_file: str = field(default=None)
-    """Grammar filename including extension located in project_root/grammar directory."""
+    """Grammar filename including extension located in project_root/grammar directory,
+    may be changed between calls without reloading the model."""
 
-    _llm: LlamaCpp = field(default=None)
+    n_ctx: int = field(default=None)
+    """Context window size in tokens, the smallest size that fits the prompt and the answer is chosen
+    for each call if not set."""
+
+    max_tokens: int = field(default=None)
+    """Maximum number of tokens in the answer, defaults to 256 if not set."""
 
-    def load_model(self, grammar_name: str = None):
-        """Load model after fields have been set."""
+    _llm: LlamaCpp = field(default=None)
+    _model_key: LlamaModelKey = field(default=None)
 
-        settings = Settings()
+    def load_model(self, grammar_name: str = None, *, n_ctx: Optional[int] = None):
+        """Load model after fields have been set, with the specified context size unless n_ctx field is set."""
 
         # Skip if already loaded
         if self._llm is None:
+            start = time.perf_counter()
+            model_path, n_gpu_layers = self._get_model_path()
 
-            # Set repo_id and GPU layers based on name
-            model_filename = self.model_type
-            if model_filename.startswith("llama-2-7b-chat."):
-                repo_id = "TheBloke/Llama-2-7B-chat-GGUF"
-                n_gpu_layers = 9999 if settings.gpu_ram_gb >= 16 else 0
-            elif model_filename.startswith("llama-2-13b-chat."):
-                repo_id = "TheBloke/Llama-2-13B-chat-GGUF"
-                n_gpu_layers = 9999 if settings.gpu_ram_gb >= 16 else 0
-            elif model_filename.startswith("llama-2-70b-chat."):
-                repo_id = "TheBloke/Llama-2-70B-chat-GGUF"
-                n_gpu_layers = 9999 if settings.gpu_ram_gb >= 48 else 0
-            else:
-                raise RuntimeError(f"Repo not specified for model type {self.model_type}")
-
-            model_path = settings.get_model_path(model_filename, check_exists=False)
-            if not os.path.exists(model_path):
-                print(
-                    f"Model {model_filename} is not found in {model_path} and will be downloaded from Hugging Face."
-                    f"This may take from tens of minutes to hours time depending on network speed."
-                )
-                hf_hub_download(
-                    repo_id=repo_id, filename=model_filename, local_dir=settings.model_dir, local_dir_use_symlinks=False
-                )
-
+            # Grammar is parsed and validated once per process and passed to the model on each call
             if self.grammar_file is not None:
-                grammar_dir = os.path.join(os.path.dirname(__file__), "../../../grammar")
-                grammar_path = os.path.join(grammar_dir, self.grammar_file)
-            else:
-                grammar_path = None
+                GrammarRegistry.instance().validate(self.grammar_file)
 
-            callback_manager = CallbackManager([StreamingStdOutCallbackHandler()])
-            self._llm = LlamaCpp(
+            # Weights are shared with other instances that use the same key, only sampling parameters vary
+            model_key = LlamaModelKey(
                 model_path=model_path,
-                temperature=self.temperature if self.temperature is not None else 0.2,
                 n_gpu_layers=n_gpu_layers,
-                max_tokens=1024,
+                n_ctx=self.n_ctx or n_ctx or ContextPacker().min_n_ctx,
+                n_batch=8,  # This is the default
+                use_mlock=self.get_settings().use_mlock,
+                n_threads=self.get_settings().llama_threads,
+            )
+            pool = LlamaModelPool.instance()
+            client = pool.acquire(model_key)
+
+            # Model loaded with a larger context size may be returned, its key is used for locking and release
+            model_key = pool.resolve(model_key)
+            self._model_key = model_key
+
+            # Construct the LangChain adapter around the pooled client without loading the model again,
+            # llama.cpp does not report token usage so the callback handler counts tokens
+            callbacks = [SpanCallbackHandler(count_tokens=lambda text: len(client.tokenize(text.encode("utf-8"))))]
+            self._llm = LlamaCpp.construct(
+                client=client,
+                model_path=model_path,
+                temperature=self.temperature if self.temperature is not None else 0.2,
+                n_gpu_layers=model_key.n_gpu_layers,
+                max_tokens=self._get_max_tokens(),
                 top_p=0.85,
                 top_k=70,
                 repeat_penalty=1.07,
                 last_n_tokens_size=64,
                 seed=self.seed if self.seed is not None else -1,
-                n_batch=8,  # This is the default
-                n_ctx=512,  # This is the default, context window -- check if prev value was correct
+                n_batch=model_key.n_batch,
+                n_ctx=model_key.n_ctx,
+                n_threads=model_key.n_threads,
                 stop=None,
-                grammar_path=grammar_path,
-                callback_manager=callback_manager,
+                grammar=None,  # Specified per call
+                callbacks=callbacks,  # Validators that convert callback_manager to callbacks do not run in construct
                 verbose=True,  # Verbose is required to pass to the callback manager
             )
+            LlmSpan.record("load_sec", time.perf_counter() - start)
+
+    def get_model_path(self) -> str:
+        """Path to the model file, downloaded if not present."""
+        return self._get_model_path()[0]
+
+    def get_context_packer(self) -> ContextPacker:
+        """Context packer that counts tokens with the tokenizer of this model and reserves tokens for the answer."""
 
-    def completion(self, question: str, *, prompt: Optional[PromptTemplate] = None) -> str:
-        """Simple completion with optional prompt."""
+        model_path, _ = self._get_model_path()
+        return ContextPacker(token_counter=LlamaTokenCounter(model_path), answer_tokens=self._get_max_tokens())
+
+    def warm_prompt_prefix(self, prompt: PromptTemplate) -> None:
+        """Evaluate the fixed part of the prompt template before its first input variable and save the state
+        in the prefix cache, so that completions with this template only evaluate the tokens that follow.
+
+        Calling this method is optional because the state after each completion is also cached.
+        """
 
         # Load model (multiple calls do not need to reload)
         self.load_model()
 
-        if prompt is None:
-            answer = self._llm(question)
-        else:
-            llm_chain = LLMChain(prompt=prompt, llm=self._llm)
-            answer = llm_chain.run(question)
+        client = self._llm.client
+        prefix = prompt.template.split("{", 1)[0]
+        if client.cache is None or not prefix:
+            return
+
+        with LlamaModelPool.instance().get_lock(self._model_key):
+            tokens = client.tokenize(prefix.encode("utf-8"))
+            client.reset()
+            client.eval(tokens)
+            client.cache[tokens] = client.save_state()
+
+    def unload_model(self):
+        """Release reference to the pooled model, which remains loaded until evicted from the pool."""
+
+        if self._model_key is not None:
+            LlamaModelPool.instance().release(self._model_key)
+            self._model_key = None
+            self._llm = None
+
+    def __del__(self):
+        """Release reference to the pooled model when the instance is garbage collected."""
+        if getattr(self, "_model_key", None) is not None:
+            self.unload_model()
+
+    def is_deterministic(self) -> bool:
+        """Return True if the same input is guaranteed to produce the same answer for the current settings,
+        which holds for a fixed seed because the seed is set after any prefix cache state is restored."""
+        return self.seed is not None and self.seed != -1
+
+    def get_generation_params(self) -> Dict[str, Any]:
+        """Return every setting that affects the answer."""
+        return dict(
+            super().get_generation_params(),
+            temperature=self.temperature,
+            seed=self.seed,
+            grammar_file=self.grammar_file,
+            max_tokens=self._get_max_tokens(),
+        )
+
+    def batch_completion(
+        self, questions: List[str], *, prompt: Optional[PromptTemplate] = None
+    ) -> List[Union[str, Exception]]:
+        """Completion for each question using the same prompt, with results returned in input order.
+
+        The pooled model is locked for the entire batch, so the prompt prefix shared by consecutive
+        questions stays in the llama.cpp KV cache and is evaluated only once.
+        """
+
+        # Load model with context size that fits the longest prompt, so no question causes a reload,
+        # questions that do not fit any context size fail individually when completed
+        self._ensure_context([self._format_prompt(question, prompt) for question in questions], skip_oversized=True)
+        if self._model_key is None:
+            return super().batch_completion(questions, prompt=prompt)
+
+        with LlamaModelPool.instance().get_lock(self._model_key):
+            return super().batch_completion(questions, prompt=prompt)
+
+    def vote_completion(
+        self, question: str, *, prompt: Optional[PromptTemplate] = None, params: Optional[VoteParams] = None
+    ) -> VoteResult:
+        """Sample completions for the same question and prompt until the leading normalized answer is decided
+        or the maximum number of samples is reached, and return the votes.
+
+        The pooled model is locked for all samples, so the prompt stays in the llama.cpp KV cache
+        and is evaluated only once. When seed is set, the sample with index i uses seed + i so that
+        the votes are reproducible.
+        """
+
+        # Load model with context size that fits the prompt, so no sample causes a reload
+        self._ensure_context([self._format_prompt(question, prompt)])
+
+        with LlamaModelPool.instance().get_lock(self._model_key):
+            return super().vote_completion(question, prompt=prompt, params=params)
+
+    def _completion(self, question: str, *, prompt: Optional[PromptTemplate] = None, seed: Optional[int] = None) -> str:
+        """Simple completion with optional prompt, seed overrides the seed field for this call."""
+
+        # Load model with context size that fits the prompt and the answer (multiple calls do not need to reload)
+        prompt_text = self._format_prompt(question, prompt)
+        self._ensure_context([prompt_text])
+
+        with self._generation(prompt_text, seed=seed) as llm_kwargs:
+            if prompt is None:
+                answer = self._llm(question, **llm_kwargs)
+            else:
+                llm_chain = LLMChain(prompt=prompt, llm=self._llm, llm_kwargs=llm_kwargs)
+                answer = llm_chain.run(question)
         return answer
+
+    def _stream_completion(self, question: str, *, prompt: Optional[PromptTemplate] = None) -> Iterator[str]:
+        """Answer tokens as they are generated, closing the stream stops generation."""
+
+        prompt_text = self._format_prompt(question, prompt)
+        self._ensure_context([prompt_text])
+
+        with self._generation(prompt_text) as llm_kwargs:
+            yield from self._llm.stream(prompt_text, **llm_kwargs)
+
+    def _sample_completion(self, question: str, *, prompt: Optional[PromptTemplate] = None, sample_index: int) -> str:
+        """Completion for the sample with the specified index in voting mode, with seed offset by sample index."""
+
+        seed = self.seed + sample_index if self.is_deterministic() else None
+        return self._completion(question, prompt=prompt, seed=seed)
+
+    @contextmanager
+    def _generation(self, prompt_text: str, *, seed: Optional[int] = None) -> Iterator[Dict[str, Any]]:
+        """Hold the pooled model for generating the answer to the prompt text inside the block and yield
+        per-call LLM kwargs with the grammar, seed overrides the seed field if specified."""
+
+        # The pooled model is shared, hold its lock while setting the seed and generating
+        with LlamaModelPool.instance().get_lock(self._model_key):
+            client = self._llm.client
+            ctx = client.ctx
+            seed = seed if seed is not None else self.seed
+            if seed is not None and seed != -1:
+                # Saved state includes the random number generator, so the state llama.cpp would restore
+                # from the prefix cache is restored before setting the seed rather than after
+                self._restore_cached_prefix(client, prompt_text)
+                llama_cpp.llama_set_rng_seed(ctx, seed)
+
+            span = LlmSpan.current()
+            if span is not None:
+                llama_cpp.llama_reset_timings(ctx)
+
+            if self.grammar_file is not None:
+                grammar_context = GrammarRegistry.instance().acquire(self.grammar_file)
+            else:
+                grammar_context = nullcontext()
+            try:
+                with grammar_context as grammar:
+                    yield {"grammar": grammar} if grammar is not None else {}
+            finally:
+                # Timings separate prompt evaluation from generation, prompt prefix restored from cache
+                # is not evaluated
+                if span is not None:
+                    timings = llama_cpp.llama_get_timings(ctx)
+                    span.prompt_eval_tokens = timings.n_p_eval
+                    span.prompt_eval_sec = timings.t_p_eval_ms / 1000.0
+                    span.generation_sec = timings.t_eval_ms / 1000.0
+
+    @staticmethod
+    def _restore_cached_prefix(client: Llama, prompt_text: str) -> None:
+        """Restore the cached state that shares a longer prefix with the prompt than the tokens already
+        evaluated, using the same rule as llama.cpp at the start of a completion, so that llama.cpp
+        does not restore it again after the seed is set."""
+
+        if client.cache is None:
+            return
+
+        tokens = client.tokenize(prompt_text.encode("utf-8")) if prompt_text else [client.token_bos()]
+        try:
+            state = client.cache[tokens]
+        except KeyError:
+            return
+        cache_prefix_len = Llama.longest_token_prefix(state.input_ids.tolist(), tokens)
+        if cache_prefix_len > Llama.longest_token_prefix(client._input_ids.tolist(), tokens):
+            client.load_state(state)
+
+    def _get_max_tokens(self) -> int:
+        """Maximum number of tokens in the answer."""
+        return self.max_tokens if self.max_tokens is not None else 256
+
+    def _ensure_context(self, prompts: List[str], *, skip_oversized: bool = False) -> None:
+        """Load model with the smallest context size that fits each of the prompts and the answer.
+
+        A model loaded with a smaller context size is reloaded, while a larger one is kept
+        because reloading costs more than evaluating with a larger context. If skip_oversized is True,
+        prompts that do not fit the largest context size are ignored instead of raising RuntimeError,
+        and the model is not loaded when none of the prompts fit.
+        """
+
+        if self.n_ctx is None:
+            context_packer = self.get_context_packer()
+            n_ctx_list = []
+            for prompt in prompts:
+                try:
+                    n_ctx_list.append(context_packer.get_n_ctx(prompt))
+                except RuntimeError:
+                    if not skip_oversized:
+                        raise
+            if not n_ctx_list:
+                return
+            n_ctx = max(n_ctx_list)
+            if self._model_key is not None and self._model_key.n_ctx < n_ctx:
+                self.unload_model()
+            self.load_model(n_ctx=n_ctx)
+        else:
+            self.load_model()
+
+    def _get_model_path(self) -> Tuple[str, int]:
+        """Path to the model file, downloaded if not present, and the number of layers offloaded to GPU."""
+
+        # Settings are loaded once per process unless specified for this model
+        settings = self.get_settings()
+
+        # Set repo_id and GPU layers based on name
+        model_filename = self.model_type
+        if model_filename.startswith("llama-2-7b-chat."):
+            repo_id = "TheBloke/Llama-2-7B-chat-GGUF"
+            n_gpu_layers = 9999 if settings.gpu_ram_gb >= 16 else 0
+        elif model_filename.startswith("llama-2-13b-chat."):
+            repo_id = "TheBloke/Llama-2-13B-chat-GGUF"
+            n_gpu_layers = 9999 if settings.gpu_ram_gb >= 16 else 0
+        elif model_filename.startswith("llama-2-70b-chat."):
+            repo_id = "TheBloke/Llama-2-70B-chat-GGUF"
+            n_gpu_layers = 9999 if settings.gpu_ram_gb >= 48 else 0
+        else:
+            raise RuntimeError(f"Repo not specified for model type {self.model_type}")
+
+        model_path = settings.get_model_path(model_filename, check_exists=False)
+        if not os.path.exists(model_path):
+            print(
+                f"Model {model_filename} is not found in {model_path} and will be downloaded from Hugging Face."
+                f"This may take from tens of minutes to hours time depending on network speed."
+            )
+            hf_hub_download(
+                repo_id=repo_id, filename=model_filename, local_dir=settings.model_dir, local_dir_use_symlinks=False
+            )
+        return model_path, n_gpu_layers
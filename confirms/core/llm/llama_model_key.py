@@ -0,0 +1,38 @@
+# Copyright (C) 2023-present The Project Contributors
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#    http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+from dataclasses import dataclass, field
+
+
+@dataclass(frozen=True)
+class LlamaModelKey:
+    """Settings that require loading a separate copy of the model weights, used as the model pool key."""
+
+    model_path: str = field(default=None)
+    """Path to the GGUF model file."""
+
+    n_gpu_layers: int = field(default=0)
+    """Number of layers offloaded to GPU."""
+
+    n_ctx: int = field(default=512)
+    """Context window size in tokens, a loaded model with a larger context size is shared instead."""
+
+    n_batch: int = field(default=8)
+    """Maximum number of prompt tokens evaluated together."""
+
+    use_mlock: bool = field(default=False)
+    """Lock memory-mapped weights in RAM so they are not paged out."""
+
+    n_threads: int = field(default=None)
+    """Number of threads used for evaluation (llama.cpp default of half the CPU count if not set)."""
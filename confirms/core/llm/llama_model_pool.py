@@ -0,0 +1,203 @@
+# Copyright (C) 2023-present The Project Contributors
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#    http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+import dataclasses
+import hashlib
+import os
+import threading
+from collections import OrderedDict
+from dataclasses import dataclass, field
+from typing import Any, Callable, List, Optional
+
+from llama_cpp import Llama
+
+from confirms.core.llm.llama_model_key import LlamaModelKey
+from confirms.core.llm.llama_prefix_cache import LlamaPrefixCache
+from confirms.core.settings import Settings
+
+
+@dataclass
+class _PoolEntry:
+    """Loaded model with its reference count and the lock that serializes calls to it."""
+
+    model: Any = field(default=None)
+    """Loaded model shared by all references."""
+
+    size_bytes: int = field(default=0)
+    """Estimated RAM used by the model."""
+
+    ref_count: int = field(default=0)
+    """Number of references that have not been released."""
+
+    lock: threading.RLock = field(default_factory=threading.RLock)
+    """Model state such as KV cache and seed is shared, so calls must be serialized."""
+
+
+@dataclass
+class LlamaModelPool:
+    """Process-wide pool of loaded llama.cpp models where each distinct LlamaModelKey is loaded only once,
+    and a model loaded with a larger context size is shared by keys that differ only by context size.
+
+    Models are reference counted, and models without references are evicted in least recently used
+    order when loading another model would exceed the RAM budget.
+    """
+
+    ram_budget_gb: float = field(default=None)
+    """Total RAM budget for loaded models in GB (no limit if not set)."""
+
+    prefix_cache_mb: float = field(default=None)
+    """RAM capacity in MB of the evaluated prompt state cache attached to each loaded model (disabled if not set)."""
+
+    prefix_cache_dir: str = field(default=None)
+    """If set, evaluated prompt states are also persisted in a subdirectory of this directory for each model."""
+
+    _entries: OrderedDict = field(default_factory=OrderedDict)
+    _lock: threading.RLock = field(default_factory=threading.RLock)
+
+    _instance = None
+    _instance_lock = threading.Lock()
+
+    @staticmethod
+    def instance() -> "LlamaModelPool":
+        """Process-wide pool instance with RAM budget and prefix cache parameters from Settings."""
+
+        if LlamaModelPool._instance is None:
+            with LlamaModelPool._instance_lock:
+                if LlamaModelPool._instance is None:
+                    settings = Settings.instance()
+                    LlamaModelPool._instance = LlamaModelPool(
+                        ram_budget_gb=settings.model_pool_ram_gb,
+                        prefix_cache_mb=settings.prefix_cache_mb,
+                        prefix_cache_dir=settings.prefix_cache_dir,
+                    )
+        return LlamaModelPool._instance
+
+    def acquire(self, key: LlamaModelKey, *, loader: Optional[Callable[[LlamaModelKey], Any]] = None) -> Any:
+        """Return model for the key, loading it on first use, and increment its reference count.
+
+        A loaded model that differs from the key only by a larger context size is returned instead of
+        loading another copy of the weights, use `resolve` to get the key of the returned model.
+        Each call must be matched by a call to `release` with that key once the model is no longer needed.
+        """
+
+        with self._lock:
+            key = self.resolve(key)
+            entry = self._entries.get(key)
+            if entry is None:
+                # Unreferenced copies with a smaller context size are no longer needed because the new model
+                # is returned for their keys
+                for loaded_key, loaded_entry in list(self._entries.items()):
+                    if loaded_entry.ref_count == 0 and dataclasses.replace(loaded_key, n_ctx=key.n_ctx) == key:
+                        del self._entries[loaded_key]
+
+                size_bytes = os.path.getsize(key.model_path) if os.path.exists(key.model_path) else 0
+                self._evict(size_bytes)
+                model = loader(key) if loader is not None else self._load(key)
+                entry = _PoolEntry(model=model, size_bytes=size_bytes)
+                self._entries[key] = entry
+            else:
+                self._entries.move_to_end(key)
+            entry.ref_count += 1
+            return entry.model
+
+    def resolve(self, key: LlamaModelKey) -> LlamaModelKey:
+        """Key of the loaded model with the smallest context size at least as large as for the key
+        and otherwise the same settings, or the key itself if no such model is loaded.
+
+        The key of an acquired model is returned for as long as the reference is held.
+        """
+
+        with self._lock:
+            loaded_keys = [
+                loaded_key
+                for loaded_key in self._entries.keys()
+                if loaded_key.n_ctx >= key.n_ctx and dataclasses.replace(loaded_key, n_ctx=key.n_ctx) == key
+            ]
+            return min(loaded_keys, key=lambda loaded_key: loaded_key.n_ctx, default=key)
+
+    def release(self, key: LlamaModelKey) -> None:
+        """Decrement reference count, the model remains loaded until evicted."""
+
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None and entry.ref_count > 0:
+                entry.ref_count -= 1
+
+    def get_lock(self, key: LlamaModelKey) -> threading.RLock:
+        """Lock that must be held while calling the model for the key."""
+
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                raise RuntimeError(f"Model {key.model_path} is not loaded in the model pool.")
+            return entry.lock
+
+    def get_loaded_keys(self) -> List[LlamaModelKey]:
+        """Keys of loaded models from least to most recently used."""
+
+        with self._lock:
+            return list(self._entries.keys())
+
+    def get_used_ram_gb(self) -> float:
+        """Estimated RAM used by loaded models in GB."""
+
+        with self._lock:
+            return sum(entry.size_bytes for entry in self._entries.values()) / 2**30
+
+    def _evict(self, required_bytes: int) -> None:
+        """Evict unreferenced models in least recently used order until the required RAM fits within budget.
+
+        When all loaded models are referenced, the new model is loaded even if the budget is exceeded.
+        """
+
+        if self.ram_budget_gb is None:
+            return
+
+        budget_bytes = self.ram_budget_gb * 2**30
+        used_bytes = sum(entry.size_bytes for entry in self._entries.values())
+        for key in list(self._entries.keys()):
+            if used_bytes + required_bytes <= budget_bytes:
+                break
+            entry = self._entries[key]
+            if entry.ref_count == 0:
+                used_bytes -= entry.size_bytes
+                del self._entries[key]
+
+    def _load(self, key: LlamaModelKey) -> Any:
+        """Load llama.cpp model for the key with prefix cache attached, sampling parameters are specified per call.
+
+        Weights are memory-mapped read-only, so processes on the same host share them through the page cache.
+        """
+
+        model = Llama(
+            model_path=key.model_path,
+            n_gpu_layers=key.n_gpu_layers,
+            n_ctx=key.n_ctx,
+            n_batch=key.n_batch,
+            use_mmap=True,
+            use_mlock=key.use_mlock,
+            n_threads=key.n_threads,
+            last_n_tokens_size=64,
+            verbose=True,
+        )
+
+        if self.prefix_cache_mb:
+            # Evaluated states depend on weights and context size, use separate directory for each key
+            if self.prefix_cache_dir is not None:
+                key_hash = hashlib.sha256(repr(key).encode("utf-8")).hexdigest()[:16]
+                cache_dir = os.path.join(self.prefix_cache_dir, f"{os.path.basename(key.model_path)}.{key_hash}")
+            else:
+                cache_dir = None
+            model.set_cache(LlamaPrefixCache(int(self.prefix_cache_mb * 2**20), cache_dir=cache_dir))
+        return model
@@ -0,0 +1,102 @@
+# Copyright (C) 2023-present The Project Contributors
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#    http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+from typing import Optional, Sequence, Tuple
+
+import diskcache
+from llama_cpp import BaseLlamaCache, Llama, LlamaRAMCache, LlamaState
+
+
+class LlamaPrefixCache(BaseLlamaCache):
+    """Cache of evaluated prompt states for a llama.cpp model, in-memory LRU with optional on-disk persistence.
+
+    On each completion llama.cpp restores the cached state whose tokens share the longest prefix
+    with the new prompt, so only tokens after the shared prefix (e.g. the context inserted into
+    a fixed prompt template) are evaluated.
+    """
+
+    def __init__(self, capacity_bytes: int, *, cache_dir: Optional[str] = None, disk_capacity_bytes: int = 8 << 30):
+        """Create cache with the specified RAM capacity, states are also persisted in cache_dir if specified
+        with LRU eviction above disk_capacity_bytes."""
+
+        super().__init__(capacity_bytes)
+        self.ram_cache = LlamaRAMCache(capacity_bytes)
+        self.disk_cache = (
+            diskcache.Cache(cache_dir, size_limit=disk_capacity_bytes, eviction_policy="least-recently-used")
+            if cache_dir is not None
+            else None
+        )
+        self.hits = 0
+        self.misses = 0
+
+    @property
+    def cache_size(self) -> int:
+        """Size of the states in RAM in bytes."""
+        return self.ram_cache.cache_size
+
+    def _find_longest_prefix_key(self, key: Tuple[int, ...]) -> Optional[Tuple[int, ...]]:
+        """Key of the state in RAM or on disk that shares the longest prefix with the specified tokens."""
+
+        ram_key = self.ram_cache._find_longest_prefix_key(key)
+        disk_key = self._find_longest_disk_key(key)
+        if disk_key is None:
+            return ram_key
+        if ram_key is None or Llama.longest_token_prefix(disk_key, key) > Llama.longest_token_prefix(ram_key, key):
+            return disk_key
+        return ram_key
+
+    def _find_longest_disk_key(self, key: Tuple[int, ...]) -> Optional[Tuple[int, ...]]:
+        """Key of the state on disk that shares the longest prefix with the specified tokens."""
+
+        if self.disk_cache is None:
+            return None
+
+        max_len = 0
+        max_key = None
+        for disk_key in self.disk_cache.iterkeys():
+            prefix_len = Llama.longest_token_prefix(disk_key, key)
+            if prefix_len > max_len:
+                max_len = prefix_len
+                max_key = disk_key
+        return max_key
+
+    def __getitem__(self, key: Sequence[int]) -> LlamaState:
+        """State that shares the longest prefix with the specified tokens, states loaded from disk are kept in RAM."""
+
+        key = tuple(key)
+        found_key = self._find_longest_prefix_key(key)
+        if found_key is None:
+            self.misses += 1
+            raise KeyError("Key not found")
+
+        self.hits += 1
+        if found_key in self.ram_cache.cache_state:
+            value = self.ram_cache.cache_state[found_key]
+            self.ram_cache.cache_state.move_to_end(found_key)
+        else:
+            value = self.disk_cache[found_key]
+            self.ram_cache[found_key] = value
+        return value
+
+    def __contains__(self, key: Sequence[int]) -> bool:
+        """Check if there is a state that shares a prefix with the specified tokens."""
+        return self._find_longest_prefix_key(tuple(key)) is not None
+
+    def __setitem__(self, key: Sequence[int], value: LlamaState) -> None:
+        """Add state to RAM, and to disk if persistence is enabled."""
+
+        key = tuple(key)
+        self.ram_cache[key] = value
+        if self.disk_cache is not None:
+            self.disk_cache[key] = value
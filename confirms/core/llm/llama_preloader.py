@@ -0,0 +1,183 @@
+# Copyright (C) 2023-present The Project Contributors
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#    http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+import mmap
+import os
+import threading
+import time
+from dataclasses import dataclass, field
+from typing import Dict, List, Optional
+
+import numpy as np
+
+from confirms.core.llm.llama_lang_chain_llm import LlamaLangChainLlm
+from confirms.core.llm.preload_state import PreloadState
+from confirms.core.settings import Settings
+
+
+@dataclass
+class LlamaPreloader:
+    """Loads and warms up local GGUF models in background threads at process start, and reports
+    which models are hot so that a worker accepts traffic only once its models are warm.
+
+    Each model file is memory-mapped read-only and its pages are read into the OS page cache,
+    which is shared by all processes on the host that map the same file. The model is then
+    acquired from the model pool and a one-token warm-up completion is run. The warmed up models
+    stay referenced, so the model pool does not evict them until `close` is called.
+    """
+
+    model_types: List[str] = field(default=None)
+    """Local model types to preload, taken from settings if not set."""
+
+    n_ctx: int = field(default=None)
+    """Context window size of the preloaded models, the largest size of each model is used if not set,
+    the warm model is shared by requests that need the same or a smaller size."""
+
+    warm_up_prompt: str = field(default="Hello")
+    """Prompt of the warm-up completion."""
+
+    settings: Settings = field(default=None)
+    """Settings for the preloaded models, process-wide settings are used if not set."""
+
+    load_sec: Dict[str, float] = field(default_factory=dict)
+    """Time from the start of preloading until the model was hot for each model type."""
+
+    _states: Dict[str, PreloadState] = field(default_factory=dict)
+    _errors: Dict[str, str] = field(default_factory=dict)
+    _llms: Dict[str, LlamaLangChainLlm] = field(default_factory=dict)
+    _threads: List[threading.Thread] = field(default_factory=list)
+    _lock: threading.Lock = field(default_factory=threading.Lock)
+
+    _instance = None
+    _instance_lock = threading.Lock()
+
+    @staticmethod
+    def instance() -> "LlamaPreloader":
+        """Process-wide preloader instance for the models specified in Settings."""
+
+        if LlamaPreloader._instance is None:
+            with LlamaPreloader._instance_lock:
+                if LlamaPreloader._instance is None:
+                    LlamaPreloader._instance = LlamaPreloader()
+        return LlamaPreloader._instance
+
+    def __post_init__(self):
+        """Take model types from settings if not set."""
+
+        if self.model_types is None:
+            self.model_types = list(self.get_settings().preload_model_types)
+        self._states = {model_type: PreloadState.PENDING for model_type in self.model_types}
+
+    def get_settings(self) -> Settings:
+        """Settings for the preloaded models if set, otherwise process-wide settings."""
+        return self.settings if self.settings is not None else Settings.instance()
+
+    def start(self) -> None:
+        """Start preloading each model in a background thread, does nothing if already started."""
+
+        with self._lock:
+            if self._threads:
+                return
+            for model_type in self.model_types:
+                thread = threading.Thread(
+                    target=self._preload, args=(model_type,), name=f"preload-{model_type}", daemon=True
+                )
+                self._threads.append(thread)
+                thread.start()
+
+    def wait(self, timeout: Optional[float] = None) -> bool:
+        """Wait until preloading of every model has finished or the timeout in seconds has elapsed,
+        return True if every model is hot."""
+
+        deadline = time.monotonic() + timeout if timeout is not None else None
+        for thread in list(self._threads):
+            thread.join(None if deadline is None else max(0.0, deadline - time.monotonic()))
+        return self.is_ready()
+
+    def is_ready(self) -> bool:
+        """Readiness probe, True if every model is hot."""
+
+        with self._lock:
+            return all(state == PreloadState.HOT for state in self._states.values())
+
+    def get_states(self) -> Dict[str, PreloadState]:
+        """Current state of each model type."""
+
+        with self._lock:
+            return dict(self._states)
+
+    def get_errors(self) -> Dict[str, str]:
+        """Exception type and message for each model type that failed to preload."""
+
+        with self._lock:
+            return dict(self._errors)
+
+    def close(self) -> None:
+        """Release warmed up models so that the model pool may evict them."""
+
+        with self._lock:
+            llms = list(self._llms.values())
+            self._llms.clear()
+        for llm in llms:
+            llm.unload_model()
+
+    @staticmethod
+    def touch_pages(model_path: str) -> int:
+        """Memory-map the file read-only and read one byte from each page so that the whole file is
+        in the page cache, return the file size in bytes."""
+
+        with open(model_path, "rb") as file:
+            size_bytes = os.fstat(file.fileno()).st_size
+            if size_bytes == 0:
+                return 0
+            with mmap.mmap(file.fileno(), 0, access=mmap.ACCESS_READ) as mapped:
+                # Ask the kernel to start reading ahead where supported
+                if hasattr(mapped, "madvise") and hasattr(mmap, "MADV_WILLNEED"):
+                    mapped.madvise(mmap.MADV_WILLNEED)
+                pages = np.frombuffer(mapped, dtype=np.uint8)
+                try:
+                    int(pages[:: mmap.PAGESIZE].sum())
+                finally:
+                    # The buffer export must be released before the map can be closed
+                    del pages
+        return size_bytes
+
+    def _preload(self, model_type: str) -> None:
+        """Page in, load and warm up the model, this method runs in a background thread."""
+
+        start = time.perf_counter()
+        try:
+            self._set_state(model_type, PreloadState.PAGING)
+            llm = LlamaLangChainLlm(model_type=model_type, settings=self.settings, max_tokens=1)
+            self.touch_pages(llm.get_model_path())
+
+            # Requests choose the smallest context size that fits, so the largest one is warmed up for them to share
+            llm.n_ctx = self.n_ctx if self.n_ctx is not None else llm.get_context_packer().get_max_n_ctx()
+
+            self._set_state(model_type, PreloadState.WARMING)
+            llm.completion(self.warm_up_prompt)
+            with self._lock:
+                self._llms[model_type] = llm
+                self.load_sec[model_type] = time.perf_counter() - start
+            self._set_state(model_type, PreloadState.HOT)
+        except Exception as e:
+            with self._lock:
+                self._errors[model_type] = f"{type(e).__name__}: {e}"
+            self._set_state(model_type, PreloadState.FAILED)
+
+    def _set_state(self, model_type: str, state: PreloadState) -> None:
+        """Set state of the model type."""
+
+        with self._lock:
+            self._states[model_type] = state
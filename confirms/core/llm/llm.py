@@ -12,9 +12,20 @@
 # See the License for the specific language governing permissions and
 # limitations under the License.
 
+import asyncio
 from abc import ABC, abstractmethod
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import contextmanager
 from dataclasses import dataclass, field
-from typing import Optional
+from typing import Any, Dict, Iterator, List, Optional, Sequence, Union
+
+from confirms.core.instrumentation.llm_instrumentation import LlmInstrumentation
+from confirms.core.instrumentation.llm_span import LlmSpan
+from confirms.core.llm.completion_cache import CompletionCache
+from confirms.core.settings import Settings
+from confirms.core.stream.stop_predicate import StopPredicate
+from confirms.core.vote.vote_params import VoteParams
+from confirms.core.vote.vote_result import VoteResult
 
 
 @dataclass
@@ -28,10 +39,187 @@ class Llm(ABC):
     """LLM type in the format accepted by the vendor API (e.g. `gpt-4`) or name of the file from which
     the LLM is loaded including extension (e.g. `llama-2-13b-chat.Q4_K_M.gguf`)."""
 
+    settings: Settings = field(default=None)
+    """Settings for this model, process-wide settings loaded once per process are used if not set."""
+
+    cache: CompletionCache = field(default=None)
+    """Optional persistent completion cache, used only when the model configuration is deterministic."""
+
+    instrumentation: List[LlmInstrumentation] = field(default=None)
+    """Optional hooks that receive a span with timing and token counts for each call."""
+
     @abstractmethod
     def load_model(self):
         """Load model after fields have been set."""
 
+    def completion(self, question: str, *, prompt: Optional[Any] = None) -> str:
+        """Simple completion with optional prompt, returns cached answer when available."""
+
+        with self._trace("completion") as span:
+            # Non-deterministic configurations always run inference because each answer is a new sample
+            if self.cache is None or not self.is_deterministic():
+                return self._completion(question, prompt=prompt)
+
+            key = self.get_cache_key(question, prompt=prompt)
+            answer = self.cache.get(key)
+            if span is not None:
+                span.cache_hit = answer is not None
+            if answer is None:
+                answer = self._completion(question, prompt=prompt)
+                self.cache.put(key, answer)
+            return answer
+
+    def get_settings(self) -> Settings:
+        """Settings for this model if set, otherwise process-wide settings."""
+        return self.settings if self.settings is not None else Settings.instance()
+
+    async def acompletion(self, question: str, *, prompt: Optional[Any] = None) -> str:
+        """Async completion with optional prompt, returns cached answer when available."""
+
+        with self._trace("acompletion") as span:
+            # Non-deterministic configurations always run inference because each answer is a new sample
+            if self.cache is None or not self.is_deterministic():
+                return await self._acompletion(question, prompt=prompt)
+
+            key = self.get_cache_key(question, prompt=prompt)
+            answer = self.cache.get(key)
+            if span is not None:
+                span.cache_hit = answer is not None
+            if answer is None:
+                answer = await self._acompletion(question, prompt=prompt)
+                self.cache.put(key, answer)
+            return answer
+
+    def stream_completion(
+        self, question: str, *, prompt: Optional[Any] = None, stop: Optional[Sequence[StopPredicate]] = None
+    ) -> Iterator[str]:
+        """Generate the answer piece by piece as the model produces it, optionally cancelling generation
+        as soon as any of the stop predicates accepts the text streamed so far.
+
+        The piece that satisfies a predicate is yielded before generation stops. Streamed answers
+        bypass the completion cache. Consume the stream in the calling thread, and close it
+        if it is not consumed to the end so that the model is released.
+        """
+
+        with self._trace("stream_completion") as span:
+            pieces = self._stream_completion(question, prompt=prompt)
+            text = ""
+            try:
+                for piece in pieces:
+                    if not piece:
+                        continue
+                    if span is not None and span.time_to_first_token_sec is None:
+                        span.time_to_first_token_sec = span.get_elapsed_sec()
+                    text += piece
+                    yield piece
+                    if stop and any(predicate.is_stopped(text) for predicate in stop):
+                        break
+            finally:
+                # Closing the backend stream cancels generation that has not finished
+                pieces.close()
+
+    def vote_completion(
+        self, question: str, *, prompt: Optional[Any] = None, params: Optional[VoteParams] = None
+    ) -> VoteResult:
+        """Sample completions for the same question and prompt until the leading normalized answer is decided
+        or the maximum number of samples is reached, and return the votes.
+
+        Samples bypass the completion cache, so the model must be configured to produce different answers
+        (e.g. nonzero temperature) for voting to be meaningful.
+        """
+
+        params = params if params is not None else VoteParams()
+        with self._trace("vote_completion"):
+            result = VoteResult()
+            for sample_index in range(params.max_samples):
+                answer = self._sample_completion(question, prompt=prompt, sample_index=sample_index)
+                result.add(answer, params.normalize(answer))
+                if params.is_decided(result):
+                    result.is_decided = True
+                    break
+            return result
+
+    def batch_completion(self, questions: List[str], *, prompt: Optional[Any] = None) -> List[Union[str, Exception]]:
+        """Completion for each question using the same prompt, with results returned in input order.
+
+        A question that fails produces the exception it raised in place of the answer
+        instead of failing the entire batch.
+        """
+        return self._map_completion(questions, prompt=prompt, max_workers=1)
+
+    def _map_completion(
+        self, questions: List[str], *, prompt: Optional[Any], max_workers: int
+    ) -> List[Union[str, Exception]]:
+        """Run completion for each question using the specified number of threads."""
+
+        def _try_completion(question: str) -> Union[str, Exception]:
+            try:
+                return self.completion(question, prompt=prompt)
+            except Exception as e:
+                return e
+
+        if max_workers <= 1 or len(questions) <= 1:
+            return [_try_completion(question) for question in questions]
+        with ThreadPoolExecutor(max_workers=min(max_workers, len(questions))) as executor:
+            return list(executor.map(_try_completion, questions))
+
     @abstractmethod
-    def completion(self, question: str, *, prompt: Optional[str] = None) -> str:
-        """Simple completion with optional prompt."""
+    def _completion(self, question: str, *, prompt: Optional[Any] = None) -> str:
+        """Simple completion with optional prompt, implemented by derived classes without caching."""
+
+    def _stream_completion(self, question: str, *, prompt: Optional[Any] = None) -> Iterator[str]:
+        """Answer pieces without caching, yields the entire answer as one piece
+        unless overridden by derived classes with native streaming support."""
+        yield self._completion(question, prompt=prompt)
+
+    def _sample_completion(self, question: str, *, prompt: Optional[Any] = None, sample_index: int) -> str:
+        """Completion without caching for the sample with the specified index in voting mode,
+        derived classes with a seed field should vary it by sample index."""
+        return self._completion(question, prompt=prompt)
+
+    async def _acompletion(self, question: str, *, prompt: Optional[Any] = None) -> str:
+        """Async completion without caching, runs the blocking completion in a worker thread
+        unless overridden by derived classes with native async support."""
+        return await asyncio.to_thread(self._completion, question, prompt=prompt)
+
+    @staticmethod
+    def _format_prompt(question: str, prompt: Optional[Any]) -> str:
+        """Prompt text sent to the model for the question with optional LangChain prompt template."""
+        return question if prompt is None else prompt.format(**{prompt.input_variables[0]: question})
+
+    def is_deterministic(self) -> bool:
+        """Return True if the same input is guaranteed to produce the same answer for the current settings."""
+        return False
+
+    def get_generation_params(self) -> Dict[str, Any]:
+        """Return every setting that affects the answer, derived classes should extend the base dictionary."""
+        return {"llm_class": type(self).__name__, "model_type": self.model_type}
+
+    def get_cache_key(self, question: str, *, prompt: Optional[Any] = None) -> str:
+        """Stable hash of question, prompt and generation parameters."""
+
+        # Use template text for LangChain prompt templates
+        prompt_text = getattr(prompt, "template", prompt)
+        params = dict(self.get_generation_params(), question=question, prompt=prompt_text)
+        return CompletionCache.get_key(params)
+
+    @contextmanager
+    def _trace(self, operation: str) -> Iterator[Optional[LlmSpan]]:
+        """Make a new span current inside the block and pass it to instrumentation hooks when the block exits,
+        yields None without creating a span if there are no hooks."""
+
+        if not self.instrumentation:
+            yield None
+            return
+
+        span = LlmSpan(llm_class=type(self).__name__, model_type=self.model_type, operation=operation)
+        try:
+            with span.activate():
+                yield span
+        except Exception as e:
+            span.error = f"{type(e).__name__}: {e}"
+            raise
+        finally:
+            span.duration_sec = span.get_elapsed_sec()
+            for hook in self.instrumentation:
+                hook.on_span(span)
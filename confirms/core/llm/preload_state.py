@@ -0,0 +1,34 @@
+# Copyright (C) 2023-present The Project Contributors
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#    http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+from enum import Enum
+
+
+class PreloadState(Enum):
+    """State of a local model in the preloader."""
+
+    PENDING = "pending"
+    """Preloading has not started."""
+
+    PAGING = "paging"
+    """Model file is memory-mapped and its pages are being read into the page cache."""
+
+    WARMING = "warming"
+    """Model is loaded and the warm-up completion is running."""
+
+    HOT = "hot"
+    """Model is loaded and warmed up, requests do not incur cold start."""
+
+    FAILED = "failed"
+    """Preloading raised an exception."""
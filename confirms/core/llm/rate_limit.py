@@ -0,0 +1,26 @@
+# Copyright (C) 2023-present The Project Contributors
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#    http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+from dataclasses import dataclass, field
+
+
+@dataclass
+class RateLimit:
+    """Request and token budgets for one model type, no limit is applied for budgets that are not set."""
+
+    requests_per_minute: float = field(default=None)
+    """Maximum number of requests per minute."""
+
+    tokens_per_minute: float = field(default=None)
+    """Maximum number of prompt and completion tokens per minute."""
@@ -0,0 +1,226 @@
+# Copyright (C) 2023-present The Project Contributors
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#    http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+import asyncio
+import dataclasses
+import random
+import threading
+import time
+from dataclasses import dataclass, field
+from typing import Awaitable, Callable, Dict, List, TypeVar
+
+import openai
+
+from confirms.core.context.tiktoken_counter import TiktokenCounter
+from confirms.core.instrumentation.llm_span import LlmSpan
+from confirms.core.llm.rate_limit import RateLimit
+from confirms.core.llm.rate_limiter_metrics import RateLimiterMetrics
+
+T = TypeVar("T")
+
+
+@dataclass
+class RateLimiter:
+    """Client-side token bucket scheduler for OpenAI API calls with budgets per model type.
+
+    Each call reserves one request and its estimated tokens, and waits until the buckets
+    for its model type have been refilled enough to cover the reservation. Calls rejected
+    by the API due to rate limits are retried with jittered exponential backoff.
+    """
+
+    max_retries: int = field(default=6)
+    """Maximum number of retries after the API rejects a request due to rate limits."""
+
+    initial_backoff_sec: float = field(default=1.0)
+    """Backoff before the first retry, doubled for each subsequent retry."""
+
+    max_backoff_sec: float = field(default=60.0)
+    """Maximum backoff before a single retry."""
+
+    completion_tokens_estimate: int = field(default=256)
+    """Completion tokens reserved for each request in addition to prompt tokens."""
+
+    _limits: Dict[str, RateLimit] = field(default_factory=dict)
+    _buckets: Dict[str, List[float]] = field(default_factory=dict)
+    _metrics: Dict[str, RateLimiterMetrics] = field(default_factory=dict)
+    _lock: threading.Lock = field(default_factory=threading.Lock)
+
+    _instance = None
+    _instance_lock = threading.Lock()
+
+    @staticmethod
+    def instance() -> "RateLimiter":
+        """Process-wide rate limiter instance shared by all GPT models."""
+
+        if RateLimiter._instance is None:
+            with RateLimiter._instance_lock:
+                if RateLimiter._instance is None:
+                    RateLimiter._instance = RateLimiter()
+        return RateLimiter._instance
+
+    def set_limit(self, model_type: str, limit: RateLimit) -> None:
+        """Set request and token budgets for the model type, the buckets start full."""
+
+        with self._lock:
+            self._limits[model_type] = limit
+            # Bucket state is [available requests, available tokens, time of last refill]
+            self._buckets[model_type] = [limit.requests_per_minute, limit.tokens_per_minute, time.monotonic()]
+
+    def get_metrics(self, model_type: str) -> RateLimiterMetrics:
+        """Copy of the current statistics for the model type."""
+
+        with self._lock:
+            return dataclasses.replace(self._get_metrics(model_type))
+
+    @staticmethod
+    def count_tokens(model_type: str, text: str) -> int:
+        """Number of tokens in the text for the model type."""
+        return TiktokenCounter(model_type).count(text)
+
+    def estimate_tokens(self, model_type: str, texts: List[str]) -> int:
+        """Prompt tokens for the texts plus the completion tokens estimate, or zero
+        without counting when there is no token budget for the model type."""
+
+        limit = self._limits.get(model_type)
+        if limit is None or limit.tokens_per_minute is None:
+            return 0
+        return sum(self.count_tokens(model_type, text) for text in texts) + self.completion_tokens_estimate
+
+    def acquire(self, model_type: str, tokens: int) -> float:
+        """Block until the budget for one request with the specified number of tokens is available,
+        and return the time waited in seconds."""
+
+        wait_sec = self._reserve(model_type, tokens)
+        if wait_sec > 0.0:
+            try:
+                time.sleep(wait_sec)
+            finally:
+                self._end_wait(model_type)
+        return wait_sec
+
+    async def aacquire(self, model_type: str, tokens: int) -> float:
+        """Wait until the budget for one request with the specified number of tokens is available,
+        and return the time waited in seconds."""
+
+        wait_sec = self._reserve(model_type, tokens)
+        if wait_sec > 0.0:
+            try:
+                await asyncio.sleep(wait_sec)
+            finally:
+                self._end_wait(model_type)
+        return wait_sec
+
+    def call(self, model_type: str, texts: List[str], func: Callable[[], T]) -> T:
+        """Call func that sends the texts to the model within the budget for the model type,
+        retrying with backoff if the API throttles it."""
+
+        tokens = self.estimate_tokens(model_type, texts)
+        for attempt in range(self.max_retries + 1):
+            LlmSpan.record("queue_sec", self.acquire(model_type, tokens))
+            start = time.perf_counter()
+            try:
+                result = func()
+            except openai.error.RateLimitError:
+                LlmSpan.record("network_sec", time.perf_counter() - start)
+                if attempt == self.max_retries:
+                    raise
+                backoff_sec = self._throttled(model_type, attempt)
+                LlmSpan.record("queue_sec", backoff_sec)
+                time.sleep(backoff_sec)
+                continue
+            LlmSpan.record("network_sec", time.perf_counter() - start)
+            return result
+
+    async def acall(self, model_type: str, texts: List[str], func: Callable[[], Awaitable[T]]) -> T:
+        """Await func that sends the texts to the model within the budget for the model type,
+        retrying with backoff if the API throttles it."""
+
+        tokens = self.estimate_tokens(model_type, texts)
+        for attempt in range(self.max_retries + 1):
+            LlmSpan.record("queue_sec", await self.aacquire(model_type, tokens))
+            start = time.perf_counter()
+            try:
+                result = await func()
+            except openai.error.RateLimitError:
+                LlmSpan.record("network_sec", time.perf_counter() - start)
+                if attempt == self.max_retries:
+                    raise
+                backoff_sec = self._throttled(model_type, attempt)
+                LlmSpan.record("queue_sec", backoff_sec)
+                await asyncio.sleep(backoff_sec)
+                continue
+            LlmSpan.record("network_sec", time.perf_counter() - start)
+            return result
+
+    def _reserve(self, model_type: str, tokens: int) -> float:
+        """Reserve one request and the tokens, and return the time until the reservation is covered.
+
+        Bucket levels may go negative, so later callers wait behind earlier ones.
+        """
+
+        with self._lock:
+            metrics = self._get_metrics(model_type)
+            metrics.requests += 1
+
+            limit = self._limits.get(model_type)
+            if limit is None:
+                return 0.0
+
+            bucket = self._buckets[model_type]
+            now = time.monotonic()
+            elapsed_min = (now - bucket[2]) / 60.0
+            bucket[2] = now
+
+            wait_sec = 0.0
+            for index, (per_minute, amount) in enumerate(
+                [(limit.requests_per_minute, 1), (limit.tokens_per_minute, tokens)]
+            ):
+                if per_minute is None:
+                    continue
+                bucket[index] = min(per_minute, bucket[index] + elapsed_min * per_minute) - amount
+                if bucket[index] < 0.0:
+                    wait_sec = max(wait_sec, -bucket[index] / per_minute * 60.0)
+
+            if wait_sec > 0.0:
+                metrics.queue_depth += 1
+                metrics.max_queue_depth = max(metrics.max_queue_depth, metrics.queue_depth)
+                metrics.total_wait_sec += wait_sec
+                metrics.max_wait_sec = max(metrics.max_wait_sec, wait_sec)
+            return wait_sec
+
+    def _end_wait(self, model_type: str) -> None:
+        """Remove a request from the queue after its wait is over."""
+
+        with self._lock:
+            self._get_metrics(model_type).queue_depth -= 1
+
+    def _throttled(self, model_type: str, attempt: int) -> float:
+        """Record throttling and return jittered exponential backoff for the attempt."""
+
+        backoff_sec = min(self.max_backoff_sec, self.initial_backoff_sec * 2**attempt)
+        backoff_sec *= random.uniform(0.5, 1.0)
+        with self._lock:
+            metrics = self._get_metrics(model_type)
+            metrics.throttled += 1
+            metrics.total_wait_sec += backoff_sec
+        return backoff_sec
+
+    def _get_metrics(self, model_type: str) -> RateLimiterMetrics:
+        """Metrics for the model type, created on first use (the caller must hold the lock)."""
+
+        metrics = self._metrics.get(model_type)
+        if metrics is None:
+            metrics = RateLimiterMetrics()
+            self._metrics[model_type] = metrics
+        return metrics
@@ -0,0 +1,38 @@
+# Copyright (C) 2023-present The Project Contributors
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#    http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+from dataclasses import dataclass, field
+
+
+@dataclass
+class RateLimiterMetrics:
+    """Rate limiter statistics for one model type, used to size concurrency."""
+
+    requests: int = field(default=0)
+    """Number of requests admitted by the rate limiter, including retries."""
+
+    throttled: int = field(default=0)
+    """Number of requests rejected by the API due to rate limits."""
+
+    queue_depth: int = field(default=0)
+    """Number of requests currently waiting for budget."""
+
+    max_queue_depth: int = field(default=0)
+    """Maximum number of requests that were waiting for budget at the same time."""
+
+    total_wait_sec: float = field(default=0.0)
+    """Total time requests spent waiting for budget or backing off after throttling."""
+
+    max_wait_sec: float = field(default=0.0)
+    """Longest time a single request spent waiting for budget."""
@@ -0,0 +1,69 @@
+# Copyright (C) 2023-present The Project Contributors
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#    http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+import datetime as dt
+from dataclasses import dataclass, field
+
+
+@dataclass
+class ResultRecord:
+    """Single completion result with the provenance and timing needed to reproduce and aggregate it."""
+
+    experiment: str = field(default=None)
+    """Name of the experiment, results are partitioned by experiment and model type."""
+
+    model_type: str = field(default=None)
+    """LLM type in the format accepted by the vendor API or GGUF model filename including extension."""
+
+    key: str = field(default=None)
+    """Key that identifies the completion within the experiment, the most recent record is used for each key."""
+
+    template_name: str = field(default=None)
+    """Name of the prompt template."""
+
+    template: str = field(default=None)
+    """Prompt template with {context} input variable."""
+
+    context_name: str = field(default=None)
+    """Name of the context."""
+
+    context: str = field(default=None)
+    """Context inserted into the prompt template."""
+
+    seed: int = field(default=None)
+    """Model seed, also used as replicate number for models that do not accept a seed."""
+
+    temperature: float = field(default=None)
+    """Model temperature, None if model default was used."""
+
+    answer: str = field(default=None)
+    """Completion text, None if the completion failed."""
+
+    error: str = field(default=None)
+    """Exception type and message if the completion failed, otherwise None."""
+
+    latency_sec: float = field(default=None)
+    """Wall clock time of model creation and completion in seconds."""
+
+    started_at: dt.datetime = field(default=None)
+    """UTC time when the completion started."""
+
+    run_id: str = field(default=None)
+    """Identifier shared by all records written in the same run."""
+
+    hostname: str = field(default=None)
+    """Host where the completion ran."""
+
+    generation_params: str = field(default=None)
+    """JSON with the parameters reported by the LLM that affect generation."""
@@ -0,0 +1,208 @@
+# Copyright (C) 2023-present The Project Contributors
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#    http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+import dataclasses
+import os
+import threading
+import uuid
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import List, Optional
+
+import pandas as pd
+import pyarrow as pa
+import pyarrow.dataset as ds
+
+from confirms.core.results.result_record import ResultRecord
+
+SCHEMA = pa.schema(
+    [
+        ("experiment", pa.string()),
+        ("model_type", pa.string()),
+        ("key", pa.string()),
+        ("template_name", pa.string()),
+        ("template", pa.string()),
+        ("context_name", pa.string()),
+        ("context", pa.string()),
+        ("seed", pa.int64()),
+        ("temperature", pa.float64()),
+        ("answer", pa.string()),
+        ("error", pa.string()),
+        ("latency_sec", pa.float64()),
+        ("started_at", pa.timestamp("us", tz="UTC")),
+        ("run_id", pa.string()),
+        ("hostname", pa.string()),
+        ("generation_params", pa.string()),
+    ]
+)
+"""Arrow schema of ResultRecord, must be updated together with ResultRecord fields."""
+
+PARTITIONING = ds.partitioning(pa.schema([("experiment", pa.string()), ("model_type", pa.string())]), flavor="hive")
+"""Directory layout experiment=<experiment>/model_type=<model_type>."""
+
+
+@dataclass
+class ResultsStore:
+    """Append-only Parquet dataset of completion results partitioned by experiment and model type.
+
+    Appended records are buffered and written as new Parquet files, existing files are never
+    rewritten except by `compact`. Queries read only the partitions and columns they need.
+    """
+
+    root_dir: str = field(default=None)
+    """Root directory of the dataset, defaults to project_root/results/dataset if not set."""
+
+    max_buffered_records: int = field(default=16)
+    """Buffered records are written to disk when their number reaches this value."""
+
+    _buffer: List[ResultRecord] = field(default_factory=list)
+    _lock: threading.RLock = field(default_factory=threading.RLock)
+
+    def __post_init__(self):
+        """Set default root directory."""
+
+        if self.root_dir is None:
+            self.root_dir = os.path.join(Path(os.path.dirname(__file__)).parent.parent.parent, "results", "dataset")
+
+    def append(self, record: ResultRecord) -> None:
+        """Add record to the buffer and write the buffer to disk if it is full."""
+
+        with self._lock:
+            self._buffer.append(record)
+            if len(self._buffer) >= self.max_buffered_records:
+                self.flush()
+
+    def flush(self) -> None:
+        """Write buffered records to disk as one new file per partition."""
+
+        with self._lock:
+            if not self._buffer:
+                return
+            table = pa.Table.from_pylist([dataclasses.asdict(record) for record in self._buffer], schema=SCHEMA)
+            self._write(table)
+            self._buffer.clear()
+
+    def get_dataset(self) -> ds.Dataset:
+        """Lazy dataset of all written records for queries and aggregation with pyarrow."""
+
+        if not os.path.isdir(self.root_dir):
+            return ds.dataset(SCHEMA.empty_table())
+        return ds.dataset(self.root_dir, schema=SCHEMA, format="parquet", partitioning=PARTITIONING)
+
+    def read(
+        self,
+        experiment: Optional[str] = None,
+        *,
+        model_types: Optional[List[str]] = None,
+        columns: Optional[List[str]] = None,
+        latest: bool = False,
+    ) -> pd.DataFrame:
+        """Read records filtered by experiment and model types, only matching partitions are scanned.
+
+        If latest is True, only the most recent record is returned for each key within an experiment.
+        """
+
+        expression = None
+        if experiment is not None:
+            expression = ds.field("experiment") == experiment
+        if model_types is not None:
+            model_expression = ds.field("model_type").isin(model_types)
+            expression = model_expression if expression is None else expression & model_expression
+
+        if latest and columns is not None:
+            columns = list(dict.fromkeys(columns + ["experiment", "key", "started_at"]))
+        df = self.get_dataset().to_table(columns=columns, filter=expression).to_pandas()
+
+        if latest and not df.empty:
+            df = df.sort_values("started_at", kind="stable").drop_duplicates(["experiment", "key"], keep="last")
+        return df.reset_index(drop=True)
+
+    def get_summary(self, experiment: str) -> pd.DataFrame:
+        """Number of records, number of errors, and mean and maximum latency for each model type."""
+
+        table = self.get_dataset().to_table(
+            columns=["model_type", "key", "error", "latency_sec"], filter=ds.field("experiment") == experiment
+        )
+        summary = table.group_by("model_type").aggregate(
+            [("key", "count"), ("error", "count"), ("latency_sec", "mean"), ("latency_sec", "max")]
+        )
+        return (
+            summary.to_pandas()
+            .rename(
+                columns={
+                    "key_count": "records",
+                    "error_count": "errors",
+                    "latency_sec_mean": "mean_latency_sec",
+                    "latency_sec_max": "max_latency_sec",
+                }
+            )
+            .sort_values("model_type")
+            .reset_index(drop=True)
+        )
+
+    def export_csv(
+        self,
+        experiment: str,
+        output_path: str,
+        *,
+        index: str = "seed",
+        values: str = "answer",
+        model_types: Optional[List[str]] = None,
+    ) -> None:
+        """Export the most recent answers as CSV with one row per index value and one column per model type,
+        in the order of model_types if specified."""
+
+        df = self.read(experiment, model_types=model_types, columns=[index, "model_type", values], latest=True)
+        df = df.pivot(index=index, columns="model_type", values=values)
+        if model_types is not None:
+            df = df[model_types]
+        os.makedirs(os.path.dirname(os.path.abspath(output_path)), exist_ok=True)
+        df.to_csv(output_path, index=False)
+
+    def compact(self, experiment: Optional[str] = None) -> None:
+        """Rewrite each partition of the experiment, or of all experiments if not specified, into a single file."""
+
+        self.flush()
+        with self._lock:
+            dataset = self.get_dataset()
+            expression = ds.field("experiment") == experiment if experiment is not None else None
+            table = dataset.to_table(filter=expression)
+            if table.num_rows == 0:
+                return
+
+            # Write compacted files next to the old ones, then delete the old files
+            old_files = [fragment.path for fragment in dataset.get_fragments(filter=expression)]
+            self._write(table)
+            for path in old_files:
+                os.remove(path)
+
+    def delete(self, experiment: str) -> None:
+        """Delete all records of the experiment."""
+
+        with self._lock:
+            self._buffer = [record for record in self._buffer if record.experiment != experiment]
+            for fragment in self.get_dataset().get_fragments(filter=ds.field("experiment") == experiment):
+                os.remove(fragment.path)
+
+    def _write(self, table: pa.Table) -> None:
+        """Write table as new files with unique names in the partitions of its records."""
+
+        ds.write_dataset(
+            table,
+            self.root_dir,
+            format="parquet",
+            partitioning=PARTITIONING,
+            basename_template=f"part-{uuid.uuid4().hex}-{{i}}.parquet",
+            existing_data_behavior="overwrite_or_ignore",
+        )
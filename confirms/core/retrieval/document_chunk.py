@@ -0,0 +1,32 @@
+# Copyright (C) 2023-present The Project Contributors
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#    http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+from dataclasses import dataclass, field
+
+
+@dataclass(frozen=True)
+class DocumentChunk:
+    """Chunk of a document stored in the document index."""
+
+    chunk_id: int = field(default=None)
+    """Identifier of the chunk vector in the index."""
+
+    source: str = field(default=None)
+    """Path or other identifier of the document."""
+
+    page: int = field(default=None)
+    """Zero-based page number within the document."""
+
+    text: str = field(default=None)
+    """Text of the chunk."""
@@ -0,0 +1,324 @@
+# Copyright (C) 2023-present The Project Contributors
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#    http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+import hashlib
+import json
+import os
+import threading
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Tuple
+
+import faiss
+import numpy as np
+import pandas as pd
+from langchain.document_loaders import PyPDFLoader
+from langchain.schema import Document
+from langchain.text_splitter import RecursiveCharacterTextSplitter
+
+from confirms.core.embedding.embedding_model import EmbeddingModel
+from confirms.core.retrieval.document_chunk import DocumentChunk
+from confirms.core.retrieval.vector_index_params import VectorIndexParams
+
+_INDEX_FILE = "index.faiss"
+_CHUNKS_FILE = "chunks.parquet"
+_MANIFEST_FILE = "manifest.json"
+
+_STAGING_PARAMS = VectorIndexParams()
+"""Flat index that keeps vectors until there are enough of them to train the index."""
+
+
+@dataclass
+class DocumentIndex:
+    """Persistent FAISS index of document chunks that are embedded once at ingestion and searched many times.
+
+    The index, chunk metadata and manifest are stored in index_dir. On open the FAISS index is
+    memory-mapped, so searching does not read the entire index into RAM, and it is read into RAM
+    only when more documents are ingested. Documents are identified by the hash of their content,
+    so ingesting an unchanged document again does not embed anything.
+
+    Index types that require training keep vectors in a flat index until there are enough of them,
+    then the index is trained on all vectors added so far.
+    """
+
+    index_dir: str = field(default=None)
+    """Directory where the index is stored, defaults to project_root/results/index if not set."""
+
+    embedding_model: EmbeddingModel = field(default=None)
+    """Embedding model for both documents and queries, must match the model with which the index was built."""
+
+    chunk_size: int = field(default=500)
+    """Maximum number of characters in a chunk."""
+
+    chunk_overlap: int = field(default=50)
+    """Number of characters shared by consecutive chunks."""
+
+    index_params: VectorIndexParams = field(default=None)
+    """Type and parameters of the FAISS index, defaults to the parameters stored with the index or flat index
+    if not set. Search parameters may differ from the stored ones, other parameters require `rebuild`."""
+
+    _index: Any = field(default=None)
+    _is_built: bool = field(default=False)
+    _chunks: pd.DataFrame = field(default=None)
+    _is_mmap: bool = field(default=False)
+    _lock: threading.RLock = field(default_factory=threading.RLock)
+
+    def __post_init__(self):
+        """Set default directory and open the index stored there if any."""
+
+        if self.index_dir is None:
+            self.index_dir = os.path.join(Path(os.path.dirname(__file__)).parent.parent.parent, "results", "index")
+        self._open()
+
+    def get_size(self) -> int:
+        """Number of chunks in the index."""
+
+        with self._lock:
+            return len(self._chunks)
+
+    def get_sources(self) -> Dict[str, str]:
+        """Content hash of each ingested document by source."""
+
+        with self._lock:
+            df = self._chunks.drop_duplicates("source")
+            return dict(zip(df["source"], df["source_hash"]))
+
+    def ingest_pdf(self, pdf_path: str) -> int:
+        """Split the PDF into chunks and add them to the index, return the number of chunks embedded.
+
+        An unchanged document is skipped, and chunks of a previous version of the document are replaced.
+        """
+
+        with open(pdf_path, "rb") as file:
+            source_hash = hashlib.sha256(file.read()).hexdigest()
+        if self.get_sources().get(pdf_path) == source_hash:
+            return 0
+        return self.ingest_documents(PyPDFLoader(pdf_path).load(), source=pdf_path, source_hash=source_hash)
+
+    def ingest_documents(self, documents: List[Document], *, source: str, source_hash: Optional[str] = None) -> int:
+        """Split the pages of a document into chunks and add them to the index, return the number of chunks
+        embedded, the hash of page contents is used if source_hash is not specified.
+
+        An unchanged document is skipped, and chunks of a previous version of the document are replaced.
+        """
+
+        if source_hash is None:
+            page_contents = "\f".join(document.page_content for document in documents)
+            source_hash = hashlib.sha256(page_contents.encode("utf-8")).hexdigest()
+
+        with self._lock:
+            if self.get_sources().get(source) == source_hash:
+                return 0
+
+            text_splitter = RecursiveCharacterTextSplitter(chunk_size=self.chunk_size, chunk_overlap=self.chunk_overlap)
+            split_documents = text_splitter.split_documents(documents)
+            texts = [document.page_content for document in split_documents]
+            vectors = self.embedding_model.embed_documents(texts) if texts else None
+
+            self._ensure_writable(vectors)
+            self._remove_source(source)
+            if texts:
+                first_id = int(self._chunks["chunk_id"].max()) + 1 if len(self._chunks) > 0 else 0
+                chunk_ids = np.arange(first_id, first_id + len(texts), dtype=np.int64)
+                self._index.add_with_ids(np.ascontiguousarray(vectors, dtype=np.float32), chunk_ids)
+                new_chunks = pd.DataFrame(
+                    {
+                        "chunk_id": chunk_ids,
+                        "source": source,
+                        "source_hash": source_hash,
+                        "page": [int(document.metadata.get("page", 0)) for document in split_documents],
+                        "text": texts,
+                    }
+                ).set_index("chunk_id", drop=False)
+                self._chunks = pd.concat([self._chunks, new_chunks]) if len(self._chunks) > 0 else new_chunks
+
+            if not self._is_built and self._index is not None:
+                if self._index.ntotal >= self.index_params.get_min_train_size():
+                    self._index = self._copy_index(self.index_params)
+                    self._is_built = True
+            self._save()
+            return len(texts)
+
+    def rebuild(self, index_params: VectorIndexParams) -> None:
+        """Rebuild the index with different type or parameters from the vectors it contains without embedding
+        documents again, vectors of a quantized index are approximate so rebuilding from it loses precision."""
+
+        with self._lock:
+            self._ensure_writable(None)
+            self.index_params = index_params
+            if self._index is not None:
+                self._is_built = self._index.ntotal >= index_params.get_min_train_size()
+                self._index = self._copy_index(index_params if self._is_built else _STAGING_PARAMS)
+            else:
+                self._is_built = False
+            self._save()
+
+    def search(self, query: str, *, top_k: int = 5, source: Optional[str] = None) -> List[Tuple[DocumentChunk, float]]:
+        """Chunks nearest to the query with their Euclidean distances, optionally within a single document."""
+        return self.search_many([query], top_k=top_k, source=source)[0]
+
+    def search_many(
+        self, queries: List[str], *, top_k: int = 5, source: Optional[str] = None
+    ) -> List[List[Tuple[DocumentChunk, float]]]:
+        """Chunks nearest to each query with their Euclidean distances using a single index search,
+        optionally within a single document."""
+
+        if not queries:
+            return []
+        vectors = np.stack([self.embedding_model.embed_query(query) for query in queries]).astype(np.float32)
+
+        with self._lock:
+            if self._index is None or self._index.ntotal == 0:
+                return [[] for _ in queries]
+            selector = None
+            if source is not None:
+                source_ids = self._chunks.loc[self._chunks["source"] == source, "chunk_id"].to_numpy(np.int64)
+                selector = faiss.IDSelectorBatch(source_ids)
+            params = self._get_active_params().get_search_parameters(selector)
+            distances, ids = self._index.search(vectors, min(top_k, self._index.ntotal), params=params)
+
+            results = []
+            for query_distances, query_ids in zip(distances, ids):
+                # Fewer than top_k chunks are found when searching within a document
+                found = query_ids >= 0
+                rows = self._chunks.loc[query_ids[found]].itertuples(index=False)
+                distances_found = query_distances[found]
+                results.append([(self._to_chunk(row), float(distance)) for row, distance in zip(rows, distances_found)])
+            return results
+
+    @staticmethod
+    def _to_chunk(row: Any) -> DocumentChunk:
+        """Chunk from a row of the chunk metadata table."""
+        return DocumentChunk(chunk_id=int(row.chunk_id), source=row.source, page=int(row.page), text=row.text)
+
+    def _open(self) -> None:
+        """Open the index stored in index_dir with memory mapping, or start an empty index if there is none."""
+
+        index_path = os.path.join(self.index_dir, _INDEX_FILE)
+        manifest_path = os.path.join(self.index_dir, _MANIFEST_FILE)
+        if not os.path.exists(manifest_path):
+            if self.index_params is None:
+                self.index_params = VectorIndexParams()
+            self._index = None
+            self._is_built = False
+            self._chunks = pd.DataFrame(
+                {
+                    "chunk_id": pd.Series(dtype="int64"),
+                    "source": pd.Series(dtype="str"),
+                    "source_hash": pd.Series(dtype="str"),
+                    "page": pd.Series(dtype="int64"),
+                    "text": pd.Series(dtype="str"),
+                }
+            ).set_index("chunk_id", drop=False)
+            self._is_mmap = False
+            return
+
+        with open(manifest_path, "r", encoding="utf-8") as file:
+            manifest = json.load(file)
+        if manifest["embedding_model_id"] != self.embedding_model.embedding_model_id:
+            raise RuntimeError(
+                f"Index in {self.index_dir} was built with embedding model {manifest['embedding_model_id']}, "
+                f"it cannot be searched using {self.embedding_model.embedding_model_id}."
+            )
+        if manifest["chunk_size"] != self.chunk_size or manifest["chunk_overlap"] != self.chunk_overlap:
+            raise RuntimeError(
+                f"Index in {self.index_dir} was built with chunk size {manifest['chunk_size']} and overlap "
+                f"{manifest['chunk_overlap']}, it cannot be extended with chunk size {self.chunk_size} "
+                f"and overlap {self.chunk_overlap}."
+            )
+
+        stored_params = VectorIndexParams.from_dict(manifest["index_params"])
+        if self.index_params is None:
+            self.index_params = stored_params
+        elif not self.index_params.is_compatible(stored_params):
+            raise RuntimeError(
+                f"Index in {self.index_dir} was built with parameters {stored_params}, "
+                f"use rebuild to change them to {self.index_params}."
+            )
+        self._is_built = manifest["is_built"]
+
+        read_flags = self._get_active_params().get_read_flags()
+        self._index = faiss.read_index(index_path, read_flags) if os.path.exists(index_path) else None
+        self._is_mmap = self._index is not None
+        self._chunks = pd.read_parquet(os.path.join(self.index_dir, _CHUNKS_FILE)).set_index("chunk_id", drop=False)
+
+    def _ensure_writable(self, vectors: Optional[np.ndarray]) -> None:
+        """Read memory-mapped index into RAM, or create the index for the dimension of the vectors
+        (the caller must hold the lock)."""
+
+        if self._is_mmap:
+            self._index = faiss.read_index(os.path.join(self.index_dir, _INDEX_FILE))
+            self._is_mmap = False
+        elif self._index is None and vectors is not None:
+            self._is_built = not self.index_params.requires_training()
+            self._index = self._get_active_params().create_index(vectors.shape[1])
+
+    def _remove_source(self, source: str) -> None:
+        """Remove chunks of the document from the index, indexes that do not support removal are copied
+        without them (the caller must hold the lock)."""
+
+        removed = self._chunks["source"] == source
+        if removed.any():
+            removed_ids = self._chunks.loc[removed, "chunk_id"].to_numpy(np.int64)
+            try:
+                self._index.remove_ids(removed_ids)
+            except RuntimeError:
+                self._index = self._copy_index(self._get_active_params(), exclude_ids=removed_ids)
+            self._chunks = self._chunks.loc[~removed]
+
+    def _copy_index(self, params: VectorIndexParams, *, exclude_ids: Optional[np.ndarray] = None) -> Any:
+        """New index with the specified parameters, trained if required, that contains the vectors
+        of the current index (the caller must hold the lock)."""
+
+        ids = faiss.vector_to_array(self._index.id_map)
+        vectors = self._index.index.reconstruct_n(0, self._index.ntotal)
+        if exclude_ids is not None:
+            kept = ~np.isin(ids, exclude_ids)
+            ids = ids[kept]
+            vectors = vectors[kept]
+
+        index = params.create_index(self._index.d)
+        if params.requires_training():
+            try:
+                index.train(vectors)
+            except RuntimeError as e:
+                raise RuntimeError(f"Index with parameters {params} cannot be trained on {len(vectors)} vectors: {e}")
+        index.add_with_ids(vectors, ids)
+        return index
+
+    def _get_active_params(self) -> VectorIndexParams:
+        """Parameters of the current index, which is flat until the index is trained."""
+        return self.index_params if self._is_built else _STAGING_PARAMS
+
+    def _save(self) -> None:
+        """Write index, chunks and manifest, each file is replaced only after it has been written completely
+        (the caller must hold the lock)."""
+
+        os.makedirs(self.index_dir, exist_ok=True)
+        if self._index is not None:
+            faiss.write_index(self._index, os.path.join(self.index_dir, _INDEX_FILE + ".tmp"))
+            os.replace(os.path.join(self.index_dir, _INDEX_FILE + ".tmp"), os.path.join(self.index_dir, _INDEX_FILE))
+        self._chunks.to_parquet(os.path.join(self.index_dir, _CHUNKS_FILE + ".tmp"), index=False)
+        os.replace(os.path.join(self.index_dir, _CHUNKS_FILE + ".tmp"), os.path.join(self.index_dir, _CHUNKS_FILE))
+
+        manifest = {
+            "embedding_model_id": self.embedding_model.embedding_model_id,
+            "chunk_size": self.chunk_size,
+            "chunk_overlap": self.chunk_overlap,
+            "index_params": self.index_params.to_dict(),
+            "is_built": self._is_built,
+        }
+        with open(os.path.join(self.index_dir, _MANIFEST_FILE + ".tmp"), "w", encoding="utf-8") as file:
+            json.dump(manifest, file, indent=4)
+        os.replace(os.path.join(self.index_dir, _MANIFEST_FILE + ".tmp"), os.path.join(self.index_dir, _MANIFEST_FILE))
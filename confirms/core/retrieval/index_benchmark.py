@@ -0,0 +1,87 @@
+# Copyright (C) 2023-present The Project Contributors
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#    http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+import time
+from dataclasses import dataclass, field
+from typing import List
+
+import faiss
+import numpy as np
+import pandas as pd
+
+from confirms.core.retrieval.vector_index_params import VectorIndexParams
+
+
+@dataclass
+class IndexBenchmark:
+    """Compares recall and query latency of index types against exact search with a flat index.
+
+    Recall is the fraction of the exact top_k neighbors returned by the index, averaged over queries.
+    Latency is measured for one query at a time, which is how chunks are retrieved for a confirmation.
+    """
+
+    top_k: int = field(default=10)
+    """Number of neighbors retrieved for each query."""
+
+    repeat: int = field(default=1)
+    """Number of times each query is timed, the median is recorded."""
+
+    def run(self, vectors: np.ndarray, queries: np.ndarray, params_list: List[VectorIndexParams]) -> pd.DataFrame:
+        """Build index for each parameters from the vectors and search it with the queries,
+        return DataFrame with one row per parameters."""
+
+        vectors = np.ascontiguousarray(vectors, dtype=np.float32)
+        queries = np.ascontiguousarray(queries, dtype=np.float32)
+        ids = np.arange(len(vectors), dtype=np.int64)
+
+        exact_index = faiss.IndexFlatL2(vectors.shape[1])
+        exact_index.add(vectors)
+        _, exact_ids = exact_index.search(queries, self.top_k)
+
+        rows = []
+        for params in params_list:
+            start = time.perf_counter()
+            index = params.create_index(vectors.shape[1])
+            if params.requires_training():
+                index.train(vectors)
+            index.add_with_ids(vectors, ids)
+            build_sec = time.perf_counter() - start
+
+            search_params = params.get_search_parameters()
+            latencies_sec = []
+            found_ids = []
+            for query in queries:
+                query_latencies_sec = []
+                for _ in range(self.repeat):
+                    start = time.perf_counter()
+                    _, query_ids = index.search(query[None, :], self.top_k, params=search_params)
+                    query_latencies_sec.append(time.perf_counter() - start)
+                latencies_sec.append(np.median(query_latencies_sec))
+                found_ids.append(query_ids[0])
+
+            recall = np.mean(
+                [len(np.intersect1d(found, exact)) / len(exact) for found, exact in zip(found_ids, exact_ids)]
+            )
+            rows.append(
+                {
+                    "index_type": params.index_type.value,
+                    "factory_string": params.get_factory_string(vectors.shape[1]),
+                    "build_sec": build_sec,
+                    f"recall_at_{self.top_k}": recall,
+                    "p50_ms": 1000.0 * np.percentile(latencies_sec, 50),
+                    "p99_ms": 1000.0 * np.percentile(latencies_sec, 99),
+                    "index_bytes": len(faiss.serialize_index(index)),
+                }
+            )
+        return pd.DataFrame(rows)
@@ -0,0 +1,130 @@
+# Copyright (C) 2023-present The Project Contributors
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#    http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+import dataclasses
+from dataclasses import dataclass, field
+from typing import Any, Dict, Optional
+
+import faiss
+
+from confirms.core.retrieval.vector_index_type import VectorIndexType
+
+_BUILD_FIELDS = ["index_type", "nlist", "pq_m", "pq_bits", "hnsw_m", "ef_construction"]
+"""Parameters that determine the stored index, other parameters only affect search and may be changed."""
+
+
+@dataclass
+class VectorIndexParams:
+    """Type and parameters of the FAISS index that stores chunk vectors."""
+
+    index_type: VectorIndexType = field(default=VectorIndexType.FLAT)
+    """Type of the index."""
+
+    nlist: int = field(default=1024)
+    """Number of inverted lists for IVF_PQ."""
+
+    pq_m: int = field(default=None)
+    """Number of product quantizer codes per vector for IVF_PQ, must divide the dimension,
+    defaults to the largest divisor of the dimension not exceeding a quarter of it if not set."""
+
+    pq_bits: int = field(default=8)
+    """Bits per product quantizer code for IVF_PQ."""
+
+    hnsw_m: int = field(default=32)
+    """Number of graph neighbors per vector for HNSW."""
+
+    ef_construction: int = field(default=40)
+    """Candidate list size when adding vectors to HNSW."""
+
+    nprobe: int = field(default=16)
+    """Number of inverted lists searched for IVF_PQ."""
+
+    ef_search: int = field(default=64)
+    """Candidate list size when searching HNSW."""
+
+    min_train_size: int = field(default=None)
+    """Number of vectors from which the index is trained for IVF_PQ and SQ8, vectors are kept in a flat index
+    until then, defaults to 39 vectors per inverted list for IVF_PQ and 1000 for SQ8 if not set."""
+
+    def requires_training(self) -> bool:
+        """True if the index must be trained on a sample of vectors before vectors are added."""
+        return self.index_type in (VectorIndexType.IVF_PQ, VectorIndexType.SQ8)
+
+    def get_min_train_size(self) -> int:
+        """Number of vectors from which the index is trained, zero if training is not required."""
+
+        if self.min_train_size is not None:
+            return self.min_train_size
+        if self.index_type == VectorIndexType.IVF_PQ:
+            return 39 * self.nlist
+        if self.index_type == VectorIndexType.SQ8:
+            return 1000
+        return 0
+
+    def get_factory_string(self, dimension: int) -> str:
+        """FAISS index factory string for vectors of the dimension."""
+
+        if self.index_type == VectorIndexType.FLAT:
+            return "Flat"
+        if self.index_type == VectorIndexType.IVF_PQ:
+            pq_m = self.pq_m
+            if pq_m is None:
+                pq_m = max(m for m in range(1, max(1, dimension // 4) + 1) if dimension % m == 0)
+            elif dimension % pq_m != 0:
+                raise RuntimeError(f"Number of product quantizer codes {pq_m} does not divide dimension {dimension}.")
+            return f"IVF{self.nlist},PQ{pq_m}x{self.pq_bits}"
+        if self.index_type == VectorIndexType.HNSW:
+            return f"HNSW{self.hnsw_m}"
+        if self.index_type == VectorIndexType.SQ8:
+            return "SQ8"
+        raise RuntimeError(f"Unknown vector index type {self.index_type}.")
+
+    def create_index(self, dimension: int) -> Any:
+        """Empty index with chunk ids for vectors of the dimension, untrained if training is required."""
+
+        index = faiss.index_factory(dimension, self.get_factory_string(dimension))
+        if self.index_type == VectorIndexType.HNSW:
+            index.hnsw.efConstruction = self.ef_construction
+        return faiss.IndexIDMap2(index)
+
+    def get_search_parameters(self, selector: Optional[Any] = None) -> Any:
+        """FAISS search parameters with optional chunk id selector."""
+
+        if self.index_type == VectorIndexType.IVF_PQ:
+            return faiss.SearchParametersIVF(sel=selector, nprobe=self.nprobe)
+        if self.index_type == VectorIndexType.HNSW:
+            return faiss.SearchParametersHNSW(sel=selector, efSearch=self.ef_search)
+        return faiss.SearchParameters(sel=selector)
+
+    def get_read_flags(self) -> int:
+        """Flags for reading the index memory-mapped, inverted lists are mapped with IO_FLAG_MMAP
+        and flat vectors require IO_FLAG_MMAP_IFC in newer FAISS versions."""
+
+        flags = faiss.IO_FLAG_MMAP | faiss.IO_FLAG_READ_ONLY
+        if self.index_type != VectorIndexType.IVF_PQ:
+            flags |= getattr(faiss, "IO_FLAG_MMAP_IFC", 0)
+        return flags
+
+    def is_compatible(self, other: "VectorIndexParams") -> bool:
+        """True if an index built with other parameters can be used with these parameters."""
+        return all(getattr(self, name) == getattr(other, name) for name in _BUILD_FIELDS)
+
+    def to_dict(self) -> Dict[str, Any]:
+        """Parameters as a dictionary that can be serialized to JSON."""
+        return dict(dataclasses.asdict(self), index_type=self.index_type.value)
+
+    @staticmethod
+    def from_dict(params: Dict[str, Any]) -> "VectorIndexParams":
+        """Parameters from a dictionary created by to_dict."""
+        return VectorIndexParams(**dict(params, index_type=VectorIndexType(params["index_type"])))
@@ -0,0 +1,31 @@
+# Copyright (C) 2023-present The Project Contributors
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#    http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+from enum import Enum
+
+
+class VectorIndexType(Enum):
+    """Type of FAISS index that stores chunk vectors."""
+
+    FLAT = "flat"
+    """Exact search over uncompressed vectors."""
+
+    IVF_PQ = "ivf_pq"
+    """Inverted file with product-quantized vectors, searches the nearest lists only and requires training."""
+
+    HNSW = "hnsw"
+    """Hierarchical navigable small world graph over uncompressed vectors."""
+
+    SQ8 = "sq8"
+    """Exact search over vectors quantized to 8 bits per dimension, requires training."""
@@ -0,0 +1,79 @@
+# Copyright (C) 2023-present The Project Contributors
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#    http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+import datetime as dt
+from typing import Any, Iterator, Sequence, Union, overload
+
+import numpy as np
+
+_EPOCH_ORDINAL = dt.date(1970, 1, 1).toordinal()
+
+
+class DateColumnView(Sequence[dt.date]):
+    """Read-only sequence of dates backed by a slice of an int32 array of days since 1970-01-01.
+
+    Used in place of List[dt.date] without creating a date object per element, the backing
+    array is shared rather than copied.
+    """
+
+    __slots__ = ("days",)
+
+    def __init__(self, days: np.ndarray):
+        """Create view of int32 day numbers, the array is not copied."""
+        self.days = days
+
+    @staticmethod
+    def to_days(dates: Any) -> np.ndarray:
+        """Convert dates as datetime64, dt.date or ISO 8601 strings to int32 days since 1970-01-01."""
+        return np.asarray(dates, dtype="datetime64[D]").astype(np.int64).astype(np.int32)
+
+    def to_numpy(self) -> np.ndarray:
+        """Dates as a new datetime64[D] array."""
+        return self.days.astype("datetime64[D]")
+
+    def __len__(self) -> int:
+        """Number of dates."""
+        return len(self.days)
+
+    @overload
+    def __getitem__(self, index: int) -> dt.date:
+        ...
+
+    @overload
+    def __getitem__(self, index: slice) -> "DateColumnView":
+        ...
+
+    def __getitem__(self, index: Union[int, slice]) -> Union[dt.date, "DateColumnView"]:
+        """Date at the index, or view of the slice without copying."""
+
+        if isinstance(index, slice):
+            return DateColumnView(self.days[index])
+        return dt.date.fromordinal(_EPOCH_ORDINAL + int(self.days[index]))
+
+    def __iter__(self) -> Iterator[dt.date]:
+        """Iterate over dates."""
+        return iter(self.to_numpy().tolist())
+
+    def __eq__(self, other: Any) -> bool:
+        """Compare with another view or with a sequence of dates."""
+
+        if isinstance(other, DateColumnView):
+            return np.array_equal(self.days, other.days)
+        if isinstance(other, Sequence):
+            return list(self) == list(other)
+        return NotImplemented
+
+    def __repr__(self) -> str:
+        """Dates in ISO 8601 format."""
+        return f"DateColumnView([{', '.join(str(date) for date in self)}])"
@@ -0,0 +1,32 @@
+# Copyright (C) 2023-present The Project Contributors
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#    http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+import datetime as dt
+from dataclasses import dataclass, field
+
+from confirms.core.schedule.payment_frequency import PaymentFrequency
+
+
+@dataclass
+class InterestScheduleParams:
+    """Parameters from which ScheduleGenerator generates interest schedule for a single trade."""
+
+    first_unadjusted_payment_date: dt.date = field(default=None)
+    """First unadjusted payment date using ISO 8601 date format yyyy-mm-dd."""
+
+    last_unadjusted_payment_date: dt.date = field(default=None)
+    """Last unadjusted payment date using ISO 8601 date format yyyy-mm-dd."""
+
+    payment_frequency: PaymentFrequency = field(default=None)
+    """Payment frequency expressed as the number of months followed by capital M"""
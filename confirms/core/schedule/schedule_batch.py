@@ -0,0 +1,145 @@
+# Copyright (C) 2023-present The Project Contributors
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#    http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+import dataclasses
+from dataclasses import dataclass, field
+from typing import List, Optional, Sequence
+
+import numpy as np
+import pyarrow as pa
+
+from confirms.core.schedule.date_column_view import DateColumnView
+from confirms.core.schedule.payment_schedule import PaymentSchedule
+from confirms.core.schedule.schedule_view import ScheduleView
+
+DATE_COLUMNS = ("payment_date", "unadj_start", "unadj_end", "adj_start", "adj_end")
+"""Names of date columns, matching the list-typed attributes of InterestSchedule."""
+
+
+@dataclass(slots=True)
+class ScheduleBatch:
+    """Schedules for many trades stored as contiguous int32 arrays of days since 1970-01-01.
+
+    Periods of trade i are located at positions offsets[i] to offsets[i + 1] of each date column.
+    Columns other than payment_date are None for batches of payment schedules.
+    """
+
+    offsets: np.ndarray = field(default=None)
+    """Start position of each trade's periods as int32, with total number of periods appended at the end."""
+
+    payment_date: np.ndarray = field(default=None)
+    """Payment dates."""
+
+    unadj_start: np.ndarray = field(default=None)
+    """Unadjusted accrual start dates."""
+
+    unadj_end: np.ndarray = field(default=None)
+    """Unadjusted accrual end dates."""
+
+    adj_start: np.ndarray = field(default=None)
+    """Adjusted accrual start dates."""
+
+    adj_end: np.ndarray = field(default=None)
+    """Adjusted accrual end dates."""
+
+    @staticmethod
+    def from_schedules(schedules: Sequence[PaymentSchedule]) -> "ScheduleBatch":
+        """Pack schedules into columns, only columns that are set in all schedules are included."""
+
+        counts = np.array([len(schedule.payment_date) for schedule in schedules], dtype=np.int32)
+        offsets = np.zeros(len(schedules) + 1, dtype=np.int32)
+        np.cumsum(counts, out=offsets[1:])
+
+        columns = {}
+        for name in DATE_COLUMNS:
+            column_values = [getattr(schedule, name, None) for schedule in schedules]
+            if all(values is not None for values in column_values):
+                if any(len(values) != count for values, count in zip(column_values, counts)):
+                    raise RuntimeError(f"Length of {name} does not match the number of payment dates.")
+                dates = [date for values in column_values for date in values]
+                columns[name] = DateColumnView.to_days(np.array(dates, dtype="datetime64[D]"))
+        return ScheduleBatch(offsets=offsets, **columns)
+
+    @staticmethod
+    def from_arrow(table: pa.Table) -> "ScheduleBatch":
+        """Create batch from a table with one row per trade and list<date32> columns, the data is not copied
+        when each column is a single chunk with the same offsets and no nulls."""
+
+        columns = {}
+        offsets = None
+        for name in DATE_COLUMNS:
+            if name not in table.column_names:
+                continue
+            chunked_column = table.column(name)
+            column = chunked_column.chunk(0) if chunked_column.num_chunks == 1 else chunked_column.combine_chunks()
+            column_offsets = column.offsets.to_numpy(zero_copy_only=True)
+            if offsets is None:
+                offsets = column_offsets - column_offsets[0]
+            elif not np.array_equal(offsets, column_offsets - column_offsets[0]):
+                raise RuntimeError(f"Column {name} has different number of periods from payment_date.")
+            values = column.flatten().view(pa.int32())
+            columns[name] = values.to_numpy(zero_copy_only=True)
+        if offsets is None:
+            raise RuntimeError("Table does not contain schedule date columns.")
+        return ScheduleBatch(offsets=offsets.astype(np.int32, copy=False), **columns)
+
+    def __len__(self) -> int:
+        """Number of trades."""
+        return len(self.offsets) - 1
+
+    def get_period_count(self) -> np.ndarray:
+        """Number of periods for each trade."""
+        return np.diff(self.offsets)
+
+    def get_trade_index(self) -> np.ndarray:
+        """Trade index for each period."""
+        return np.repeat(np.arange(len(self)), self.get_period_count())
+
+    def get_column(self, name: str, trade_index: int) -> Optional[DateColumnView]:
+        """View of the dates in the column for a single trade without copying, or None if the column is not set."""
+
+        days = getattr(self, name)
+        if days is None:
+            return None
+        return DateColumnView(days[self.offsets[trade_index] : self.offsets[trade_index + 1]])
+
+    def get_view(self, trade_index: int) -> ScheduleView:
+        """Schedule for a single trade whose date attributes are views of the batch columns."""
+        return ScheduleView(self, trade_index)
+
+    def get_schedule(self, trade_index: int) -> PaymentSchedule:
+        """Schedule for a single trade with dates copied to lists of dt.date, see ScheduleView.to_schedule."""
+        return self.get_view(trade_index).to_schedule()
+
+    def get_schedules(self) -> List[PaymentSchedule]:
+        """Schedules for all trades with dates copied to lists of dt.date."""
+        return [self.get_schedule(trade_index) for trade_index in range(len(self))]
+
+    def to_arrow(self) -> pa.Table:
+        """Table with one row per trade and list<date32> column for each date column, the data is not copied."""
+
+        offsets = pa.array(self.offsets, type=pa.int32())
+        arrays = {}
+        for name in DATE_COLUMNS:
+            days = getattr(self, name)
+            if days is not None:
+                days = np.ascontiguousarray(days, dtype=np.int32)
+                values = pa.Array.from_buffers(pa.date32(), len(days), [None, pa.py_buffer(days)])
+                arrays[name] = pa.ListArray.from_arrays(offsets, values)
+        return pa.table(arrays)
+
+    def get_nbytes(self) -> int:
+        """Memory used by offsets and date columns in bytes."""
+        arrays = [getattr(self, item.name) for item in dataclasses.fields(self)]
+        return sum(array.nbytes for array in arrays if array is not None)
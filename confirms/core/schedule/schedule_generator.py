@@ -0,0 +1,140 @@
+# Copyright (C) 2023-present The Project Contributors
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#    http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+import datetime as dt
+import re
+from dataclasses import dataclass, field
+from typing import Sequence, Union
+
+import numpy as np
+
+from confirms.core.calendar.business_calendar import BusinessCalendar
+from confirms.core.calendar.business_day_convention import BusinessDayConvention
+from confirms.core.schedule.date_column_view import DateColumnView
+from confirms.core.schedule.interest_schedule import InterestSchedule
+from confirms.core.schedule.interest_schedule_params import InterestScheduleParams
+from confirms.core.schedule.schedule_batch import ScheduleBatch
+
+DateInput = Union[dt.date, str, np.datetime64, Sequence[dt.date], Sequence[str], np.ndarray]
+"""Single date or sequence of dates as dt.date, ISO 8601 strings or datetime64."""
+
+
+@dataclass
+class ScheduleGenerator:
+    """Generates interest schedules from first and last unadjusted payment dates and payment frequency.
+
+    Dates are rolled backward from the last payment date on its day of month (capped at month end),
+    and the first payment date ends a short or regular front period. All trades in a batch are
+    generated together using datetime64 array arithmetic without per-trade Python loops.
+    """
+
+    calendar: BusinessCalendar = field(default=None)
+    """Business day calendar for adjusted dates, only weekends are non-business days if not set."""
+
+    business_day_convention: BusinessDayConvention = field(default=BusinessDayConvention.MODIFIED_FOLLOWING)
+    """Roll convention for adjusted dates."""
+
+    def generate(
+        self,
+        first_unadjusted_payment_date: DateInput,
+        last_unadjusted_payment_date: DateInput,
+        payment_frequency: Union[str, Sequence[str]],
+    ) -> ScheduleBatch:
+        """Generate schedules for one or many trades, a single value of any argument applies to all trades.
+
+        The accrual start of the first period is one regular period before the first payment date.
+        """
+
+        first = np.atleast_1d(np.asarray(first_unadjusted_payment_date, dtype="datetime64[D]"))
+        last = np.atleast_1d(np.asarray(last_unadjusted_payment_date, dtype="datetime64[D]"))
+        freq = self.get_frequency_months(payment_frequency)
+        first, last, freq = np.broadcast_arrays(first, last, freq)
+        if np.any(last < first):
+            raise RuntimeError("Last unadjusted payment date is before first unadjusted payment date.")
+
+        first_month = first.astype("datetime64[M]")
+        last_month = last.astype("datetime64[M]")
+        roll_day = (last - last_month).astype(np.int64) + 1
+
+        # Regular dates are rolled back from the last date, and the first date is prepended
+        # as stub when it does not fall in the month of a regular date
+        month_span = (last_month - first_month).astype(np.int64)
+        regular_count = month_span // freq + 1
+        period_count = regular_count + (month_span % freq != 0)
+        offsets = np.zeros(len(first) + 1, dtype=np.int64)
+        np.cumsum(period_count, out=offsets[1:])
+
+        periods_to_last = np.repeat(offsets[1:] - 1, period_count) - np.arange(offsets[-1])
+        payment_month = np.repeat(last_month, period_count) - periods_to_last * np.repeat(freq, period_count)
+        unadj_end = self._roll_to_day(payment_month, np.repeat(roll_day, period_count))
+        unadj_end[offsets[:-1]] = first
+
+        # Each period starts at the end of the previous one, the first starts one regular period earlier
+        unadj_start = np.empty_like(unadj_end)
+        unadj_start[1:] = unadj_end[:-1]
+        unadj_start[offsets[:-1]] = self._roll_to_day(first_month - freq, (first - first_month).astype(np.int64) + 1)
+
+        adj_end = self.adjust(unadj_end)
+        return ScheduleBatch(
+            offsets=offsets.astype(np.int32),
+            payment_date=DateColumnView.to_days(adj_end),
+            unadj_start=DateColumnView.to_days(unadj_start),
+            unadj_end=DateColumnView.to_days(unadj_end),
+            adj_start=DateColumnView.to_days(self.adjust(unadj_start)),
+            adj_end=DateColumnView.to_days(adj_end),
+        )
+
+    def generate_one(
+        self, first_unadjusted_payment_date: DateInput, last_unadjusted_payment_date: DateInput, payment_frequency: str
+    ) -> InterestSchedule:
+        """Generate schedule for a single trade, accepts the parameters of get_interest_schedule function schema."""
+        batch = self.generate(first_unadjusted_payment_date, last_unadjusted_payment_date, payment_frequency)
+        return batch.get_schedule(0)
+
+    def generate_from_params(self, params: InterestScheduleParams) -> InterestSchedule:
+        """Generate schedule for a single trade from parameters decoded from model output."""
+        return self.generate_one(
+            params.first_unadjusted_payment_date, params.last_unadjusted_payment_date, params.payment_frequency.value
+        )
+
+    def adjust(self, dates: np.ndarray) -> np.ndarray:
+        """Adjust dates to business days using the calendar and business day convention."""
+
+        if self.calendar is None:
+            self.calendar = BusinessCalendar(name="Weekends")
+        return self.calendar.adjust(dates, self.business_day_convention)
+
+    @staticmethod
+    def get_frequency_months(payment_frequency: Union[str, Sequence[str]]) -> np.ndarray:
+        """Number of months for each frequency in `<n>M` or `<n>Y` format, parsed once per distinct value."""
+
+        unique, inverse = np.unique(np.atleast_1d(np.asarray(payment_frequency, dtype=str)), return_inverse=True)
+        months = np.empty(len(unique), dtype=np.int64)
+        for index, frequency in enumerate(unique):
+            match = re.fullmatch(r"([1-9][0-9]*)([MY])", frequency)
+            if match is None:
+                raise RuntimeError(
+                    f"Payment frequency {frequency} is not in the format of number of months followed by M "
+                    f"or number of years followed by Y."
+                )
+            months[index] = int(match.group(1)) * (12 if match.group(2) == "Y" else 1)
+        return months[inverse]
+
+    @staticmethod
+    def _roll_to_day(month: np.ndarray, day: np.ndarray) -> np.ndarray:
+        """Dates in the specified months on the specified day of month, capped at the last day of month."""
+
+        month_start = month.astype("datetime64[D]")
+        days_in_month = ((month + 1).astype("datetime64[D]") - month_start).astype(np.int64)
+        return month_start + np.minimum(day, days_in_month) - 1
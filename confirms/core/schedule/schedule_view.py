@@ -0,0 +1,73 @@
+# Copyright (C) 2023-present The Project Contributors
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#    http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+from typing import TYPE_CHECKING
+
+from confirms.core.schedule.date_column_view import DateColumnView
+from confirms.core.schedule.interest_schedule import InterestSchedule
+from confirms.core.schedule.payment_schedule import PaymentSchedule
+
+if TYPE_CHECKING:
+    from confirms.core.schedule.schedule_batch import ScheduleBatch
+
+
+class ScheduleView:
+    """Schedule of a single trade in ScheduleBatch with the attributes of InterestSchedule.
+
+    Date attributes are DateColumnView instances over the batch columns, so creating a view
+    does not copy or convert any dates.
+    """
+
+    __slots__ = ("batch", "trade_index")
+
+    def __init__(self, batch: "ScheduleBatch", trade_index: int):
+        """Create view of the trade in the batch."""
+        self.batch = batch
+        self.trade_index = trade_index
+
+    @property
+    def payment_date(self) -> DateColumnView:
+        """Payment dates."""
+        return self.batch.get_column("payment_date", self.trade_index)
+
+    @property
+    def unadj_start(self) -> DateColumnView:
+        """Unadjusted accrual start dates."""
+        return self.batch.get_column("unadj_start", self.trade_index)
+
+    @property
+    def unadj_end(self) -> DateColumnView:
+        """Unadjusted accrual end dates."""
+        return self.batch.get_column("unadj_end", self.trade_index)
+
+    @property
+    def adj_start(self) -> DateColumnView:
+        """Adjusted accrual start dates."""
+        return self.batch.get_column("adj_start", self.trade_index)
+
+    @property
+    def adj_end(self) -> DateColumnView:
+        """Adjusted accrual end dates."""
+        return self.batch.get_column("adj_end", self.trade_index)
+
+    def to_schedule(self) -> PaymentSchedule:
+        """Copy dates to lists of dt.date in InterestSchedule, or in PaymentSchedule if the batch
+        contains payment dates only."""
+
+        dates = {}
+        for name in ("payment_date", "unadj_start", "unadj_end", "adj_start", "adj_end"):
+            column = self.batch.get_column(name, self.trade_index)
+            if column is not None:
+                dates[name] = list(column)
+        return InterestSchedule(**dates) if len(dates) > 1 else PaymentSchedule(**dates)
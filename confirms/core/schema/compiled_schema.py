@@ -0,0 +1,98 @@
+# Copyright (C) 2023-present The Project Contributors
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#    http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+import re
+from dataclasses import dataclass, field
+from typing import Any, Callable, Dict, List, Mapping
+
+import pandas as pd
+
+
+@dataclass(frozen=True)
+class CompiledSchema:
+    """GBNF grammar, function calling JSON schema and decoder derived from a parameters dataclass.
+
+    Model output in `name=value,name=value` format accepted by the grammar is decoded by a single
+    precompiled regular expression, and each value is converted to the type of its dataclass field.
+    """
+
+    params_class: type = field(default=None)
+    """Dataclass whose fields are the parameters."""
+
+    function_name: str = field(default=None)
+    """Function name in the function calling schema."""
+
+    grammar: str = field(default=None)
+    """GBNF grammar text that only accepts output the decoder can parse."""
+
+    function_schema: Dict[str, Any] = field(default=None)
+    """Function calling JSON schema for OpenAI API."""
+
+    pattern: re.Pattern = field(default=None)
+    """Regular expression for the entire output with a named group for each field."""
+
+    field_patterns: Dict[str, re.Pattern] = field(default=None)
+    """Regular expression for the value of each field."""
+
+    converters: Dict[str, Callable[[str], Any]] = field(default=None)
+    """Conversion of the value of each field from text to field type."""
+
+    date_fields: List[str] = field(default=None)
+    """Fields of date type, converted to datetime64 by `decode_series`."""
+
+    def decode(self, text: str) -> Any:
+        """Decode output in `name=value,...` format into the dataclass, raises RuntimeError if it is not valid."""
+
+        match = self.pattern.fullmatch(text.strip())
+        if match is None:
+            raise RuntimeError(f"Output does not match {self.function_name} parameters format: {text}")
+        return self._create(match.groupdict())
+
+    def decode_arguments(self, arguments: Mapping[str, Any]) -> Any:
+        """Decode function call arguments returned by OpenAI API into the dataclass,
+        raises RuntimeError if an argument is missing or not valid."""
+
+        values = {}
+        for name, field_pattern in self.field_patterns.items():
+            value = arguments.get(name)
+            if value is None:
+                raise RuntimeError(f"Function {self.function_name} argument {name} is missing.")
+            value = str(value).lower() if isinstance(value, bool) else str(value)
+            if field_pattern.fullmatch(value) is None:
+                raise RuntimeError(f"Function {self.function_name} argument {name} has invalid value {value}.")
+            values[name] = value
+        return self._create(values)
+
+    def decode_series(self, outputs: pd.Series) -> pd.DataFrame:
+        """Decode many outputs at once into a column for each field, values of outputs that do not match
+        the format are NaN and enum values are kept as text."""
+
+        df = outputs.astype(str).str.strip().str.extract(self.pattern)
+        for name in df.columns:
+            if name in self.date_fields:
+                df[name] = pd.to_datetime(df[name], format="%Y-%m-%d", errors="coerce")
+            elif self.converters[name] in (int, float):
+                df[name] = pd.to_numeric(df[name], errors="coerce")
+        return df
+
+    def _create(self, values: Mapping[str, str]) -> Any:
+        """Create dataclass from the text value of each field."""
+
+        kwargs = {}
+        for name, value in values.items():
+            try:
+                kwargs[name] = self.converters[name](value)
+            except ValueError as e:
+                raise RuntimeError(f"Parameter {name} of {self.function_name} has invalid value {value}: {e}")
+        return self.params_class(**kwargs)
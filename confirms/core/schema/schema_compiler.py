@@ -0,0 +1,191 @@
+# Copyright (C) 2023-present The Project Contributors
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#    http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+import ast
+import dataclasses
+import datetime as dt
+import inspect
+import re
+import textwrap
+import threading
+from dataclasses import dataclass, field
+from enum import Enum
+from typing import Any, Callable, Dict, List, Optional, Tuple, get_type_hints
+
+from confirms.core.schema.compiled_schema import CompiledSchema
+
+_DIGIT_RULE = ("digit", " | ".join(f'"{digit}"' for digit in range(10)))
+"""Rule for a single digit shared by rules for dates and numbers."""
+
+_SCALAR_TYPES = {
+    # Field type: (rule name, rule body, JSON schema type, value regex, converter)
+    str: ("text", "[^,\\n]+", "string", r"[^,\n]+", str),
+    int: ("integer", '"-"? digit+', "integer", r"-?[0-9]+", int),
+    float: ("number", '"-"? digit+ ("." digit+)?', "number", r"-?[0-9]+(?:\.[0-9]+)?", float),
+    bool: ("boolean", '"true" | "false"', "boolean", r"true|false", lambda value: value == "true"),
+    dt.date: (
+        "date",
+        'digit digit digit digit "-" digit digit "-" digit digit',
+        "string",
+        r"[0-9]{4}-[0-9]{2}-[0-9]{2}",
+        dt.date.fromisoformat,
+    ),
+}
+"""Grammar rule, JSON schema type, regular expression and converter for each supported scalar field type."""
+
+
+@dataclass
+class SchemaCompiler:
+    """Compiles parameters dataclasses into GBNF grammar, function calling JSON schema and decoder.
+
+    Field types may be str, int, float, bool, dt.date or Enum with string values, and the description
+    of each field is taken from its docstring. Every field is required and appears in the output in
+    the order of declaration. Compiled schemas are cached for each dataclass, function name and description.
+    """
+
+    _cache: Dict[Tuple[type, str, str], CompiledSchema] = field(default_factory=dict)
+    _lock: threading.Lock = field(default_factory=threading.Lock)
+
+    _instance = None
+    _instance_lock = threading.Lock()
+
+    @staticmethod
+    def instance() -> "SchemaCompiler":
+        """Process-wide compiler instance shared by all models."""
+
+        if SchemaCompiler._instance is None:
+            with SchemaCompiler._instance_lock:
+                if SchemaCompiler._instance is None:
+                    SchemaCompiler._instance = SchemaCompiler()
+        return SchemaCompiler._instance
+
+    def compile(
+        self, params_class: type, *, function_name: Optional[str] = None, description: Optional[str] = None
+    ) -> CompiledSchema:
+        """Compiled schema for the dataclass, function name defaults to the class name in snake case
+        and description to the class docstring."""
+
+        key = (params_class, function_name, description)
+        with self._lock:
+            compiled = self._cache.get(key)
+            if compiled is None:
+                compiled = self._compile(params_class, function_name=function_name, description=description)
+                self._cache[key] = compiled
+            return compiled
+
+    def _compile(
+        self, params_class: type, *, function_name: Optional[str], description: Optional[str]
+    ) -> CompiledSchema:
+        """Compile schema without caching."""
+
+        if not dataclasses.is_dataclass(params_class):
+            raise RuntimeError(f"Schema can only be compiled for a dataclass, {params_class.__name__} is not.")
+        if function_name is None:
+            function_name = re.sub(r"(?<!^)(?=[A-Z])", "_", params_class.__name__).lower()
+        if description is None:
+            description = inspect.cleandoc(params_class.__doc__ or "")
+
+        type_hints = get_type_hints(params_class)
+        field_docs = self._get_field_docs(params_class)
+        rules: Dict[str, str] = {}
+        root_items: List[str] = []
+        properties: Dict[str, Any] = {}
+        field_patterns: Dict[str, re.Pattern] = {}
+        converters: Dict[str, Callable[[str], Any]] = {}
+        date_fields: List[str] = []
+        for index, params_field in enumerate(dataclasses.fields(params_class)):
+            name = params_field.name
+            field_type = type_hints[name]
+            enum_values = None
+            if isinstance(field_type, type) and issubclass(field_type, Enum):
+                enum_values = [member.value for member in field_type]
+                if not all(isinstance(value, str) for value in enum_values):
+                    raise RuntimeError(f"Enum {field_type.__name__} of field {name} must have string values.")
+                rule_name = re.sub(r"(?<!^)(?=[A-Z])", "-", field_type.__name__).lower()
+                rules[rule_name] = " | ".join(f'"{value}"' for value in enum_values)
+                schema_type = "string"
+                # Longer values first so that a value is not matched by its prefix
+                value_regex = "|".join(re.escape(value) for value in sorted(enum_values, key=len, reverse=True))
+                converter = field_type
+            elif field_type in _SCALAR_TYPES:
+                rule_name, rule_body, schema_type, value_regex, converter = _SCALAR_TYPES[field_type]
+                rules[rule_name] = rule_body
+                if "digit" in rule_body:
+                    rules.setdefault(*_DIGIT_RULE)
+                if field_type is dt.date:
+                    date_fields.append(name)
+            else:
+                raise RuntimeError(f"Type {field_type} of field {name} is not supported by schema compiler.")
+
+            separator = "," if index > 0 else ""
+            root_items.append(f'"{separator}{name}=" {rule_name}')
+            properties[name] = {"type": schema_type, "description": field_docs.get(name, name)}
+            if enum_values is not None:
+                properties[name]["enum"] = enum_values
+            field_patterns[name] = re.compile(value_regex)
+            converters[name] = converter
+
+        # Digit rule is referenced by other rules, place it last
+        digit_rule = rules.pop(_DIGIT_RULE[0], None)
+        grammar_rules = [("root", " ".join(root_items))] + list(rules.items())
+        if digit_rule is not None:
+            grammar_rules.append((_DIGIT_RULE[0], digit_rule))
+        grammar = "".join(f"{rule_name:<14} ::= {rule_body}\n" for rule_name, rule_body in grammar_rules)
+
+        pattern = ",".join(
+            f"{re.escape(name)}=(?P<{name}>{field_pattern.pattern})" for name, field_pattern in field_patterns.items()
+        )
+        return CompiledSchema(
+            params_class=params_class,
+            function_name=function_name,
+            grammar=grammar,
+            function_schema={
+                "name": function_name,
+                "description": description,
+                "parameters": {
+                    "type": "object",
+                    "properties": properties,
+                    "required": list(properties.keys()),
+                },
+            },
+            pattern=re.compile(pattern),
+            field_patterns=field_patterns,
+            converters=converters,
+            date_fields=date_fields,
+        )
+
+    @staticmethod
+    def _get_field_docs(params_class: type) -> Dict[str, str]:
+        """Docstring of each field of the class and its base classes, read from the source code."""
+
+        field_docs = {}
+        for cls in reversed(params_class.__mro__):
+            if cls is object or not dataclasses.is_dataclass(cls):
+                continue
+            try:
+                source = textwrap.dedent(inspect.getsource(cls))
+            except (OSError, TypeError):
+                continue
+            class_def = ast.parse(source).body[0]
+            statements = class_def.body
+            for statement, next_statement in zip(statements, statements[1:]):
+                if (
+                    isinstance(statement, ast.AnnAssign)
+                    and isinstance(statement.target, ast.Name)
+                    and isinstance(next_statement, ast.Expr)
+                    and isinstance(next_statement.value, ast.Constant)
+                    and isinstance(next_statement.value.value, str)
+                ):
+                    field_docs[statement.target.id] = inspect.cleandoc(next_statement.value.value)
+        return field_docs
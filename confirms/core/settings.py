@@ -13,17 +13,21 @@
 # limitations under the License.
 
 import os
+import threading
 from pathlib import Path
 
-import openai
 from dataclasses import dataclass, field
-from typing import Optional
+from typing import List, Optional
 from dotenv import load_dotenv
 
 
 @dataclass(slots=True, init=False)
 class Settings:
-    """Default settings may be modified before the settings object is passed to the model."""
+    """Default settings may be modified before the settings object is passed to the model.
+
+    Use `Settings.instance()` to get process-wide settings that are loaded once, or create
+    a new instance to load settings that can be modified for a specific model.
+    """
 
     gpu_ram_gb: int = field(default=None)
     """GPU RAM in GB is used to determine if a given model can be offloaded to GPU."""
@@ -31,9 +35,30 @@ class Settings:
     model_dir: str = field(default=None)
     """Models are located in model_dir/model_name where model_name is either filename or directory name."""
 
+    model_pool_ram_gb: float = field(default=None)
+    """RAM budget in GB for models kept loaded in the model pool (no limit if not set)."""
+
+    prefix_cache_mb: float = field(default=None)
+    """RAM capacity in MB of the evaluated prompt state cache for each loaded llama.cpp model (disabled if zero)."""
+
+    prefix_cache_dir: str = field(default=None)
+    """If set, evaluated prompt states are also persisted in a subdirectory of this directory for each model."""
+
+    preload_model_types: List[str] = field(default=None)
+    """Local models loaded and warmed up by the preloader at process start."""
+
+    use_mlock: bool = field(default=None)
+    """Lock memory-mapped weights of local models in RAM so they are not paged out."""
+
+    llama_threads: int = field(default=None)
+    """Number of threads used by each local model (llama.cpp default of half the CPU count if not set)."""
+
     openai_api_key: str = field(default=None)
     """API key for OpenAI models."""
 
+    _instance = None
+    _instance_lock = threading.Lock()
+
     def __init__(self):
         """Load settings from the environment variables and .env file (environment variables take precedence)."""
 
@@ -41,12 +66,9 @@ class Settings:
         # Do not override the environment variables
         load_dotenv(override=False)
 
-        # Check environment variable first
-        self.gpu_ram_gb = int(os.getenv("CONFIRMS_GPU_RAM_GB"))
-
-        # If not set, set to 0
-        if self.gpu_ram_gb is None:
-            self.gpu_ram_gb = 0
+        # Check environment variable first, if not set use 0
+        gpu_ram_gb = os.getenv("CONFIRMS_GPU_RAM_GB")
+        self.gpu_ram_gb = int(gpu_ram_gb) if gpu_ram_gb is not None else 0
 
         # Check environment variable first
         self.model_dir = os.getenv("CONFIRMS_MODEL_DIR")
@@ -60,22 +82,54 @@ class Settings:
         if not os.path.isdir(self.model_dir):
             RuntimeError(f"Path specified for model directory {self.model_dir} is not a directory.")
 
+        # Check environment variable first, if not set the model pool has no RAM limit
+        model_pool_ram_gb = os.getenv("CONFIRMS_MODEL_POOL_RAM_GB")
+        self.model_pool_ram_gb = float(model_pool_ram_gb) if model_pool_ram_gb is not None else None
+
+        # Check environment variables first, if not set use 2 GB RAM cache without persistence
+        prefix_cache_mb = os.getenv("CONFIRMS_PREFIX_CACHE_MB")
+        self.prefix_cache_mb = float(prefix_cache_mb) if prefix_cache_mb is not None else 2048.0
+        self.prefix_cache_dir = os.getenv("CONFIRMS_PREFIX_CACHE_DIR")
+
+        # Check environment variables first, if not set no models are preloaded and weights are not locked
+        preload_model_types = os.getenv("CONFIRMS_PRELOAD_MODELS")
+        self.preload_model_types = [
+            model_type.strip() for model_type in (preload_model_types or "").split(",") if model_type.strip()
+        ]
+        self.use_mlock = os.getenv("CONFIRMS_USE_MLOCK", "").lower() in ("1", "true", "yes")
+
+        # Check environment variable first, if not set llama.cpp chooses the number of threads
+        llama_threads = os.getenv("CONFIRMS_LLAMA_THREADS")
+        self.llama_threads = int(llama_threads) if llama_threads is not None else None
+
         # Package: OpenAI
 
+        # OpenAI key is passed to each call rather than set globally,
+        # so that code with different settings can run in parallel
         self.openai_api_key = os.getenv("OPENAI_API_KEY")
 
-        # Set OpenAI key explicitly because it does not automatically load the variables set by load_dotenv()
-        # TODO: Pass OpenAI key to each method to allow code with different settings to run in parallel
-        openai.api_key = self.openai_api_key
+    @staticmethod
+    def instance() -> "Settings":
+        """Process-wide settings read from .env file or environment variables on first call only."""
+
+        if Settings._instance is None:
+            with Settings._instance_lock:
+                if Settings._instance is None:
+                    Settings._instance = Settings()
+        return Settings._instance
 
     @staticmethod
-    def load() -> None:
-        """Syntactic sugar for creating an instance of Settings class to read .env file
-        or environment variable and set global settings such as OpenAI key."""
+    def reload() -> "Settings":
+        """Read .env file and environment variables again and replace the process-wide settings."""
 
-        # Creating the object reads from .env or environment variables
-        # and sets global settings such as OpenAI key.
-        Settings()
+        with Settings._instance_lock:
+            Settings._instance = Settings()
+        return Settings._instance
+
+    @staticmethod
+    def load() -> "Settings":
+        """Syntactic sugar for `Settings.instance()`, kept for backward compatibility."""
+        return Settings.instance()
 
     def get_model_path(self, model_name: str, *, check_exists: Optional[bool] = True) -> str:
         """Get model path from model name using model_dir or its default value project_root/models,
@@ -0,0 +1,33 @@
+# Copyright (C) 2023-present The Project Contributors
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#    http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+from dataclasses import dataclass, field
+
+from confirms.core.stream.stop_predicate import StopPredicate
+
+
+@dataclass(frozen=True)
+class MaxWordsStopPredicate(StopPredicate):
+    """Stops once the streamed text contains the specified number of complete words."""
+
+    max_words: int = field(default=1)
+    """Number of words after which generation stops, a word is complete when followed by whitespace."""
+
+    def is_stopped(self, text: str) -> bool:
+        """Return True if the streamed text contains max_words complete words."""
+
+        words = text.split()
+        if len(words) > self.max_words:
+            return True
+        return len(words) == self.max_words and text[-1].isspace()
@@ -0,0 +1,42 @@
+# Copyright (C) 2023-present The Project Contributors
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#    http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+import re
+from dataclasses import dataclass, field
+from typing import Union
+
+from confirms.core.stream.stop_predicate import StopPredicate
+
+
+@dataclass(frozen=True)
+class RegexStopPredicate(StopPredicate):
+    """Stops when the regular expression is found in the streamed text (e.g. the first frequency word)."""
+
+    pattern: Union[str, re.Pattern] = field(default=None)
+    """Regular expression searched in the streamed text, case-insensitive when specified as a string."""
+
+    is_final_match: bool = field(default=False)
+    """By default the match must be followed by at least one more character, so that a word split across tokens
+    (e.g. `month` + `ly`) is not matched before it is complete. Set to True when a match cannot be extended."""
+
+    def __post_init__(self):
+        """Compile the pattern."""
+        if isinstance(self.pattern, str):
+            object.__setattr__(self, "pattern", re.compile(self.pattern, re.IGNORECASE))
+
+    def is_stopped(self, text: str) -> bool:
+        """Return True if the streamed text contains a complete match."""
+
+        match = self.pattern.search(text)
+        return match is not None and (self.is_final_match or match.end() < len(text))
@@ -0,0 +1,34 @@
+# Copyright (C) 2023-present The Project Contributors
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#    http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+from dataclasses import dataclass, field
+
+from confirms.core.schema.compiled_schema import CompiledSchema
+from confirms.core.stream.stop_predicate import StopPredicate
+
+
+@dataclass(frozen=True)
+class SchemaStopPredicate(StopPredicate):
+    """Stops as soon as the streamed text is a complete output of the compiled schema grammar.
+
+    The output is matched before the model emits the end of sequence token, so the value of
+    the last field must not be a prefix of another valid value (dates and enums are not).
+    """
+
+    schema: CompiledSchema = field(default=None)
+    """Compiled schema whose decoder must accept the streamed text."""
+
+    def is_stopped(self, text: str) -> bool:
+        """Return True if the streamed text can be decoded by the schema."""
+        return self.schema.pattern.fullmatch(text.strip()) is not None
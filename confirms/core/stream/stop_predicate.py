@@ -0,0 +1,23 @@
+# Copyright (C) 2023-present The Project Contributors
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#    http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+from abc import ABC, abstractmethod
+
+
+class StopPredicate(ABC):
+    """Decides from the text streamed so far that the answer is determined and generation can be cancelled."""
+
+    @abstractmethod
+    def is_stopped(self, text: str) -> bool:
+        """Return True if generation should stop after the streamed text."""
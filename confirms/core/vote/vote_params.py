@@ -0,0 +1,56 @@
+# Copyright (C) 2023-present The Project Contributors
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#    http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+import re
+from dataclasses import dataclass, field
+from typing import Callable, Optional
+
+from confirms.core.vote.vote_result import VoteResult
+
+
+def normalize_answer(answer: str) -> Optional[str]:
+    """Answer in lowercase without surrounding punctuation and with runs of whitespace replaced by a single space,
+    None if the answer is empty."""
+
+    normalized = re.sub(r"\s+", " ", answer.lower()).strip(" .,:;!?\"'`")
+    return normalized or None
+
+
+@dataclass
+class VoteParams:
+    """Parameters of voting mode, where completions are sampled until the leading answer is decided."""
+
+    max_samples: int = field(default=25)
+    """Maximum number of sampled answers."""
+
+    min_samples: int = field(default=3)
+    """Minimum number of sampled answers before sampling may stop."""
+
+    confidence: float = field(default=0.95)
+    """Sampling stops once the probability that the leading answer is more likely than the runner-up
+    reaches this value."""
+
+    normalize: Callable[[str], Optional[str]] = field(default=normalize_answer)
+    """Maps sampled answer to the value it votes for or to None if it does not vote (e.g. `extract` method
+    of an answer extractor), answers are compared in lowercase without surrounding punctuation if not set."""
+
+    def is_decided(self, result: VoteResult) -> bool:
+        """True if sampling can stop because the leading answer is decided, either with the specified
+        confidence or because the remaining samples cannot change it."""
+
+        if result.sample_count < self.min_samples or result.answer is None:
+            return False
+        if result.get_margin() > self.max_samples - result.sample_count:
+            return True
+        return result.confidence >= self.confidence
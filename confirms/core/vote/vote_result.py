@@ -0,0 +1,76 @@
+# Copyright (C) 2023-present The Project Contributors
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#    http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+import math
+from collections import Counter
+from dataclasses import dataclass, field
+from typing import List, Optional
+
+
+@dataclass
+class VoteResult:
+    """Answers sampled in voting mode and the leading normalized answer."""
+
+    answer: Optional[str] = field(default=None)
+    """Normalized answer with the most votes, None if no sampled answer could be normalized."""
+
+    votes: Counter = field(default_factory=Counter)
+    """Number of votes for each normalized answer."""
+
+    answers: List[str] = field(default_factory=list)
+    """Sampled answers before normalization in the order they were sampled."""
+
+    confidence: float = field(default=0.0)
+    """Posterior probability that the leading answer is more likely than the runner-up."""
+
+    is_decided: bool = field(default=False)
+    """True if sampling stopped because the leading answer was decided rather than because
+    the maximum number of samples was reached."""
+
+    @property
+    def sample_count(self) -> int:
+        """Number of sampled answers."""
+        return len(self.answers)
+
+    def add(self, answer: str, normalized: Optional[str]) -> None:
+        """Add sampled answer, which votes only if it could be normalized."""
+
+        self.answers.append(answer)
+        if normalized is not None:
+            self.votes[normalized] += 1
+        if self.votes:
+            self.answer = self.votes.most_common(1)[0][0]
+        self.confidence = self.get_confidence(self.votes)
+
+    def get_margin(self) -> int:
+        """Votes for the leading answer minus votes for the runner-up."""
+
+        counts = [count for _, count in self.votes.most_common(2)] + [0, 0]
+        return counts[0] - counts[1]
+
+    @staticmethod
+    def get_confidence(votes: Counter) -> float:
+        """Probability that the leading answer is more likely than the runner-up under uniform prior.
+
+        With a and b votes for the two leading answers, the posterior share of the leader among them
+        is Beta(a + 1, b + 1), and the probability that it exceeds one half equals the probability
+        of at most a successes in a + b + 1 fair coin flips.
+        """
+
+        counts = [count for _, count in votes.most_common(2)] + [0, 0]
+        a, b = counts[0], counts[1]
+        if a == 0:
+            return 0.0
+        n = a + b + 1
+        return sum(math.comb(n, k) for k in range(a + 1)) / 2**n
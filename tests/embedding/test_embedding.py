@@ -12,72 +12,77 @@
 # See the License for the specific language governing permissions and
 # limitations under the License.
 import os
+import re
 
 import pytest
-from langchain import FAISS
 from langchain.document_loaders import PyPDFLoader
 from langchain.embeddings import HuggingFaceEmbeddings, HuggingFaceInstructEmbeddings, OpenAIEmbeddings
-from langchain.schema.embeddings import Embeddings
 from langchain.text_splitter import RecursiveCharacterTextSplitter
 
+from confirms.core.embedding.batched_embedding_model import BatchedEmbeddingModel
+from confirms.core.embedding.cached_embedding_model import CachedEmbeddingModel
+from confirms.core.embedding.embedding_model import EmbeddingModel
+from confirms.core.embedding.lang_chain_embedding_model import LangChainEmbeddingModel
+from confirms.core.embedding.sentence_transformer_embedding_model import SentenceTransformerEmbeddingModel
+from confirms.core.retrieval.document_index import DocumentIndex
 from confirms.core.settings import Settings
 
 
-def run_similarity_search_for_document(embeddings: Embeddings, filename: str, query: str, chunk_size: int,
-                                       chunk_overlap: int, top_k: int = None):
+def run_similarity_search_for_document(index: DocumentIndex, filename: str, query: str, top_k: int = None):
     """
-    Perform similarity search on a PDF document.
+    Perform similarity search on a PDF document ingested into the index.
 
     Args:
-        embeddings (Embeddings): Embedding model.
+        index (DocumentIndex): Index into which the document has been ingested.
         filename (str): The path to the PDF file.
         query (str): The query string to search for similarity.
-        chunk_size (int): The size of text chunks for splitting the document.
-        chunk_overlap (int): The overlap between text chunks.
         top_k (int, optional): The number of top matching segments to retrieve. If None, retrieves all segments.
     """
-    # Load PDF document
-    document = PyPDFLoader(filename).load()
-    # Split text into chunks
-    text_splitter = RecursiveCharacterTextSplitter(chunk_size=chunk_size, chunk_overlap=chunk_overlap)
-    # Split document into segments
-    documents = text_splitter.split_documents(document)
-    # Create FAISS index
-    db = FAISS.from_documents(documents, embeddings, distance_strategy="EUCLIDEAN_DISTANCE")
-    # Perform similarity search
-    results = db.similarity_search_with_score(query, k=len(documents) if top_k is None else top_k)
+    # Perform similarity search within the document
+    results = index.search(query, top_k=index.get_size() if top_k is None else top_k, source=filename)
     # Display results
-    for result in results:
-        print(result[1]) # Similarity score
+    for chunk, score in results:
+        print(score) # Similarity score
         print('---------')
-        print(result[0].page_content)
+        print(chunk.text)
         print('---------') # Content of the segment
 
 
-def run_maturity_date_extraction(embeddings: Embeddings):
+def run_maturity_date_extraction(embedding_model: EmbeddingModel):
     file_path = 'test_embedding.pdf'
     if not os.path.isfile(file_path):
         raise Exception(f"The file '{file_path}' does not exist. Please add a file with this name in this directory.")
     chunk_size = 500
     chunk_overlap = 50
 
-    run_similarity_search_for_document(embeddings, file_path, 'Maturity Date:', chunk_size, chunk_overlap, 5)
+    # Chunks already embedded for another document or index are taken from the embedding cache
+    embedding_model = CachedEmbeddingModel(embedding_model=embedding_model)
+
+    # Index is persisted for each embedding model, the document is embedded only on first run or when it changes
+    index_name = re.sub(r"[^\w.-]", "_", embedding_model.embedding_model_id)
+    index_dir = os.path.join(os.path.dirname(__file__), "../../results/index", index_name)
+    index = DocumentIndex(
+        index_dir=index_dir, embedding_model=embedding_model, chunk_size=chunk_size, chunk_overlap=chunk_overlap
+    )
+    index.ingest_pdf(file_path)
+
+    run_similarity_search_for_document(index, file_path, 'Maturity Date:', 5)
     print('=====')
-    run_similarity_search_for_document(embeddings, file_path, 'What is maturity date?', chunk_size, chunk_overlap, 5)
+    run_similarity_search_for_document(index, file_path, 'What is maturity date?', 5)
     print('=====')
-    run_similarity_search_for_document(embeddings, file_path, 'Extract maturity date.', chunk_size, chunk_overlap, 5)
+    run_similarity_search_for_document(index, file_path, 'Extract maturity date.', 5)
 
 
 def test_maturity_date_extraction_hf():
     """Maturity date extraction test for hugging face embeddings"""
     embeddings = HuggingFaceEmbeddings(model_name="sentence-transformers/all-MiniLM-L6-v2")
-    run_maturity_date_extraction(embeddings)
+    run_maturity_date_extraction(LangChainEmbeddingModel(embeddings=embeddings))
 
 
 def test_maturity_date_extraction_instruct():
     """Maturity date extraction test for hugging face instruct embeddings"""
     embeddings = HuggingFaceInstructEmbeddings(model_name='hkunlp/instructor-xl')
-    run_maturity_date_extraction(embeddings)
+    run_maturity_date_extraction(LangChainEmbeddingModel(embeddings=embeddings))
 
 
 def test_maturity_date_extraction_ada():
@@ -85,7 +90,27 @@ def test_maturity_date_extraction_ada():
     # Load settings
     settings = Settings()
     embeddings = OpenAIEmbeddings(model="text-embedding-ada-002", openai_api_key=settings.openai_api_key)
-    run_maturity_date_extraction(embeddings)
+    run_maturity_date_extraction(LangChainEmbeddingModel(embeddings=embeddings))
+
+
+def test_batch_size_benchmark_hf():
+    """Chunks per second for each batch size of local embeddings on a CPU process pool"""
+    file_path = 'test_embedding.pdf'
+    if not os.path.isfile(file_path):
+        raise Exception(f"The file '{file_path}' does not exist. Please add a file with this name in this directory.")
+    pages = PyPDFLoader(file_path).load()
+    chunks = RecursiveCharacterTextSplitter(chunk_size=500, chunk_overlap=50).split_documents(pages)
+    texts = [chunk.page_content for chunk in chunks]
+
+    embedding_model = BatchedEmbeddingModel(
+        embedding_model=SentenceTransformerEmbeddingModel(model_name="sentence-transformers/all-MiniLM-L6-v2"),
+        max_workers=max(1, (os.cpu_count() or 1) // 2),
+        use_processes=True,
+    )
+    try:
+        print(embedding_model.benchmark(texts, [8, 16, 32, 64, 128]).to_string(index=False))
+    finally:
+        embedding_model.close()
 
 
 if __name__ == '__main__':
@@ -12,16 +12,21 @@
 # See the License for the specific language governing permissions and
 # limitations under the License.
 
+import datetime as dt
+import json
 import os
+import time
 from typing import Optional
 
 import pandas as pd
 import pytest
-from langchain import PromptTemplate
 
-from confirms.core.llm.gpt_lang_chain_llm import GptLangChainLlm
+from confirms.core.experiment.experiment_grid import ExperimentGrid
+from confirms.core.experiment.experiment_runner import ExperimentRunner
 from confirms.core.llm.gpt_native_llm import GptNativeLlm
 from confirms.core.llm.llama_lang_chain_llm import LlamaLangChainLlm
+from confirms.core.results.result_record import ResultRecord
+from confirms.core.results.results_store import ResultsStore
 
 SIMPLE_CONTEXT = (
     '```Effective Date: 15 June 2010.'
@@ -75,29 +80,22 @@ ONE_WORD_TEMPLATE = (
 def run_frequency_extraction(*, template: str, context: str, result_name: str, temperature: Optional[float] = None):
     """Function completion for payment frequency extraction."""
 
-    results = []
-    for seed in range(1, 26):
-        cur_result = {}
-        model_types = ["gpt-3.5-turbo", "gpt-4", "llama-2-7b-chat.Q4_K_M.gguf", "llama-2-13b-chat.Q4_K_M.gguf"]
-        # , "llama-2-70b-chat.Q4_K_M.gguf"]
-        for model_type in model_types:
-            if model_type.startswith("llama"):
-                llm = LlamaLangChainLlm(model_type=model_type, temperature=temperature, seed=seed)
-            elif model_type.startswith("gpt"):
-                llm = GptLangChainLlm(model_type=model_type, temperature=temperature)
-            else:
-                raise RuntimeError(f"Unknown model type: {model_type}")
-
-            prompt = PromptTemplate(template=template, input_variables=["context"])
-            answer = llm.completion(context, prompt=prompt)
-            cur_result[model_type] = answer
-        results.append(pd.DataFrame([cur_result]))
+    model_types = ["gpt-3.5-turbo", "gpt-4", "llama-2-7b-chat.Q4_K_M.gguf", "llama-2-13b-chat.Q4_K_M.gguf"]
+    # , "llama-2-70b-chat.Q4_K_M.gguf"]
+    grid = ExperimentGrid(
+        templates={result_name: template},
+        contexts={result_name: context},
+        model_types=model_types,
+        seeds=list(range(1, 26)),
+        temperatures=[temperature],
+    )
+
+    runner = ExperimentRunner(experiment=result_name)
+    runner.run(grid)
 
     outputs_dir = os.path.join(os.path.dirname(__file__), "../../results")
     output_path = os.path.join(outputs_dir, f"{result_name}.csv")
-
-    df = pd.concat(results)
-    df.to_csv(output_path, index=False)
+    runner.store.export_csv(result_name, output_path, model_types=model_types)
 
 
 def test_frequency_extraction_plain_simple():
@@ -157,17 +155,17 @@ def test_logit_processing():
     df = pd.read_csv(file_path)
     input_data = df['llama-2-7b-chat.Q4_K_M.gguf']
 
-    results = [input_data]
+    experiment = "frequency_logit_processing"
+    store = ResultsStore()
     model_types = ["gpt-3.5-turbo", "gpt-4", "llama-2-7b-chat.Q4_K_M.gguf", "llama-2-13b-chat.Q4_K_M.gguf"]
     for model_type in model_types:
-        current_result = []
         if model_type.startswith("llama"):
             llm = LlamaLangChainLlm(model_type=model_type, grammar_file="frequency_word.gbnf")
         elif model_type.startswith("gpt"):
             llm = GptNativeLlm(model_type=model_type, temperature=0.0)
         else:
             raise RuntimeError(f"Unknown model type: {model_type}")
-        for context in input_data:
+        for index, context in enumerate(input_data):
             question = (
                 "<s>[INST] Pay attention and remember information below, "
                 "which will help to answer the question or imperative after the context ends. "
@@ -175,19 +173,34 @@ def test_logit_processing():
                 "According to only the information in the document sources provided within the context above, "
                 "the payment frequency is [/INST]"
             )
+            started_at = dt.datetime.now(dt.timezone.utc)
+            start = time.perf_counter()
             if model_type.startswith("llama"):
                 answer = llm.completion(question)
-                current_result.append(answer)
-            elif model_type.startswith("gpt"):
-                answer = llm.function_completion(question)
-                current_result.append(answer['payment_frequency'])
-        results.append(pd.DataFrame(current_result))
+            else:
+                answer = llm.function_completion(question)['payment_frequency']
+            store.append(
+                ResultRecord(
+                    experiment=experiment,
+                    model_type=model_type,
+                    key=f"{model_type}|{index}",
+                    context_name=str(index),
+                    context=context,
+                    answer=answer,
+                    latency_sec=time.perf_counter() - start,
+                    started_at=started_at,
+                    generation_params=json.dumps(llm.get_generation_params(), sort_keys=True),
+                )
+            )
+    store.flush()
 
     outputs_dir = os.path.join(os.path.dirname(__file__), "../../results")
     output_path = os.path.join(outputs_dir, "frequency_logit_processing.csv")
 
-    df = pd.concat(results, axis=1)
-    df.columns = ['input'] + model_types
+    df = store.read(experiment, columns=["context_name", "model_type", "answer"], latest=True)
+    df = df.pivot(index="context_name", columns="model_type", values="answer")
+    df = df.set_index(df.index.astype(int)).sort_index()[model_types]
+    df.insert(0, "input", input_data.values)
     df.to_csv(output_path, index=False)
 
 
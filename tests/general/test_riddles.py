@@ -15,12 +15,30 @@
 import os
 from typing import Optional
 
-import pandas as pd
 import pytest
-from langchain import PromptTemplate
 
-from confirms.core.llm.gpt_lang_chain_llm import GptLangChainLlm
-from confirms.core.llm.llama_lang_chain_llm import LlamaLangChainLlm
+from confirms.core.experiment.experiment_grid import ExperimentGrid
+from confirms.core.experiment.experiment_runner import ExperimentRunner
+
+
+def run_riddle(*, template: str, context: str, result_name: str, temperature: Optional[float] = None):
+    """Run riddle for each seed and model type and write answers to CSV with one column per model type."""
+
+    model_types = ["gpt-3.5-turbo", "gpt-4", "llama-2-7b-chat.Q4_K_M.gguf", "llama-2-13b-chat.Q4_K_M.gguf"]
+    grid = ExperimentGrid(
+        templates={result_name: template},
+        contexts={result_name: context},
+        model_types=model_types,
+        seeds=list(range(1, 26)),
+        temperatures=[temperature],
+    )
+
+    runner = ExperimentRunner(experiment=result_name)
+    runner.run(grid)
+
+    outputs_dir = os.path.join(os.path.dirname(__file__), "../../results")
+    output_path = os.path.join(outputs_dir, f"{result_name}.csv")
+    runner.store.export_csv(result_name, output_path, model_types=model_types)
 
 
 def run_sally_riddle(*, result_name: str, temperature: Optional[float] = None):
@@ -35,28 +53,7 @@ def run_sally_riddle(*, result_name: str, temperature: Optional[float] = None):
         "how many sisters does Sally have? [/INST]"
     )
 
-    results = []
-    for seed in range(1, 26):
-        cur_result = {}
-        model_types = ["gpt-3.5-turbo", "gpt-4", "llama-2-7b-chat.Q4_K_M.gguf", "llama-2-13b-chat.Q4_K_M.gguf"]
-        for model_type in model_types:
-            if model_type.startswith("llama"):
-                llm = LlamaLangChainLlm(model_type=model_type, temperature=temperature, seed=seed)
-            elif model_type.startswith("gpt"):
-                llm = GptLangChainLlm(model_type=model_type, temperature=temperature)
-            else:
-                raise RuntimeError(f"Unknown model type: {model_type}")
-
-            prompt = PromptTemplate(template=template, input_variables=["context"])
-            answer = llm.completion(context, prompt=prompt)
-            cur_result[model_type] = answer
-        results.append(pd.DataFrame([cur_result]))
-
-    outputs_dir = os.path.join(os.path.dirname(__file__), "../../results")
-    output_path = os.path.join(outputs_dir, f"{result_name}.csv")
-
-    df = pd.concat(results)
-    df.to_csv(output_path, index=False)
+    run_riddle(template=template, context=context, result_name=result_name, temperature=temperature)
 
 
 def run_apples_riddle(*, result_name: str, temperature: Optional[float] = None):
@@ -74,28 +71,7 @@ def run_apples_riddle(*, result_name: str, temperature: Optional[float] = None):
         "how many other green apples are in the same box as the original green apple? [/INST]"
     )
 
-    results = []
-    for seed in range(1, 26):
-        cur_result = {}
-        model_types = ["gpt-3.5-turbo", "gpt-4", "llama-2-7b-chat.Q4_K_M.gguf", "llama-2-13b-chat.Q4_K_M.gguf"]
-        for model_type in model_types:
-            if model_type.startswith("llama"):
-                llm = LlamaLangChainLlm(model_type=model_type, temperature=temperature, seed=seed)
-            elif model_type.startswith("gpt"):
-                llm = GptLangChainLlm(model_type=model_type, temperature=temperature)
-            else:
-                raise RuntimeError(f"Unknown model type: {model_type}")
-
-            prompt = PromptTemplate(template=template, input_variables=["context"])
-            answer = llm.completion(context, prompt=prompt)
-            cur_result[model_type] = answer
-        results.append(pd.DataFrame([cur_result]))
-
-    outputs_dir = os.path.join(os.path.dirname(__file__), "../../results")
-    output_path = os.path.join(outputs_dir, f"{result_name}.csv")
-
-    df = pd.concat(results)
-    df.to_csv(output_path, index=False)
+    run_riddle(template=template, context=context, result_name=result_name, temperature=temperature)
 
 
 def test_sally_riddle():
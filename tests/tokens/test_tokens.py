@@ -14,6 +14,9 @@
 
 import pytest
 import tiktoken
+
+from confirms.core.context.context_packer import ContextPacker
+from confirms.core.context.tiktoken_counter import TiktokenCounter
 from confirms.core.settings import Settings
 
 
@@ -35,5 +38,18 @@ def test_smoke():
     assert token_bytes[0] == b'Hello'
 
 
+def test_context_packer():
+    """Test packing long context into windows using GPT tokens."""
+
+    packer = ContextPacker(token_counter=TiktokenCounter("gpt-3.5-turbo"), answer_tokens=256, overlap_tokens=16)
+    assert packer.get_n_ctx("Hello, world!") == 512
+
+    text = "Interest payments shall be made quarterly on each 18th day of the month. " * 400
+    windows = packer.pack([text])
+    assert len(windows) > 1
+    window_tokens = packer.get_window_tokens()
+    assert all(len(packer.token_counter.encode(window)) <= window_tokens for window in windows)
+
+
 if __name__ == '__main__':
     pytest.main([__file__])
@@ -0,0 +1,96 @@
+# Copyright (C) 2023-present The Project Contributors
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#    http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+import datetime as dt
+
+import numpy as np
+import pytest
+
+from confirms.core.calendar.business_calendar import BusinessCalendar
+from confirms.core.calendar.business_day_convention import BusinessDayConvention
+
+HOLIDAYS = [dt.date(2023, 12, 25), dt.date(2023, 12, 26), dt.date(2024, 1, 1), dt.date(2024, 3, 29)]
+
+
+def test_smoke():
+    """Test rolls around holidays and month end."""
+
+    calendar = BusinessCalendar(name="Test", holidays=HOLIDAYS, start_year=2000, end_year=2030)
+    dates = ["2023-12-25", "2024-03-30", "2024-03-29", "2024-06-17"]
+
+    def adjust(convention: BusinessDayConvention):
+        return [str(date) for date in calendar.adjust(dates, convention)]
+
+    assert list(calendar.is_business_day(dates)) == [False, False, False, True]
+    assert adjust(BusinessDayConvention.NONE) == dates
+    assert adjust(BusinessDayConvention.FOLLOWING) == ["2023-12-27", "2024-04-01", "2024-04-01", "2024-06-17"]
+    assert adjust(BusinessDayConvention.MODIFIED_FOLLOWING) == [
+        "2023-12-27",
+        "2024-03-28",
+        "2024-03-28",
+        "2024-06-17",
+    ]
+    assert adjust(BusinessDayConvention.PRECEDING) == ["2023-12-22", "2024-03-28", "2024-03-28", "2024-06-17"]
+    assert adjust(BusinessDayConvention.MODIFIED_PRECEDING) == [
+        "2023-12-22",
+        "2024-03-28",
+        "2024-03-28",
+        "2024-06-17",
+    ]
+
+    # 1 January 2024 is a holiday and 31 December 2023 is Sunday, so the preceding roll changes month
+    assert str(calendar.adjust(dt.date(2024, 1, 1), BusinessDayConvention.MODIFIED_PRECEDING)) == "2024-01-02"
+
+
+def test_matches_numpy():
+    """Test that lookups match numpy.busday_offset for random dates."""
+
+    calendar = BusinessCalendar(holidays=HOLIDAYS)
+    dates = np.datetime64("2000-01-01") + np.random.default_rng(0).integers(0, 20000, 100000)
+    roll_names = {
+        BusinessDayConvention.FOLLOWING: "following",
+        BusinessDayConvention.MODIFIED_FOLLOWING: "modifiedfollowing",
+        BusinessDayConvention.PRECEDING: "preceding",
+        BusinessDayConvention.MODIFIED_PRECEDING: "modifiedpreceding",
+    }
+    for convention, roll in roll_names.items():
+        expected = np.busday_offset(dates, 0, roll=roll, holidays=HOLIDAYS)
+        assert np.array_equal(calendar.adjust(dates, convention), expected)
+    assert np.array_equal(calendar.is_business_day(dates), np.is_busday(dates, holidays=HOLIDAYS))
+
+
+def test_combine():
+    """Test that combined calendar has non-business days of each calendar."""
+
+    first = BusinessCalendar(name="A", holidays=[dt.date(2024, 5, 1)])
+    second = BusinessCalendar(name="B", holidays=[dt.date(2024, 5, 2)], weekmask="1111110", start_year=2000)
+    combined = BusinessCalendar.combine(first, second)
+    assert combined.name == "A+B"
+    assert combined.weekmask == "1111100"
+    assert combined.start_year == 2000
+    assert str(combined.adjust("2024-05-01", BusinessDayConvention.FOLLOWING)) == "2024-05-03"
+
+
+def test_out_of_range():
+    """Test error for dates outside the calendar range."""
+
+    calendar = BusinessCalendar(start_year=2000, end_year=2010)
+    with pytest.raises(RuntimeError):
+        calendar.adjust("1999-12-31", BusinessDayConvention.FOLLOWING)
+    with pytest.raises(RuntimeError):
+        calendar.adjust("2000-01-01", BusinessDayConvention.PRECEDING)
+
+
+if __name__ == '__main__':
+    pytest.main([__file__])
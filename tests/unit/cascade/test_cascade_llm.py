@@ -0,0 +1,90 @@
+# Copyright (C) 2023-present The Project Contributors
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#    http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+from dataclasses import dataclass, field
+from typing import Dict, List, Optional
+
+import pytest
+
+from confirms.core.cascade.extractor_answer_validator import ExtractorAnswerValidator
+from confirms.core.cascade.schema_answer_validator import SchemaAnswerValidator
+from confirms.core.extraction.frequency_extractor import FrequencyExtractor
+from confirms.core.llm.cascade_llm import CascadeLlm
+from confirms.core.llm.llm import Llm
+from confirms.core.schedule.interest_schedule_params import InterestScheduleParams
+from confirms.core.schema.schema_compiler import SchemaCompiler
+from confirms.core.vote.vote_params import VoteParams
+
+
+@dataclass
+class LookupLlm(Llm):
+    """Stub LLM that answers from a dictionary, fails for unknown questions and records the questions."""
+
+    answers: Dict[str, List[str]] = field(default_factory=dict)
+    questions: List[str] = field(default_factory=list)
+
+    def load_model(self):
+        """Load model after fields have been set."""
+
+    def _completion(self, question: str, *, prompt: Optional[str] = None) -> str:
+        """Simple completion with optional prompt."""
+
+        answers = self.answers[question]
+        self.questions.append(question)
+        return answers[(len(self.questions) - 1) % len(answers)]
+
+
+def test_smoke():
+    """Test that questions escalate until an answer passes validation and escalation rates are recorded."""
+
+    small = LookupLlm(model_type="small", answers={"a": ["Quarterly."], "b": ["I am not sure."]})
+    large = LookupLlm(model_type="large", answers={"b": ["Semi-annual"], "c": ["It depends."]})
+    llm = CascadeLlm(stages=[small, large], validators=[ExtractorAnswerValidator(FrequencyExtractor())])
+    assert llm.model_type == "cascade:small,large"
+
+    results = llm.batch_completion(["a", "b", "c", "d"])
+    assert results[:2] == ["Quarterly.", "Semi-annual"]
+    assert "large answered 'It depends.'" in str(results[2])
+    assert "small raised KeyError" in str(results[3])
+    assert large.questions == ["b", "c"]
+
+    small_metrics, large_metrics = llm.get_metrics()
+    assert (small_metrics.calls, small_metrics.accepted, small_metrics.rejected, small_metrics.failed) == (4, 1, 1, 2)
+    assert (large_metrics.calls, large_metrics.accepted, large_metrics.rejected, large_metrics.failed) == (3, 1, 1, 1)
+    assert llm.get_escalation_rates() == {"small": 0.75, "large": 2 / 3}
+
+
+def test_schema_validator():
+    """Test that answers not accepted by the schema escalate."""
+
+    validator = SchemaAnswerValidator(SchemaCompiler.instance().compile(InterestScheduleParams))
+    valid = "first_unadjusted_payment_date=2023-10-18,last_unadjusted_payment_date=2033-07-18,payment_frequency=3M"
+    assert validator.is_valid(valid)
+    assert not validator.is_valid(valid.replace("10-18", "13-18"))
+    assert not validator.is_valid("payment_frequency=3M")
+
+
+def test_vote():
+    """Test that a stage whose vote is not decided escalates."""
+
+    small = LookupLlm(model_type="small", answers={"a": ["monthly", "quarterly"]})
+    large = LookupLlm(model_type="large", answers={"a": ["Quarterly."]})
+    params = VoteParams(max_samples=4, normalize=FrequencyExtractor().extract)
+    llm = CascadeLlm(stages=[small, large], vote_params=params)
+    assert llm.completion("a") == "Quarterly."
+    assert len(small.questions) == 4 and len(large.questions) == 3
+
+
+if __name__ == '__main__':
+    pytest.main([__file__])
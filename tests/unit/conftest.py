@@ -0,0 +1,27 @@
+# Copyright (C) 2023-present The Project Contributors
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#    http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+import pytest
+
+from confirms.core.settings import Settings
+
+
+@pytest.fixture
+def restore_settings():
+    """Restore process-wide settings after the test, so that settings reloaded from environment variables
+    set by monkeypatch do not outlive them."""
+
+    settings = Settings._instance
+    yield
+    Settings._instance = settings
@@ -0,0 +1,84 @@
+# Copyright (C) 2023-present The Project Contributors
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#    http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+from typing import List
+
+import pytest
+from langchain import PromptTemplate
+
+from confirms.core.context.context_packer import ContextPacker
+from confirms.core.context.token_counter import TokenCounter
+
+
+class _WordCounter(TokenCounter):
+    """Each word is a token and the vocabulary grows as new words are encoded."""
+
+    def __init__(self):
+        self.vocab = {}
+
+    def encode(self, text: str) -> List[int]:
+        return [self.vocab.setdefault(word, len(self.vocab)) for word in text.split()]
+
+    def decode(self, tokens: List[int]) -> str:
+        words = {token: word for word, token in self.vocab.items()}
+        return " ".join(words[token] for token in tokens)
+
+    def get_max_n_ctx(self) -> int:
+        return 4096
+
+    def count(self, text: str) -> int:
+        # One special token at the start of the prompt
+        return len(self.encode(text)) + 1
+
+
+def test_smoke():
+    """Test that the smallest context size that fits prompt and answer is chosen."""
+
+    packer = ContextPacker(token_counter=_WordCounter(), answer_tokens=256)
+    assert packer.get_n_ctx("word " * 10) == 512
+    assert packer.get_n_ctx("word " * 255) == 512
+    assert packer.get_n_ctx("word " * 256) == 1024
+    assert packer.get_n_ctx("word " * 3000) == 4096
+    with pytest.raises(RuntimeError, match="exceed the largest context size of 4096 tokens"):
+        packer.get_n_ctx("word " * 3840)
+
+    packer = ContextPacker(token_counter=_WordCounter(), answer_tokens=256, max_n_ctx=3000)
+    assert packer.get_n_ctx("word " * 2000) == 3000
+
+
+def test_pack():
+    """Test packing short inputs together and splitting long inputs with overlap."""
+
+    packer = ContextPacker(token_counter=_WordCounter(), answer_tokens=10, max_n_ctx=31, overlap_tokens=2)
+    prompt = PromptTemplate(template="Context: {context}", input_variables=["context"])
+    assert packer.get_window_tokens(prompt=prompt) == 19
+
+    inputs = ["a b c", "d e f g", "h i j k l m n o p q r s t", "u v"]
+    windows = packer.pack(inputs, prompt=prompt)
+    assert windows == ["a b c\n\nd e f g", "h i j k l m n o p q r s t\n\nu v"]
+
+    long_input = " ".join(f"w{index}" for index in range(40))
+    windows = packer.pack(["a b", long_input], prompt=prompt)
+    assert all(len(window.split()) <= 19 for window in windows)
+    # Split windows are full, so they are not packed together with the short input
+    assert len(windows) == 4
+    assert windows[0] == "a b"
+    assert windows[1].split()[0] == "w0" and windows[3].split()[-1] == "w39"
+    # Each split window after the first starts with the last two tokens of the previous one
+    assert windows[2].split()[:2] == windows[1].split()[-2:]
+    assert windows[3].split()[:2] == windows[2].split()[-2:]
+
+
+if __name__ == '__main__':
+    pytest.main([__file__])
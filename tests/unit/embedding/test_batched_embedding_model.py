@@ -0,0 +1,79 @@
+# Copyright (C) 2023-present The Project Contributors
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#    http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+from dataclasses import dataclass, field
+from typing import List
+
+import numpy as np
+import pytest
+
+from confirms.core.embedding.batched_embedding_model import BatchedEmbeddingModel
+from confirms.core.embedding.embedding_model import EmbeddingModel
+
+
+@dataclass
+class _BatchRecordingModel(EmbeddingModel):
+    """Records the texts passed in each call, so that the test can check how texts are grouped into batches,
+    and embeds each text as its length so that the input order of results can be checked."""
+
+    batches: List[List[str]] = field(default_factory=list)
+
+    def embed_documents(self, texts: List[str]) -> np.ndarray:
+        self.batches.append(texts)
+        return np.array([[len(text)] for text in texts], dtype=np.float32)
+
+    def embed_query(self, text: str) -> np.ndarray:
+        return np.array([len(text)], dtype=np.float32)
+
+
+_TEXTS = ["a" * length for length in [7, 1, 12, 3, 9, 2, 30, 5]]
+
+
+def test_smoke():
+    """Test that batches contain texts of similar length and results are in input order."""
+
+    model = _BatchRecordingModel(embedding_model_id="recording")
+    batched_model = BatchedEmbeddingModel(embedding_model=model, batch_size=3)
+    assert batched_model.embedding_model_id == "recording"
+
+    vectors = batched_model.embed_documents(_TEXTS)
+    np.testing.assert_array_equal(vectors[:, 0], [len(text) for text in _TEXTS])
+    assert [[len(text) for text in batch] for batch in model.batches] == [[1, 2, 3], [5, 7, 9], [12, 30]]
+    assert batched_model.chunk_count == 8 and batched_model.chunks_per_sec > 0.0
+
+    df = batched_model.benchmark(_TEXTS, [2, 8])
+    assert df["batch_size"].tolist() == [2, 8] and (df["chunks_per_sec"] > 0.0).all()
+    assert batched_model.batch_size == 3
+
+
+@pytest.mark.parametrize("use_processes", [False, True])
+def test_workers(use_processes: bool):
+    """Test that results from the worker pool are in input order."""
+
+    batched_model = BatchedEmbeddingModel(
+        embedding_model=_BatchRecordingModel(embedding_model_id="recording"),
+        batch_size=2,
+        max_workers=2,
+        use_processes=use_processes,
+    )
+    try:
+        for _ in range(2):
+            vectors = batched_model.embed_documents(_TEXTS)
+            np.testing.assert_array_equal(vectors[:, 0], [len(text) for text in _TEXTS])
+    finally:
+        batched_model.close()
+
+
+if __name__ == '__main__':
+    pytest.main([__file__])
@@ -0,0 +1,81 @@
+# Copyright (C) 2023-present The Project Contributors
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#    http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+from dataclasses import dataclass, field
+from typing import List
+
+import numpy as np
+import pytest
+
+from confirms.core.embedding.cached_embedding_model import CachedEmbeddingModel
+from confirms.core.embedding.embedding_cache import EmbeddingCache
+from confirms.core.embedding.embedding_model import EmbeddingModel
+
+
+@dataclass
+class _LengthModel(EmbeddingModel):
+    """Embeds text as its length and number of words, and records embedded texts."""
+
+    embedded: List[str] = field(default_factory=list)
+
+    def embed_documents(self, texts: List[str]) -> np.ndarray:
+        self.embedded += texts
+        return np.array([[len(text), len(text.split())] for text in texts], dtype=np.float32)
+
+    def embed_query(self, text: str) -> np.ndarray:
+        return self.embed_documents([text])[0]
+
+
+def test_smoke(tmp_path):
+    """Test that only texts not found in the cache are embedded."""
+
+    model = _LengthModel(embedding_model_id="length")
+    cached_model = CachedEmbeddingModel(
+        embedding_model=model,
+        cache=EmbeddingCache(embedding_model_id="length", cache_dir=str(tmp_path), initial_capacity=2),
+    )
+    assert cached_model.embedding_model_id == "length"
+
+    vectors = cached_model.embed_documents(["Governing Law: New York", "Maturity Date", "Governing Law: New York"])
+    np.testing.assert_array_equal(vectors, [[23, 4], [13, 2], [23, 4]])
+    assert model.embedded == ["Governing Law: New York", "Maturity Date"]
+
+    # Text that differs only in whitespace is found in the cache, vector file grows beyond initial capacity
+    vectors = cached_model.embed_documents(["Governing  Law:\nNew York", "Trade Date", "Issue Date"])
+    np.testing.assert_array_equal(vectors, [[23, 4], [10, 2], [10, 2]])
+    assert model.embedded == ["Governing Law: New York", "Maturity Date", "Trade Date", "Issue Date"]
+    assert cached_model.cache.hits == 1 and cached_model.cache.misses == 5
+
+    # Reopened cache reads vectors from disk
+    cache = EmbeddingCache(embedding_model_id="length", cache_dir=str(tmp_path))
+    assert cache.get_size() == 4
+    rows = cache.lookup([EmbeddingCache.get_key("length", "Maturity Date"), EmbeddingCache.get_key("length", "x")])
+    assert rows[1] == -1
+    np.testing.assert_array_equal(cache.get_vectors(rows[:1]), [[13, 2]])
+
+    # Vectors of another model are stored separately
+    assert EmbeddingCache(embedding_model_id="other", cache_dir=str(tmp_path)).get_size() == 0
+
+
+def test_dimension_mismatch(tmp_path):
+    """Test that vectors of a different dimension are rejected."""
+
+    cache = EmbeddingCache(embedding_model_id="length", cache_dir=str(tmp_path))
+    cache.put_many([EmbeddingCache.get_key("length", "a")], np.zeros((1, 2)))
+    with pytest.raises(RuntimeError, match="dimension 2"):
+        cache.put_many([EmbeddingCache.get_key("length", "b")], np.zeros((1, 3)))
+
+
+if __name__ == '__main__':
+    pytest.main([__file__])
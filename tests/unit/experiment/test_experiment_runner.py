@@ -0,0 +1,176 @@
+# Copyright (C) 2023-present The Project Contributors
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#    http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+import os
+from dataclasses import dataclass, field
+from typing import Optional
+
+import pytest
+from langchain import PromptTemplate
+
+from confirms.core.experiment.experiment_cell import ExperimentCell
+from confirms.core.experiment.experiment_grid import ExperimentGrid
+from confirms.core.experiment.experiment_runner import ExperimentRunner, create_llm
+from confirms.core.llm.gpt_lang_chain_llm import GptLangChainLlm
+from confirms.core.llm.llama_lang_chain_llm import LlamaLangChainLlm
+from confirms.core.llm.llm import Llm
+from confirms.core.results.result_record import ResultRecord
+from confirms.core.results.results_store import ResultsStore
+from confirms.core.settings import Settings
+
+
+@dataclass
+class StubLlm(Llm):
+    """Stub LLM that returns formatted prompt with seed, and fails for seed 3 unless allowed."""
+
+    seed: int = field(default=None)
+    """Model seed."""
+
+    fail: bool = field(default=False)
+    """Raise an error instead of returning an answer."""
+
+    def load_model(self):
+        """Load model after fields have been set."""
+
+    def _completion(self, question: str, *, prompt: Optional[PromptTemplate] = None) -> str:
+        """Simple completion with optional prompt."""
+        if self.fail:
+            raise RuntimeError("Stub failure.")
+        return f"{prompt.format(context=question)}:{self.seed}"
+
+
+def create_stub_llm(cell: ExperimentCell) -> Llm:
+    """Create stub LLM for the cell."""
+    return StubLlm(model_type=cell.model_type, seed=cell.seed, fail=cell.seed == 3)
+
+
+def create_working_stub_llm(cell: ExperimentCell) -> Llm:
+    """Create stub LLM for the cell that does not fail."""
+    return StubLlm(model_type=cell.model_type, seed=cell.seed)
+
+
+def create_threads_stub_llm(cell: ExperimentCell) -> Llm:
+    """Create stub LLM for the cell that answers with the number of threads for local models in its process."""
+    return StubLlm(model_type=cell.model_type, seed=Settings.instance().llama_threads)
+
+
+def test_smoke(tmp_path):
+    """Test running the grid, error recording and resuming."""
+
+    grid = ExperimentGrid(
+        templates={"plain": "Context: {context}"},
+        contexts={"simple": "a", "verbose": "b"},
+        model_types=["gpt-stub"],
+        seeds=[1, 2, 3],
+    )
+    store = ResultsStore(root_dir=str(tmp_path))
+
+    runner = ExperimentRunner(experiment="smoke", store=store, llm_factory=create_stub_llm)
+    assert runner.run(grid) == 6
+    df = runner.read_results()
+    assert len(df) == 6
+    assert df["error"].notna().sum() == 2
+    assert set(df[df["seed"] == 1]["answer"]) == {"Context: a:1", "Context: b:1"}
+
+    # Resume runs only the failed cells
+    resumed_runner = ExperimentRunner(experiment="smoke", store=store, llm_factory=create_working_stub_llm)
+    assert resumed_runner.run(grid) == 2
+    assert resumed_runner.run(grid) == 0
+    df = resumed_runner.read_results()
+    assert len(df) == 6
+    assert df["error"].isna().all()
+
+
+@dataclass
+class KilledStore(ResultsStore):
+    """Results store whose process is killed after the specified number of records is appended,
+    losing the records that have not been written to disk."""
+
+    kill_after: int = field(default=None)
+    """Number of appended records after which the process is killed."""
+
+    appended: int = field(default=0)
+    """Number of appended records."""
+
+    def append(self, record: ResultRecord) -> None:
+        super().append(record)
+        self.appended += 1
+        if self.appended == self.kill_after:
+            self._buffer.clear()
+            raise KeyboardInterrupt("Killed.")
+
+
+def test_crash(tmp_path):
+    """Test that cells finished before the process is killed are on disk."""
+
+    grid = ExperimentGrid(
+        templates={"plain": "Context: {context}"},
+        contexts={"simple": "a"},
+        model_types=["gpt-stub"],
+        seeds=[1, 2, 3, 4, 5],
+    )
+    store = KilledStore(root_dir=str(tmp_path), kill_after=4)
+    runner = ExperimentRunner(experiment="crash", store=store, max_threads=1, llm_factory=create_working_stub_llm)
+    with pytest.raises(KeyboardInterrupt):
+        runner.run(grid)
+
+    resumed_runner = ExperimentRunner(
+        experiment="crash", store=ResultsStore(root_dir=str(tmp_path)), llm_factory=create_working_stub_llm
+    )
+    assert len(resumed_runner.get_completed_keys()) == 3
+    assert resumed_runner.run(grid) == 2
+
+
+def test_local_models(tmp_path):
+    """Test running cells for local models in worker processes."""
+
+    grid = ExperimentGrid(
+        templates={"plain": "Context: {context}"},
+        contexts={"simple": "a"},
+        model_types=["stub.gguf"],
+        seeds=[1, 2],
+    )
+    runner = ExperimentRunner(
+        experiment="local",
+        store=ResultsStore(root_dir=str(tmp_path)),
+        max_processes=2,
+        llm_factory=create_working_stub_llm,
+    )
+    assert runner.run(grid) == 2
+    assert sorted(runner.read_results()["answer"]) == ["Context: a:1", "Context: a:2"]
+
+    # Threads of both processes fit the CPU cores
+    runner = ExperimentRunner(
+        experiment="threads",
+        store=ResultsStore(root_dir=str(tmp_path)),
+        max_processes=2,
+        llm_factory=create_threads_stub_llm,
+    )
+    assert runner.run(grid) == 2
+    assert set(runner.read_results()["answer"]) == {f"Context: a:{max(1, (os.cpu_count() or 1) // 2)}"}
+
+
+def test_create_llm():
+    """Test that models scheduled as local are created as local models."""
+
+    cell = ExperimentCell(model_type="mistral-7b-instruct.Q4_K_M.gguf")
+    assert cell.is_local()
+    assert isinstance(create_llm(cell), LlamaLangChainLlm)
+    assert isinstance(create_llm(ExperimentCell(model_type="gpt-4")), GptLangChainLlm)
+    with pytest.raises(RuntimeError, match="Unknown model type"):
+        create_llm(ExperimentCell(model_type="unknown"))
+
+
+if __name__ == '__main__':
+    pytest.main([__file__])
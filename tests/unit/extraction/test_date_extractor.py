@@ -0,0 +1,42 @@
+# Copyright (C) 2023-present The Project Contributors
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#    http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+import pandas as pd
+import pytest
+
+from confirms.core.extraction.date_extractor import DateExtractor
+
+
+def test_smoke():
+    """Test that dates in different formats are converted to ISO format and invalid dates are not."""
+
+    outputs = pd.Series(
+        [
+            "  The maturity date is 9 July 2013.",
+            "18-July-2033",
+            "On or about December 27, 2023",
+            "2013-07-09",
+            "9th of July, 2013",
+            "Issue Date: 9 July 2009. Maturity Date: 9 July 2013.",
+            "31 February 2020",
+        ]
+    )
+    values = DateExtractor().extract_series(outputs)
+    assert values.iloc[:5].tolist() == ["2013-07-09", "2033-07-18", "2023-12-27", "2013-07-09", "2013-07-09"]
+    assert values.iloc[5:].isna().all()
+    assert DateExtractor().extract_series(pd.Series(["no date", None])).isna().all()
+
+
+if __name__ == '__main__':
+    pytest.main([__file__])
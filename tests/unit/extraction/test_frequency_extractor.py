@@ -0,0 +1,78 @@
+# Copyright (C) 2023-present The Project Contributors
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#    http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+from dataclasses import dataclass, field
+from typing import List, Optional
+
+import pandas as pd
+import pytest
+
+from confirms.core.extraction.frequency_extractor import FrequencyExtractor
+from confirms.core.llm.llm import Llm
+
+
+@dataclass
+class NormalizingLlm(Llm):
+    """Stub LLM that answers quarterly for questions that mention April and records the questions."""
+
+    questions: List[str] = field(default_factory=list)
+
+    def load_model(self):
+        """Load model after fields have been set."""
+
+    def _completion(self, question: str, *, prompt: Optional[str] = None) -> str:
+        """Simple completion with optional prompt."""
+        self.questions.append(question)
+        return " Quarterly." if "April" in question else "I do not know."
+
+
+def test_smoke():
+    """Test that chatty outputs are mapped to canonical values and conflicting outputs are not."""
+
+    outputs = pd.Series(
+        [
+            "  Sure, based on the information provided in the context, the payment frequency is quarterly.",
+            "semi-annual.",
+            "The payment frequency is semi-annual, occurring on the 27th day of June and December each year.",
+            "Annually",
+            "Payments are monthly\nor quarterly",
+            "3M",
+            None,
+        ],
+        index=[10, 11, 12, 13, 14, 15, 16],
+    )
+    extractor = FrequencyExtractor()
+    values = extractor.extract_series(outputs)
+    assert values.index.equals(outputs.index)
+    assert values.iloc[:4].tolist() == ["3M", "6M", "6M", "12M"]
+    assert pd.isna(values[14]) and values[15] == "3M" and pd.isna(values[16])
+    assert (extractor.resolved_count, extractor.unresolved_count) == (5, 2)
+    assert extractor.extract("every six months") == "6M"
+    assert extractor.extract("no frequency") is None
+
+
+def test_fallback():
+    """Test that only distinct unresolved outputs are sent to the fallback LLM."""
+
+    llm = NormalizingLlm(model_type="stub")
+    extractor = FrequencyExtractor(fallback_llm=llm)
+    outputs = pd.Series(["quarterly", "January, April, July and October", "January, April, July and October", "x"])
+    values = extractor.extract_series(outputs)
+    assert values.tolist()[:3] == ["3M", "3M", "3M"] and pd.isna(values.iloc[3])
+    assert len(llm.questions) == 2
+    assert (extractor.fallback_count, extractor.unresolved_count) == (2, 1)
+
+
+if __name__ == '__main__':
+    pytest.main([__file__])
@@ -0,0 +1,98 @@
+# Copyright (C) 2023-present The Project Contributors
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#    http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+import os
+from dataclasses import dataclass, field
+from typing import List, Optional
+
+import openai
+import pytest
+
+from confirms.core.instrumentation.span_aggregator import SpanAggregator
+from confirms.core.llm.completion_cache import CompletionCache
+from confirms.core.llm.gpt_native_llm import GptNativeLlm
+from confirms.core.llm.llm import Llm
+
+
+@dataclass
+class RefusingLlm(Llm):
+    """Deterministic stub LLM whose answers are cached and which raises for refused questions,
+    so that its spans cover cache hits, cache misses and errors."""
+
+    refused: List[str] = field(default_factory=list)
+    """Questions for which completion raises ValueError."""
+
+    def load_model(self):
+        """Load model after fields have been set."""
+
+    def is_deterministic(self) -> bool:
+        """Return True if the same input is guaranteed to produce the same answer for the current settings."""
+        return True
+
+    def _completion(self, question: str, *, prompt: Optional[str] = None) -> str:
+        """Simple completion with optional prompt."""
+        if question in self.refused:
+            raise ValueError(f"Refused {question}.")
+        return f"answer {question}"
+
+
+def test_smoke(tmp_path):
+    """Test spans for cache hits, misses and errors."""
+
+    aggregator = SpanAggregator()
+    cache = CompletionCache(cache_path=os.path.join(tmp_path, "cache.sqlite"))
+    llm = RefusingLlm(model_type="stub", refused=["b"], cache=cache, instrumentation=[aggregator])
+    assert llm.completion("a") == "answer a"
+    assert llm.completion("a") == "answer a"
+    with pytest.raises(ValueError):
+        llm.completion("b")
+    cache.close()
+
+    spans = aggregator.get_spans("stub")
+    assert [span.cache_hit for span in spans] == [False, True, False]
+    assert [span.error for span in spans] == [None, None, "ValueError: Refused b."]
+    assert all(span.operation == "completion" and span.duration_sec >= 0.0 for span in spans)
+    assert aggregator.get_cache_hit_rate() == pytest.approx(1 / 3)
+
+
+def test_gpt_native(monkeypatch):
+    """Test token usage and network time for GPT native completions and percentiles."""
+
+    def create(*, model, messages, **kwargs):
+        question = messages[-1]["content"]
+        return {
+            "choices": [{"message": {"content": f"answer {question}"}}],
+            "usage": {"prompt_tokens": 10 * len(question), "completion_tokens": 2},
+        }
+
+    monkeypatch.setattr(openai.ChatCompletion, "create", create)
+
+    aggregator = SpanAggregator()
+    llm = GptNativeLlm(model_type="gpt-4", instrumentation=[aggregator])
+    for question in ["a", "bb", "ccc", "dddd"]:
+        llm.completion(question)
+
+    spans = aggregator.get_spans()
+    assert [span.prompt_tokens for span in spans] == [10, 20, 30, 40]
+    assert all(span.completion_tokens == 2 and span.network_sec is not None for span in spans)
+    assert aggregator.get_percentiles("prompt_tokens", percentiles=[0, 50, 100]) == {0: 10.0, 50: 25.0, 100: 40.0}
+    assert aggregator.get_percentiles("time_to_first_token_sec") == {}
+
+    summary = aggregator.get_summary()
+    assert set(summary["metric"]) >= {"duration_sec", "network_sec", "prompt_tokens", "tokens_per_sec"}
+    assert summary.set_index("metric").loc["prompt_tokens", "p50"] == 25.0
+
+
+if __name__ == '__main__':
+    pytest.main([__file__])
@@ -0,0 +1,41 @@
+# Copyright (C) 2023-present The Project Contributors
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#    http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+import json
+import os
+
+import pytest
+
+from confirms.core.instrumentation.llm_span import LlmSpan
+from confirms.core.instrumentation.span_json_lines_exporter import SpanJsonLinesExporter
+
+
+def test_smoke(tmp_path):
+    """Test that each span is appended as one line with derived metrics."""
+
+    output_path = os.path.join(tmp_path, "spans", "spans.jsonl")
+    exporter = SpanJsonLinesExporter(output_path=output_path)
+    exporter.on_span(LlmSpan(model_type="a", completion_tokens=10, generation_sec=2.0))
+    exporter.on_span(LlmSpan(model_type="b", error="RuntimeError: failed"))
+
+    with open(output_path, "r", encoding="utf-8") as file:
+        records = [json.loads(line) for line in file]
+    assert [record["model_type"] for record in records] == ["a", "b"]
+    assert records[0]["tokens_per_sec"] == 5.0
+    assert records[1]["tokens_per_sec"] is None
+    assert "_start_counter" not in records[0]
+
+
+if __name__ == '__main__':
+    pytest.main([__file__])
@@ -0,0 +1,106 @@
+# Copyright (C) 2023-present The Project Contributors
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#    http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+import asyncio
+import json
+from typing import Awaitable, Callable
+
+import openai
+import pytest
+from aiohttp import web
+
+from confirms.core.instrumentation.span_aggregator import SpanAggregator
+from confirms.core.llm.async_http_session import AsyncHttpSession
+from confirms.core.llm.gpt_lang_chain_llm import GptLangChainLlm
+from confirms.core.llm.gpt_native_llm import GptNativeLlm
+from confirms.core.settings import Settings
+
+
+async def chat_completions(request: web.Request) -> web.Response:
+    """Stand-in for OpenAI chat completions endpoint that echoes the question or calls a function."""
+
+    body = await request.json()
+    question = body["messages"][-1]["content"]
+    if "functions" in body:
+        arguments = json.dumps({"payment_frequency": question})
+        function_call = {"name": "get_payment_frequency", "arguments": arguments}
+        message = {"role": "assistant", "content": None, "function_call": function_call}
+    else:
+        message = {"role": "assistant", "content": f"echo {question}"}
+    usage = {"prompt_tokens": 1, "completion_tokens": 1, "total_tokens": 2}
+    return web.json_response(
+        {"object": "chat.completion", "choices": [{"index": 0, "message": message}], "usage": usage}
+    )
+
+
+def run_with_server(monkeypatch, test: Callable[[], Awaitable[None]]) -> None:
+    """Run async test against a local stand-in OpenAI server."""
+
+    monkeypatch.setenv("CONFIRMS_GPU_RAM_GB", "0")
+    monkeypatch.setenv("OPENAI_API_KEY", "test-key")
+    Settings.reload()
+
+    async def run():
+        app = web.Application()
+        app.router.add_post("/v1/chat/completions", chat_completions)
+        runner = web.AppRunner(app)
+        await runner.setup()
+        site = web.TCPSite(runner, "127.0.0.1", 0)
+        await site.start()
+        port = site._server.sockets[0].getsockname()[1]
+        monkeypatch.setattr(openai, "api_base", f"http://127.0.0.1:{port}/v1")
+        try:
+            await test()
+        finally:
+            await AsyncHttpSession.instance().close()
+            await runner.cleanup()
+
+    asyncio.run(run())
+
+
+def test_gpt_native(monkeypatch, restore_settings):
+    """Test async completion and function completion for the native API."""
+
+    async def test():
+        llm = GptNativeLlm(model_type="gpt-4", temperature=0.0)
+        answers = await asyncio.gather(*[llm.acompletion(str(i)) for i in range(20)])
+        assert answers == [f"echo {i}" for i in range(20)]
+
+        result = await llm.afunction_completion("quarterly")
+        assert result == {"payment_frequency": "quarterly", "function": "get_payment_frequency"}
+
+    run_with_server(monkeypatch, test)
+
+
+def test_gpt_lang_chain(monkeypatch, restore_settings):
+    """Test async completion for the LangChain wrapper."""
+
+    aggregator = SpanAggregator()
+
+    async def test():
+        llm = GptLangChainLlm(model_type="gpt-3.5-turbo", temperature=0.0, instrumentation=[aggregator])
+        answer = await llm.acompletion("question")
+        assert answer == "echo question"
+
+    run_with_server(monkeypatch, test)
+
+    # Token usage reported by the API is recorded by the callback handler
+    (span,) = aggregator.get_spans()
+    assert span.operation == "acompletion"
+    assert span.prompt_tokens == 1 and span.completion_tokens == 1
+    assert span.load_sec is not None and span.network_sec is not None
+
+
+if __name__ == '__main__':
+    pytest.main([__file__])
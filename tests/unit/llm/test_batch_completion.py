@@ -0,0 +1,138 @@
+# Copyright (C) 2023-present The Project Contributors
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#    http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+import threading
+import time
+from dataclasses import dataclass, field
+from typing import Any, List, Optional
+
+import openai
+import pytest
+from langchain import LlamaCpp
+
+from confirms.core.context.context_packer import ContextPacker
+from confirms.core.context.token_counter import TokenCounter
+from confirms.core.llm.gpt_native_llm import GptNativeLlm
+from confirms.core.llm.llama_lang_chain_llm import LlamaLangChainLlm
+from confirms.core.llm.llama_model_key import LlamaModelKey
+from confirms.core.llm.llama_model_pool import LlamaModelPool
+from confirms.core.llm.llm import Llm
+
+
+@dataclass
+class EchoLlm(Llm):
+    """Stub LLM that echoes the question and fails for questions starting with 'fail'."""
+
+    def load_model(self):
+        """Load model after fields have been set."""
+
+    def _completion(self, question: str, *, prompt: Optional[str] = None) -> str:
+        """Simple completion with optional prompt."""
+        if question.startswith("fail"):
+            raise RuntimeError(f"Failed for {question}.")
+        return question.upper()
+
+
+def test_smoke():
+    """Test that results are in input order and errors are returned per item."""
+
+    llm = EchoLlm(model_type="stub")
+    results = llm.batch_completion(["a", "fail b", "c"])
+    assert results[0] == "A"
+    assert isinstance(results[1], RuntimeError)
+    assert results[2] == "C"
+
+
+def test_gpt_native_fan_out(monkeypatch):
+    """Test that GPT native requests run concurrently and preserve input order."""
+
+    active = []
+    max_active = []
+    lock = threading.Lock()
+
+    def create(*, model, messages, **kwargs):
+        with lock:
+            active.append(1)
+            max_active.append(len(active))
+        question = messages[-1]["content"]
+        time.sleep(0.05 if question == "0" else 0.01)
+        with lock:
+            active.pop()
+        return {"choices": [{"message": {"content": f"answer {question}"}}]}
+
+    monkeypatch.setattr(openai.ChatCompletion, "create", create)
+
+    llm = GptNativeLlm(model_type="gpt-4", max_concurrency=4)
+    questions = [str(i) for i in range(8)]
+    results = llm.batch_completion(questions)
+    assert results == [f"answer {question}" for question in questions]
+    assert max(max_active) > 1
+
+
+class _SpaceCounter(TokenCounter):
+    """Counts each space-separated word as a token, only token counts are used when choosing context size."""
+
+    def encode(self, text: str) -> List[int]:
+        return [0] * len(text.split())
+
+    def decode(self, tokens: List[int]) -> str:
+        raise NotImplementedError()
+
+    def get_max_n_ctx(self) -> int:
+        return 2048
+
+
+class _WordCountClient:
+    """Stub llama.cpp model that answers with the number of words in the prompt."""
+
+    ctx = None
+
+    def __call__(self, prompt: str, **kwargs: Any) -> Any:
+        result = {"choices": [{"text": f"{len(prompt.split())} words"}]}
+        return iter([result]) if kwargs.get("stream") else result
+
+
+@dataclass
+class _WordCountLlama(LlamaLangChainLlm):
+    """Local LLM with stub model and tokenizer that records the context sizes it is loaded with."""
+
+    loaded_n_ctx: List[int] = field(default_factory=list)
+
+    def load_model(self, grammar_name: str = None, *, n_ctx: Optional[int] = None):
+        if self._llm is None:
+            self.loaded_n_ctx.append(n_ctx)
+            self._model_key = LlamaModelKey(model_path=f"word-count-{id(self)}.gguf", n_ctx=n_ctx)
+            client = LlamaModelPool.instance().acquire(self._model_key, loader=lambda key: _WordCountClient())
+            self._llm = LlamaCpp.construct(client=client, model_path="", stop=None, grammar=None)
+
+    def get_context_packer(self) -> ContextPacker:
+        return ContextPacker(token_counter=_SpaceCounter(), answer_tokens=self._get_max_tokens())
+
+
+def test_llama_oversized_question():
+    """Test that a question too long for any context size fails individually and does not size the context."""
+
+    llm = _WordCountLlama(model_type="stub.gguf")
+    results = llm.batch_completion(["short", "word " * 2000, "word " * 300])
+    assert results[0] == "1 words" and results[2] == "300 words"
+    assert isinstance(results[1], RuntimeError)
+    assert llm.loaded_n_ctx == [1024]
+
+    llm.unload_model()
+    results = _WordCountLlama(model_type="stub.gguf").batch_completion(["word " * 2000])
+    assert isinstance(results[0], RuntimeError)
+
+
+if __name__ == '__main__':
+    pytest.main([__file__])
@@ -0,0 +1,105 @@
+# Copyright (C) 2023-present The Project Contributors
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#    http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+import os
+from dataclasses import dataclass, field
+from typing import Any, Dict, Optional
+
+import pytest
+
+from confirms.core.llm.completion_cache import CompletionCache
+from confirms.core.llm.llm import Llm
+
+
+@dataclass
+class CountingLlm(Llm):
+    """Stub LLM that counts the number of times inference was performed."""
+
+    seed: int = field(default=None)
+    """Stub model is deterministic when seed is set."""
+
+    call_count: int = field(default=0)
+    """Number of completions performed without cache."""
+
+    def load_model(self):
+        """Load model after fields have been set."""
+
+    def is_deterministic(self) -> bool:
+        """Return True if the same input is guaranteed to produce the same answer for the current settings."""
+        return self.seed is not None
+
+    def get_generation_params(self) -> Dict[str, Any]:
+        """Return every setting that affects the answer."""
+        return dict(super().get_generation_params(), seed=self.seed)
+
+    def _completion(self, question: str, *, prompt: Optional[str] = None) -> str:
+        """Simple completion with optional prompt."""
+        self.call_count += 1
+        return f"{prompt}:{question}:{self.seed}"
+
+
+def test_smoke(tmp_path):
+    """Test that deterministic completions are served from cache on subsequent calls."""
+
+    cache = CompletionCache(cache_path=os.path.join(tmp_path, "cache.sqlite"))
+    llm = CountingLlm(model_type="stub", seed=1, cache=cache)
+
+    assert llm.completion("question", prompt="prompt") == "prompt:question:1"
+    assert llm.completion("question", prompt="prompt") == "prompt:question:1"
+    assert llm.call_count == 1
+    assert (cache.hits, cache.misses) == (1, 1)
+
+    # Different generation parameters produce a different key
+    other_llm = CountingLlm(model_type="stub", seed=2, cache=cache)
+    assert other_llm.completion("question", prompt="prompt") == "prompt:question:2"
+    assert other_llm.call_count == 1
+
+    # Cache persists after reopening
+    cache.close()
+    reopened_cache = CompletionCache(cache_path=cache.cache_path)
+    reopened_llm = CountingLlm(model_type="stub", seed=1, cache=reopened_cache)
+    assert reopened_llm.completion("question", prompt="prompt") == "prompt:question:1"
+    assert reopened_llm.call_count == 0
+    reopened_cache.close()
+
+
+def test_nondeterministic(tmp_path):
+    """Test that non-deterministic completions bypass the cache."""
+
+    cache = CompletionCache(cache_path=os.path.join(tmp_path, "cache.sqlite"))
+    llm = CountingLlm(model_type="stub", cache=cache)
+    llm.completion("question")
+    llm.completion("question")
+    assert llm.call_count == 2
+    assert cache.size() == 0
+    cache.close()
+
+
+def test_eviction(tmp_path):
+    """Test eviction of least recently used entries."""
+
+    cache = CompletionCache(cache_path=os.path.join(tmp_path, "cache.sqlite"), max_entries=2)
+    cache.put("a", "1")
+    cache.put("b", "2")
+    assert cache.get("a") == "1"
+    cache.put("c", "3")
+    assert cache.size() == 2
+    assert cache.evictions == 1
+    assert cache.get("a") == "1"
+    assert cache.get("c") == "3"
+    cache.close()
+
+
+if __name__ == '__main__':
+    pytest.main([__file__])
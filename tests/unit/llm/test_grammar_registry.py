@@ -0,0 +1,63 @@
+# Copyright (C) 2023-present The Project Contributors
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#    http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+import os
+
+import pytest
+
+from confirms.core.llm.grammar_registry import GrammarRegistry
+
+
+def test_smoke():
+    """Test that grammars in the project are valid and compiled grammars are reused."""
+
+    registry = GrammarRegistry()
+    assert registry.validate_all() == ["frequency.gbnf", "frequency_word.gbnf", "payment_schedule_params.gbnf"]
+
+    with registry.acquire("frequency.gbnf") as grammar:
+        # Concurrent use gets a separate compiled grammar
+        with registry.acquire("frequency.gbnf") as other_grammar:
+            assert other_grammar is not grammar
+    with registry.acquire("frequency.gbnf") as reused_grammar:
+        assert reused_grammar in (grammar, other_grammar)
+
+
+def test_invalid_grammars(tmp_path):
+    """Test that invalid grammars are reported up front."""
+
+    grammars = {
+        "valid.gbnf": 'root ::= "a" | "b"',
+        "syntax.gbnf": 'root ::= ("a"',
+        "undefined.gbnf": "root ::= word",
+        "no_root.gbnf": 'word ::= "a"',
+    }
+    for name, text in grammars.items():
+        with open(os.path.join(tmp_path, name), "w", encoding="utf-8") as file:
+            file.write(text)
+
+    registry = GrammarRegistry(grammar_dir=str(tmp_path))
+    registry.validate("valid.gbnf")
+    with pytest.raises(RuntimeError, match="undefined rules: word"):
+        registry.validate("undefined.gbnf")
+    with pytest.raises(RuntimeError, match="not found"):
+        registry.validate("missing.gbnf")
+    with pytest.raises(RuntimeError) as error:
+        registry.validate_all()
+    message = str(error.value)
+    assert "syntax.gbnf" in message and "undefined.gbnf" in message and "no_root.gbnf" in message
+    assert "valid.gbnf cannot" not in message
+
+
+if __name__ == '__main__':
+    pytest.main([__file__])
@@ -12,13 +12,21 @@
 # See the License for the specific language governing permissions and
 # limitations under the License.
 
+import datetime as dt
+import json
 import os
+import time
 
 import pandas as pd
 import pytest
 from langchain import PromptTemplate
 
 from confirms.core.llm.llama_lang_chain_llm import LlamaLangChainLlm
+from confirms.core.results.result_record import ResultRecord
+from confirms.core.results.results_store import ResultsStore
+from confirms.core.schedule.interest_schedule_params import InterestScheduleParams
+from confirms.core.schedule.payment_frequency import PaymentFrequency
+from confirms.core.schema.schema_compiler import SchemaCompiler
 
 
 def test_smoke():
@@ -49,6 +57,7 @@ def test_function_completion():
         "payment frequency is 6M."
     )
 
+    schema = SchemaCompiler.instance().compile(InterestScheduleParams)
     llama_model_types = [
         "llama-2-7b-chat.Q4_K_M.gguf",
         "llama-2-13b-chat.Q4_K_M.gguf",
@@ -56,10 +65,10 @@ def test_function_completion():
     for model_type in llama_model_types:
         llm = LlamaLangChainLlm(model_type=model_type, temperature=0.0, grammar_file="payment_schedule_params.gbnf")
         prompt = PromptTemplate(template=template, input_variables=["context"])
-        answer = llm.completion(context, prompt=prompt).split(',')
-        assert answer[0].split('=')[1] == "2000-01-15"
-        assert answer[1].split('=')[1] == "2005-01-15"
-        assert answer[2].split('=')[1] == "6M"
+        params = schema.decode(llm.completion(context, prompt=prompt))
+        assert params.first_unadjusted_payment_date == dt.date(2000, 1, 15)
+        assert params.last_unadjusted_payment_date == dt.date(2005, 1, 15)
+        assert params.payment_frequency == PaymentFrequency.SIX_MONTHS
 
 
 def test_parameters_extraction():
@@ -102,27 +111,40 @@ def test_parameters_extraction():
     Helpful answer:[/INST]
     """
 
-    all_results = {}
+    experiment = "test_parameters_extraction"
+    store = ResultsStore()
     prompt = PromptTemplate(template=template, input_variables=["context"])
     llama_model_types = ["llama-2-7b-chat.Q4_K_M.gguf", "llama-2-13b-chat.Q4_K_M.gguf"]
     for model_type in llama_model_types:
-        results = []
-        for context in contexts:
+        for index, context in enumerate(contexts):
             llm = LlamaLangChainLlm(model_type=model_type, temperature=0.0, grammar_file="payment_schedule_params.gbnf")
-            answer_grammar = llm.completion(context, prompt=prompt).split(',')
-            current_dict = {
-                'context': context,
-                'first_unadjusted_payment_date': answer_grammar[0].split('=')[1],
-                'last_unadjusted_payment_date': answer_grammar[1].split('=')[1],
-                'payment_frequency': answer_grammar[2].split('=')[1],
-            }
-            results.append(pd.DataFrame([current_dict]))
-        all_results[model_type] = pd.concat(results)
+            started_at = dt.datetime.now(dt.timezone.utc)
+            start = time.perf_counter()
+            answer = llm.completion(context, prompt=prompt)
+            store.append(
+                ResultRecord(
+                    experiment=experiment,
+                    model_type=model_type,
+                    key=f"{model_type}|{index}",
+                    template=template,
+                    context_name=str(index),
+                    context=context,
+                    answer=answer,
+                    latency_sec=time.perf_counter() - start,
+                    started_at=started_at,
+                    generation_params=json.dumps(llm.get_generation_params(), sort_keys=True),
+                )
+            )
+    store.flush()
+
     outputs_dir = os.path.join(os.path.dirname(__file__), "../../../results")
     output_path = os.path.join(outputs_dir, "test_parameters_extraction.csv")
 
-    # TODO: Refactor saving of results
-    df = pd.concat(all_results).reset_index()
+    # Parameters are derived from the stored answers in name=value,... format
+    df = store.read(experiment, columns=["model_type", "context_name", "context", "answer"], latest=True)
+    df = df.assign(context_name=df["context_name"].astype(int)).sort_values(["model_type", "context_name"])
+    params = SchemaCompiler.instance().compile(InterestScheduleParams).decode_series(df["answer"])
+    df = pd.concat([df[["model_type", "context_name", "context"]], params], axis=1)
     df.to_csv(output_path, index=False)
 
 
@@ -0,0 +1,98 @@
+# Copyright (C) 2023-present The Project Contributors
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#    http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+import os
+
+import pytest
+
+from confirms.core.llm.llama_model_key import LlamaModelKey
+from confirms.core.llm.llama_model_pool import LlamaModelPool
+
+
+def create_model_file(dir_path: str, filename: str, size_bytes: int) -> str:
+    """Create stub model file of the specified size and return its path."""
+    model_path = os.path.join(dir_path, filename)
+    with open(model_path, "wb") as file:
+        file.truncate(size_bytes)
+    return model_path
+
+
+def test_smoke(tmp_path):
+    """Test that the same key is loaded once and shared."""
+
+    loaded = []
+    pool = LlamaModelPool()
+    key = LlamaModelKey(model_path=create_model_file(tmp_path, "a.gguf", 1024))
+
+    first = pool.acquire(key, loader=lambda k: loaded.append(k) or object())
+    second = pool.acquire(key, loader=lambda k: loaded.append(k) or object())
+    assert first is second
+    assert len(loaded) == 1
+
+    # Larger context size requires a separate copy of the model
+    other_key = LlamaModelKey(model_path=key.model_path, n_ctx=1024)
+    third = pool.acquire(other_key, loader=lambda k: loaded.append(k) or object())
+    assert third is not first
+    assert len(loaded) == 2
+
+
+def test_context_size(tmp_path):
+    """Test that a model loaded with a larger context size is shared and replaces unreferenced smaller copies."""
+
+    loaded = []
+    pool = LlamaModelPool()
+    small_key = LlamaModelKey(model_path=create_model_file(tmp_path, "a.gguf", 1024), n_gpu_layers=9999, n_ctx=512)
+    large_key = LlamaModelKey(model_path=small_key.model_path, n_gpu_layers=9999, n_ctx=1024)
+
+    small = pool.acquire(small_key, loader=lambda k: loaded.append(k) or object())
+    pool.release(small_key)
+    large = pool.acquire(large_key, loader=lambda k: loaded.append(k) or object())
+    assert large is not small
+    assert pool.get_loaded_keys() == [large_key]
+
+    # Smaller context size uses the loaded model and its key
+    assert pool.acquire(small_key, loader=lambda k: loaded.append(k) or object()) is large
+    assert pool.resolve(small_key) == large_key
+    assert loaded == [small_key, large_key]
+
+    # Other settings require a separate copy of the model
+    cpu_key = LlamaModelKey(model_path=small_key.model_path, n_ctx=512)
+    assert pool.resolve(cpu_key) == cpu_key
+    assert pool.acquire(cpu_key, loader=lambda k: loaded.append(k) or object()) is not large
+    assert pool.get_loaded_keys() == [large_key, cpu_key]
+
+
+def test_eviction(tmp_path):
+    """Test that only unreferenced models are evicted in least recently used order."""
+
+    pool = LlamaModelPool(ram_budget_gb=2.5 / 2**20)  # 2.5 KB
+    key_a = LlamaModelKey(model_path=create_model_file(tmp_path, "a.gguf", 1024))
+    key_b = LlamaModelKey(model_path=create_model_file(tmp_path, "b.gguf", 1024))
+    key_c = LlamaModelKey(model_path=create_model_file(tmp_path, "c.gguf", 1024))
+
+    pool.acquire(key_a, loader=lambda k: object())
+    pool.acquire(key_b, loader=lambda k: object())
+    pool.release(key_b)
+
+    # Model b is evicted because model a is still referenced
+    pool.acquire(key_c, loader=lambda k: object())
+    assert pool.get_loaded_keys() == [key_a, key_c]
+
+    # Budget is exceeded when all models are referenced
+    pool.acquire(key_b, loader=lambda k: object())
+    assert pool.get_loaded_keys() == [key_a, key_c, key_b]
+
+
+if __name__ == '__main__':
+    pytest.main([__file__])
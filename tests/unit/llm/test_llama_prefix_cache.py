@@ -0,0 +1,174 @@
+# Copyright (C) 2023-present The Project Contributors
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#    http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+import os
+import pickle
+import random
+from typing import Any, List
+
+import llama_cpp
+import numpy as np
+import pytest
+from langchain import LlamaCpp
+from llama_cpp import Llama, LlamaState
+
+from confirms.core.llm.completion_cache import CompletionCache
+from confirms.core.llm.llama_lang_chain_llm import LlamaLangChainLlm
+from confirms.core.llm.llama_model_key import LlamaModelKey
+from confirms.core.llm.llama_model_pool import LlamaModelPool
+from confirms.core.llm.llama_prefix_cache import LlamaPrefixCache
+
+
+def create_state(tokens: List[int]) -> LlamaState:
+    """Create stub state for the tokens with 100 bytes of model state."""
+    return LlamaState(
+        input_ids=np.array(tokens, dtype=np.intc),
+        scores=np.zeros((len(tokens), 1), dtype=np.single),
+        n_tokens=len(tokens),
+        llama_state=bytes(100),
+        llama_state_size=100,
+    )
+
+
+def test_smoke():
+    """Test lookup of the state with the longest shared prefix."""
+
+    cache = LlamaPrefixCache(1000)
+    cache[[1, 2, 3]] = create_state([1, 2, 3])
+    cache[[1, 2, 3, 4, 5]] = create_state([1, 2, 3, 4, 5])
+
+    assert cache[[1, 2, 3, 4, 6]].n_tokens == 5
+    assert cache[[1, 2, 7]].n_tokens in (3, 5)
+    with pytest.raises(KeyError):
+        cache[[9]]
+    assert (cache.hits, cache.misses) == (2, 1)
+
+
+def test_persistence(tmp_path):
+    """Test that states persisted on disk are found by a new cache instance and promoted to RAM."""
+
+    cache_dir = os.path.join(tmp_path, "prefix_cache")
+    cache = LlamaPrefixCache(1000, cache_dir=cache_dir)
+    cache[[1, 2, 3]] = create_state([1, 2, 3])
+    cache.disk_cache.close()
+
+    reopened_cache = LlamaPrefixCache(1000, cache_dir=cache_dir)
+    assert reopened_cache.cache_size == 0
+    assert reopened_cache[[1, 2, 3, 4]].n_tokens == 3
+    assert reopened_cache.cache_size == 100
+    reopened_cache.disk_cache.close()
+
+
+class SamplingClient:
+    """Stub llama.cpp model whose saved state includes the random number generator, and which restores
+    cached state at the start of a completion using the same rule as llama-cpp-python."""
+
+    def __init__(self, cache: LlamaPrefixCache):
+        self.cache = cache
+        self.ctx = self
+        self.rng = random.Random(0)
+        self._input_ids = np.array([], dtype=np.intc)
+
+    def tokenize(self, text: bytes) -> List[int]:
+        return [ord(char) for char in text.decode("utf-8")]
+
+    def token_bos(self) -> int:
+        return 1
+
+    def save_state(self) -> LlamaState:
+        state = pickle.dumps(self.rng.getstate())
+        return LlamaState(
+            input_ids=self._input_ids.copy(),
+            scores=np.zeros((len(self._input_ids), 1), dtype=np.single),
+            n_tokens=len(self._input_ids),
+            llama_state=state,
+            llama_state_size=len(state),
+        )
+
+    def load_state(self, state: LlamaState) -> None:
+        self._input_ids = state.input_ids.copy()
+        self.rng.setstate(pickle.loads(state.llama_state))
+
+    def __call__(self, prompt: str, **kwargs: Any) -> Any:
+        tokens = self.tokenize(prompt.encode("utf-8"))
+        try:
+            state = self.cache[tokens]
+            if Llama.longest_token_prefix(state.input_ids.tolist(), tokens) > Llama.longest_token_prefix(
+                self._input_ids.tolist(), tokens
+            ):
+                self.load_state(state)
+        except KeyError:
+            pass
+        self._input_ids = np.array(tokens, dtype=np.intc)
+        text = " ".join(str(self.rng.randint(0, 10**6)) for _ in range(3))
+        self.cache[tokens] = self.save_state()
+        result = {"choices": [{"text": text}]}
+        return iter([result]) if kwargs.get("stream") else result
+
+
+@pytest.fixture
+def pooled_client(tmp_path, monkeypatch):
+    """Stub model with prefix cache in the model pool, yields the client and its pool key."""
+
+    monkeypatch.setattr(llama_cpp, "llama_set_rng_seed", lambda ctx, seed: ctx.rng.seed(seed))
+    client = SamplingClient(LlamaPrefixCache(10**6))
+    key = LlamaModelKey(model_path=os.path.join(tmp_path, "stub.gguf"))
+    pool = LlamaModelPool.instance()
+    pool.acquire(key, loader=lambda k: client)
+    yield client, key
+    pool.release(key)
+
+
+def create_llm(client: SamplingClient, key: LlamaModelKey, **kwargs: Any) -> LlamaLangChainLlm:
+    """Seeded LLM that uses the pooled stub model without holding a reference to it."""
+
+    llm = LlamaLangChainLlm(model_type="stub.gguf", seed=1, n_ctx=512, **kwargs)
+    llm._llm = LlamaCpp.construct(client=client, model_path=key.model_path, stop=None, grammar=None)
+    llm._model_key = key
+    llm.unload_model = lambda: None
+    return llm
+
+
+def test_seed_with_prefix_cache(pooled_client):
+    """Test that the same seed gives the same answer when a cached state is restored between calls."""
+
+    llm = create_llm(*pooled_client)
+
+    # Prompt B is evaluated between the calls for prompt A, so the state for A is restored from cache
+    first = llm.completion("prompt A")
+    llm.completion("prompt B")
+    assert llm.completion("prompt A") == first
+
+
+def test_completion_cache_with_seed(tmp_path, pooled_client):
+    """Test that answers served from the completion cache for a seeded model match a fresh run."""
+
+    cache = CompletionCache(cache_path=os.path.join(tmp_path, "cache.sqlite"))
+    cached_llm = create_llm(*pooled_client, cache=cache)
+    assert cached_llm.is_deterministic()
+    cached_answer = cached_llm.completion("prompt A")
+    cached_llm.completion("prompt B")
+    assert cached_llm.completion("prompt A") == cached_answer
+    assert cache.hits == 1
+    cache.close()
+
+    # Fresh run without completion cache after other prompts restores prompt state from the prefix cache
+    llm = create_llm(*pooled_client)
+    llm.completion("prompt C")
+    llm.completion("prompt B")
+    assert llm.completion("prompt A") == cached_answer
+
+
+if __name__ == '__main__':
+    pytest.main([__file__])
@@ -0,0 +1,79 @@
+# Copyright (C) 2023-present The Project Contributors
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#    http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+import os
+
+import pytest
+
+from confirms.core.context.context_packer import ContextPacker
+from confirms.core.llm.llama_lang_chain_llm import LlamaLangChainLlm
+from confirms.core.llm.llama_preloader import LlamaPreloader
+from confirms.core.llm.preload_state import PreloadState
+
+
+def test_touch_pages(tmp_path):
+    """Test that every page of the file is read through the memory map."""
+
+    model_path = os.path.join(tmp_path, "a.gguf")
+    with open(model_path, "wb") as file:
+        file.write(os.urandom(3 * 4096 + 10))
+    assert LlamaPreloader.touch_pages(model_path) == 3 * 4096 + 10
+
+    empty_path = os.path.join(tmp_path, "empty.gguf")
+    open(empty_path, "wb").close()
+    assert LlamaPreloader.touch_pages(empty_path) == 0
+
+
+def test_smoke(tmp_path, monkeypatch):
+    """Test that models become hot after warm-up and failures are reported by the readiness probe."""
+
+    model_path = os.path.join(tmp_path, "llama-2-7b-chat.Q4_K_M.gguf")
+    with open(model_path, "wb") as file:
+        file.write(os.urandom(8192))
+
+    def get_model_path(llm: LlamaLangChainLlm) -> str:
+        if not llm.model_type.startswith("llama-2-7b"):
+            raise RuntimeError(f"Repo not specified for model type {llm.model_type}")
+        return model_path
+
+    warmed_up = []
+    monkeypatch.setattr(LlamaLangChainLlm, "get_model_path", get_model_path)
+    monkeypatch.setattr(LlamaLangChainLlm, "get_context_packer", lambda llm: ContextPacker(max_n_ctx=4096))
+    monkeypatch.setattr(
+        LlamaLangChainLlm, "completion", lambda llm, question: warmed_up.append((llm.model_type, llm.n_ctx))
+    )
+    monkeypatch.setattr(LlamaLangChainLlm, "unload_model", lambda llm: None)
+
+    preloader = LlamaPreloader(model_types=["llama-2-7b-chat.Q4_K_M.gguf"])
+    assert preloader.get_states() == {"llama-2-7b-chat.Q4_K_M.gguf": PreloadState.PENDING}
+    assert not preloader.is_ready()
+    preloader.start()
+    assert preloader.wait(timeout=10.0)
+    assert warmed_up == [("llama-2-7b-chat.Q4_K_M.gguf", 4096)]
+    assert preloader.get_states() == {"llama-2-7b-chat.Q4_K_M.gguf": PreloadState.HOT}
+
+    # Context size used by requests may be specified
+    LlamaPreloader(model_types=["llama-2-7b-chat.Q4_K_M.gguf"], n_ctx=1024)._preload("llama-2-7b-chat.Q4_K_M.gguf")
+    assert warmed_up[-1] == ("llama-2-7b-chat.Q4_K_M.gguf", 1024)
+
+    preloader = LlamaPreloader(model_types=["llama-2-7b-chat.Q4_K_M.gguf", "unknown.gguf"])
+    preloader.start()
+    assert not preloader.wait(timeout=10.0)
+    assert preloader.get_states()["unknown.gguf"] == PreloadState.FAILED
+    assert "Repo not specified" in preloader.get_errors()["unknown.gguf"]
+    preloader.close()
+
+
+if __name__ == '__main__':
+    pytest.main([__file__])
@@ -0,0 +1,68 @@
+# Copyright (C) 2023-present The Project Contributors
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#    http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+import openai
+import pytest
+
+from confirms.core.llm.rate_limit import RateLimit
+from confirms.core.llm.rate_limiter import RateLimiter
+
+
+def test_smoke():
+    """Test that requests wait once the token budget is exhausted."""
+
+    rate_limiter = RateLimiter()
+    rate_limiter.set_limit("gpt-4", RateLimit(tokens_per_minute=600.0))
+
+    # The bucket starts full, so the first request does not wait
+    assert rate_limiter.acquire("gpt-4", 600) == 0.0
+
+    # Refill rate is 10 tokens per second, so 2 tokens take about 0.2 seconds
+    wait_sec = rate_limiter.acquire("gpt-4", 2)
+    assert 0.1 < wait_sec <= 0.2
+
+    metrics = rate_limiter.get_metrics("gpt-4")
+    assert metrics.requests == 2
+    assert metrics.max_queue_depth == 1
+    assert metrics.queue_depth == 0
+    assert metrics.max_wait_sec == wait_sec
+
+    # Model types without budgets are not limited
+    assert rate_limiter.acquire("gpt-3.5-turbo", 10**6) == 0.0
+
+
+def test_backoff():
+    """Test retry with backoff when the API throttles requests."""
+
+    rate_limiter = RateLimiter(initial_backoff_sec=0.01, max_retries=2)
+    attempts = []
+
+    def throttled_twice():
+        attempts.append(1)
+        if len(attempts) <= 2:
+            raise openai.error.RateLimitError("Rate limit reached.")
+        return "answer"
+
+    assert rate_limiter.call("gpt-4", ["question"], throttled_twice) == "answer"
+    assert rate_limiter.get_metrics("gpt-4").throttled == 2
+
+    # Error is raised after max_retries
+    attempts.clear()
+    rate_limiter.max_retries = 1
+    with pytest.raises(openai.error.RateLimitError):
+        rate_limiter.call("gpt-4", ["question"], throttled_twice)
+
+
+if __name__ == '__main__':
+    pytest.main([__file__])
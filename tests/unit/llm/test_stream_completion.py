@@ -0,0 +1,110 @@
+# Copyright (C) 2023-present The Project Contributors
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#    http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+from dataclasses import dataclass, field
+from typing import Iterator, List, Optional
+
+import openai
+import pytest
+
+from confirms.core.instrumentation.llm_instrumentation import LlmInstrumentation
+from confirms.core.instrumentation.llm_span import LlmSpan
+from confirms.core.llm.gpt_native_llm import GptNativeLlm
+from confirms.core.llm.llm import Llm
+from confirms.core.stream.max_words_stop_predicate import MaxWordsStopPredicate
+from confirms.core.stream.regex_stop_predicate import RegexStopPredicate
+
+
+@dataclass
+class ChattyLlm(Llm):
+    """Stub LLM that streams a long answer one word at a time and records how many words it generated."""
+
+    generated_count: int = field(default=0)
+    closed: bool = field(default=False)
+
+    def load_model(self):
+        """Load model after fields have been set."""
+
+    def _completion(self, question: str, *, prompt: Optional[str] = None) -> str:
+        """Simple completion with optional prompt."""
+        return "".join(self._stream_completion(question, prompt=prompt))
+
+    def _stream_completion(self, question: str, *, prompt: Optional[str] = None) -> Iterator[str]:
+        """Answer words as they are generated."""
+        try:
+            for word in " Sure! Based on the information provided, the payment frequency is quarterly. It".split(" "):
+                self.generated_count += 1
+                yield word + " "
+        finally:
+            self.closed = True
+
+
+@dataclass
+class SpanCollector(LlmInstrumentation):
+    """Collects spans passed to the hook."""
+
+    spans: List[LlmSpan] = field(default_factory=list)
+
+    def on_span(self, span: LlmSpan) -> None:
+        self.spans.append(span)
+
+
+def test_smoke():
+    """Test that generation is cancelled as soon as a stop predicate accepts the streamed text."""
+
+    collector = SpanCollector()
+    llm = ChattyLlm(model_type="stub", instrumentation=[collector])
+    pieces = list(llm.stream_completion("question", stop=[RegexStopPredicate(r"\bquarterly\b")]))
+    assert "".join(pieces).strip().endswith("quarterly.")
+    assert llm.generated_count == len(pieces) < 13
+    assert llm.closed
+    assert collector.spans[0].operation == "stream_completion"
+    assert collector.spans[0].time_to_first_token_sec is not None
+
+    # Without predicates the entire answer is streamed
+    llm = ChattyLlm(model_type="stub")
+    assert "".join(llm.stream_completion("question")) == llm.completion("question")
+
+
+def test_closed_early():
+    """Test that the backend stream is closed when the consumer stops reading."""
+
+    llm = ChattyLlm(model_type="stub")
+    stream = llm.stream_completion("question")
+    next(stream)
+    stream.close()
+    assert llm.closed and llm.generated_count == 1
+
+
+def test_gpt_native(monkeypatch):
+    """Test that GPT native streams chunk deltas and stops reading the response after the first word."""
+
+    read_count = []
+
+    def create(*, model, messages, stream, **kwargs):
+        assert stream
+        for content in [None, "Quarter", "ly", "\n", "Explanation", ":"]:
+            read_count.append(1)
+            yield {"choices": [{"delta": {"content": content} if content is not None else {"role": "assistant"}}]}
+
+    monkeypatch.setattr(openai.ChatCompletion, "create", create)
+
+    llm = GptNativeLlm(model_type="gpt-4", temperature=0.0)
+    answer = "".join(llm.stream_completion("question", stop=[MaxWordsStopPredicate(max_words=1)]))
+    assert answer == "Quarterly\n"
+    assert len(read_count) == 4
+
+
+if __name__ == '__main__':
+    pytest.main([__file__])
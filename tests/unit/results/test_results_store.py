@@ -0,0 +1,92 @@
+# Copyright (C) 2023-present The Project Contributors
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#    http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+import datetime as dt
+import os
+
+import pandas as pd
+import pytest
+
+from confirms.core.results.result_record import ResultRecord
+from confirms.core.results.results_store import ResultsStore
+
+
+def _create_record(model_type: str, seed: int, answer: str, *, minute: int = 0) -> ResultRecord:
+    """Create record for the test experiment."""
+    return ResultRecord(
+        experiment="test",
+        model_type=model_type,
+        key=f"{model_type}|{seed}",
+        seed=seed,
+        answer=answer,
+        latency_sec=float(seed),
+        started_at=dt.datetime(2023, 10, 1, 12, minute, tzinfo=dt.timezone.utc),
+    )
+
+
+def test_smoke(tmp_path):
+    """Test append, partitioned read, summary and compaction."""
+
+    store = ResultsStore(root_dir=str(tmp_path), max_buffered_records=2)
+    for seed in range(1, 4):
+        store.append(_create_record("gpt-4", seed, f"gpt{seed}"))
+        store.append(_create_record("llama-2-7b-chat.Q4_K_M.gguf", seed, f"llama{seed}"))
+    store.append(ResultRecord(experiment="other", model_type="gpt-4", key="other", answer="other"))
+
+    # Records are written when the buffer is full, the rest after flush
+    assert len(store.read()) == 6
+    store.flush()
+    assert len(store.read()) == 7
+    assert os.path.isdir(os.path.join(tmp_path, "experiment=test", "model_type=gpt-4"))
+
+    df = store.read("test", model_types=["gpt-4"], columns=["seed", "answer"])
+    assert list(df.columns) == ["seed", "answer"]
+    assert sorted(df["answer"]) == ["gpt1", "gpt2", "gpt3"]
+
+    summary = store.get_summary("test")
+    assert list(summary["model_type"]) == ["gpt-4", "llama-2-7b-chat.Q4_K_M.gguf"]
+    assert list(summary["records"]) == [3, 3]
+    assert list(summary["errors"]) == [0, 0]
+    assert list(summary["mean_latency_sec"]) == [2.0, 2.0]
+
+    file_count = len(store.get_dataset().files)
+    store.compact("test")
+    assert len(store.get_dataset().files) < file_count
+    assert len(store.read("test")) == 6
+
+    store.delete("other")
+    assert store.read("other").empty
+
+
+def test_export_csv(tmp_path):
+    """Test CSV export of the most recent answers with one column per model type."""
+
+    store = ResultsStore(root_dir=str(tmp_path))
+    model_types = ["llama-2-7b-chat.Q4_K_M.gguf", "gpt-4"]
+    for seed in range(1, 3):
+        for model_type in model_types:
+            store.append(_create_record(model_type, seed, f"{model_type}:{seed}"))
+    store.append(_create_record("gpt-4", 1, "rerun", minute=5))
+    store.flush()
+
+    output_path = os.path.join(tmp_path, "export", "test.csv")
+    store.export_csv("test", output_path, model_types=model_types)
+    df = pd.read_csv(output_path)
+    assert list(df.columns) == model_types
+    assert list(df["gpt-4"]) == ["rerun", "gpt-4:2"]
+    assert list(df["llama-2-7b-chat.Q4_K_M.gguf"]) == ["llama-2-7b-chat.Q4_K_M.gguf:1", "llama-2-7b-chat.Q4_K_M.gguf:2"]
+
+
+if __name__ == '__main__':
+    pytest.main([__file__])
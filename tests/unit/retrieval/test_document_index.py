@@ -0,0 +1,129 @@
+# Copyright (C) 2023-present The Project Contributors
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#    http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+import zlib
+from dataclasses import dataclass, field
+from typing import List
+
+import numpy as np
+import pytest
+from langchain.schema import Document
+
+from confirms.core.embedding.embedding_model import EmbeddingModel
+from confirms.core.retrieval.document_index import DocumentIndex
+from confirms.core.retrieval.vector_index_params import VectorIndexParams
+from confirms.core.retrieval.vector_index_type import VectorIndexType
+
+
+@dataclass
+class _BagOfWordsModel(EmbeddingModel):
+    """Embeds text as normalized counts of hashed words and counts embedded texts."""
+
+    embedded_count: int = field(default=0)
+
+    def embed_documents(self, texts: List[str]) -> np.ndarray:
+        self.embedded_count += len(texts)
+        return np.stack([self.embed_query(text) for text in texts])
+
+    def embed_query(self, text: str) -> np.ndarray:
+        vector = np.zeros(1024, dtype=np.float32)
+        for word in text.lower().split():
+            vector[zlib.crc32(word.strip(".,:").encode()) % 1024] += 1.0
+        return vector / max(1.0, float(np.linalg.norm(vector)))
+
+
+def _get_pages(maturity: str) -> List[Document]:
+    """Pages of a sample confirmation with the specified maturity date."""
+
+    return [
+        Document(page_content="Trade Date: 1 July 2009. Issue Date: 9 July 2009.", metadata={"page": 0}),
+        Document(page_content=f"Maturity Date: {maturity}. Business Days: London and New York.", metadata={"page": 1}),
+    ]
+
+
+def test_smoke(tmp_path):
+    """Test that documents are embedded once and the index is searched after reopening."""
+
+    model = _BagOfWordsModel(embedding_model_id="bag-of-words")
+    index = DocumentIndex(index_dir=str(tmp_path), embedding_model=model, chunk_size=100, chunk_overlap=0)
+    assert index.ingest_documents(_get_pages("9 July 2013"), source="a.pdf") == 2
+    assert index.ingest_documents(_get_pages("27 December 2023"), source="b.pdf") == 2
+    assert index.ingest_documents(_get_pages("9 July 2013"), source="a.pdf") == 0
+    assert model.embedded_count == 4
+
+    # Reopened index is memory-mapped and does not embed documents again
+    index = DocumentIndex(index_dir=str(tmp_path), embedding_model=model, chunk_size=100, chunk_overlap=0)
+    assert index.get_size() == 4
+    results = index.search("Maturity Date:", top_k=2)
+    assert [chunk.page for chunk, _ in results] == [1, 1]
+    assert results[0][1] <= results[1][1]
+
+    chunk, _ = index.search("Maturity Date:", top_k=1, source="b.pdf")[0]
+    assert chunk.source == "b.pdf" and "27 December 2023" in chunk.text
+    assert len(index.search_many(["Maturity Date:", "Issue Date:"], top_k=3, source="a.pdf")[1]) == 2
+    assert model.embedded_count == 4
+
+    # Changed document replaces its previous chunks
+    assert index.ingest_documents(_get_pages("9 July 2014"), source="a.pdf") == 2
+    assert index.get_size() == 4
+    chunk, _ = index.search("Maturity Date:", top_k=1, source="a.pdf")[0]
+    assert "9 July 2014" in chunk.text
+
+
+def test_model_mismatch(tmp_path):
+    """Test that an index cannot be opened with a different embedding model."""
+
+    model = _BagOfWordsModel(embedding_model_id="bag-of-words")
+    index = DocumentIndex(index_dir=str(tmp_path), embedding_model=model)
+    index.ingest_documents(_get_pages("9 July 2013"), source="a")
+    with pytest.raises(RuntimeError, match="cannot be searched"):
+        DocumentIndex(index_dir=str(tmp_path), embedding_model=_BagOfWordsModel(embedding_model_id="other"))
+
+
+def test_index_types(tmp_path):
+    """Test that vectors are staged until the index can be trained and HNSW chunks are replaced by copying."""
+
+    model = _BagOfWordsModel(embedding_model_id="bag-of-words")
+    sq8_params = VectorIndexParams(index_type=VectorIndexType.SQ8, min_train_size=4)
+    index = DocumentIndex(index_dir=str(tmp_path), embedding_model=model, chunk_size=100, index_params=sq8_params)
+    index.ingest_documents(_get_pages("9 July 2013"), source="a.pdf")
+    assert not index._is_built
+    index.ingest_documents(_get_pages("27 December 2023"), source="b.pdf")
+    assert index._is_built
+
+    # Stored parameters are used if not specified, and only search parameters may differ
+    index = DocumentIndex(index_dir=str(tmp_path), embedding_model=model, chunk_size=100)
+    assert index.index_params == sq8_params
+    chunk, _ = index.search("Maturity Date:", top_k=1, source="b.pdf")[0]
+    assert "27 December 2023" in chunk.text
+    with pytest.raises(RuntimeError, match="use rebuild"):
+        DocumentIndex(index_dir=str(tmp_path), embedding_model=model, chunk_size=100, index_params=VectorIndexParams())
+
+    hnsw_params = VectorIndexParams(index_type=VectorIndexType.HNSW, hnsw_m=8)
+    index.rebuild(hnsw_params)
+    index = DocumentIndex(
+        index_dir=str(tmp_path),
+        embedding_model=model,
+        chunk_size=100,
+        index_params=VectorIndexParams(index_type=VectorIndexType.HNSW, hnsw_m=8, ef_search=16),
+    )
+    assert index.ingest_documents(_get_pages("9 July 2014"), source="a.pdf") == 2
+    assert index.get_size() == 4
+    chunk, _ = index.search("Maturity Date:", top_k=1, source="a.pdf")[0]
+    assert "9 July 2014" in chunk.text
+    assert model.embedded_count == 6
+
+
+if __name__ == '__main__':
+    pytest.main([__file__])
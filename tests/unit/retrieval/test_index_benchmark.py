@@ -0,0 +1,47 @@
+# Copyright (C) 2023-present The Project Contributors
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#    http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+import numpy as np
+import pytest
+
+from confirms.core.retrieval.index_benchmark import IndexBenchmark
+from confirms.core.retrieval.vector_index_params import VectorIndexParams
+from confirms.core.retrieval.vector_index_type import VectorIndexType
+
+
+def test_smoke():
+    """Test that exact search has full recall and each index type is reported."""
+
+    rng = np.random.default_rng(0)
+    vectors = rng.standard_normal((2000, 32)).astype(np.float32)
+    queries = rng.standard_normal((20, 32)).astype(np.float32)
+    params_list = [
+        VectorIndexParams(),
+        VectorIndexParams(index_type=VectorIndexType.HNSW, ef_search=128),
+        VectorIndexParams(index_type=VectorIndexType.IVF_PQ, nlist=16, nprobe=16, pq_bits=4),
+        VectorIndexParams(index_type=VectorIndexType.SQ8),
+    ]
+    df = IndexBenchmark(top_k=5).run(vectors, queries, params_list)
+
+    assert list(df["index_type"]) == ["flat", "hnsw", "ivf_pq", "sq8"]
+    recall = df.set_index("index_type")["recall_at_5"]
+    assert recall["flat"] == 1.0
+    assert recall["hnsw"] > 0.9
+    assert recall["sq8"] > 0.9
+    assert (df["p50_ms"] <= df["p99_ms"]).all()
+    assert df.set_index("index_type")["index_bytes"]["ivf_pq"] < df.set_index("index_type")["index_bytes"]["flat"]
+
+
+if __name__ == '__main__':
+    pytest.main([__file__])
@@ -0,0 +1,97 @@
+# Copyright (C) 2023-present The Project Contributors
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#    http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+import datetime as dt
+import sys
+
+import numpy as np
+import pyarrow as pa
+import pytest
+
+from confirms.core.schedule.date_column_view import DateColumnView
+from confirms.core.schedule.interest_schedule import InterestSchedule
+from confirms.core.schedule.payment_schedule import PaymentSchedule
+from confirms.core.schedule.schedule_batch import ScheduleBatch
+from confirms.core.schedule.schedule_generator import ScheduleGenerator
+
+
+def _generate_batch(trade_count: int) -> ScheduleBatch:
+    """Generate batch of 10Y quarterly schedules."""
+
+    first = np.datetime64("2020-01-15") + np.arange(trade_count) % 365
+    return ScheduleGenerator().generate(first, first.astype("datetime64[M]") + 120, "3M")
+
+
+def test_smoke():
+    """Test views of the batch columns."""
+
+    batch = _generate_batch(10)
+    view = batch.get_view(3)
+    assert isinstance(view.payment_date, DateColumnView)
+    assert np.shares_memory(view.payment_date.days, batch.payment_date)
+    assert view.unadj_end[0] == dt.date(2020, 1, 18)
+    assert view.unadj_end[-1] == dt.date(2030, 1, 1)
+    assert view.adj_end[1:3] == [dt.date(2020, 4, 1), dt.date(2020, 7, 1)]
+    assert view.to_schedule() == batch.get_schedule(3)
+    assert list(view.adj_start) == view.to_schedule().adj_start
+
+
+def test_from_schedules():
+    """Test packing list-based schedules into columns."""
+
+    schedules = [
+        PaymentSchedule(payment_date=[dt.date(2020, 1, 1), dt.date(2020, 7, 1)]),
+        PaymentSchedule(payment_date=[dt.date(2021, 1, 1)]),
+    ]
+    batch = ScheduleBatch.from_schedules(schedules)
+    assert list(batch.offsets) == [0, 2, 3]
+    assert batch.unadj_start is None
+    assert batch.get_schedules() == schedules
+
+    interest_schedules = _generate_batch(5).get_schedules()
+    assert all(isinstance(schedule, InterestSchedule) for schedule in interest_schedules)
+    assert ScheduleBatch.from_schedules(interest_schedules).get_schedules() == interest_schedules
+
+
+def test_arrow():
+    """Test round trip through Arrow table without copying dates."""
+
+    batch = _generate_batch(100)
+    table = batch.to_arrow()
+    assert table.num_rows == 100
+    assert table.schema.field("adj_end").type == pa.list_(pa.date32())
+    assert table.column("payment_date")[7].as_py() == batch.get_schedule(7).payment_date
+
+    restored = ScheduleBatch.from_arrow(table)
+    assert np.shares_memory(restored.adj_start, batch.adj_start)
+    assert restored.get_schedules() == batch.get_schedules()
+
+    # Slices of the table have nonzero first offset
+    assert ScheduleBatch.from_arrow(table.slice(10, 5)).get_schedules() == batch.get_schedules()[10:15]
+
+
+def test_memory():
+    """Test that columns use at least ten times less memory than lists of dates."""
+
+    batch = _generate_batch(1000)
+    schedules = batch.get_schedules()
+    list_bytes = 0
+    for schedule in schedules:
+        for values in vars(schedule).values():
+            list_bytes += sys.getsizeof(values) + sum(sys.getsizeof(value) for value in values)
+    assert list_bytes > 10 * batch.get_nbytes()
+
+
+if __name__ == '__main__':
+    pytest.main([__file__])
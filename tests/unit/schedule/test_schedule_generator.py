@@ -0,0 +1,96 @@
+# Copyright (C) 2023-present The Project Contributors
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#    http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+import datetime as dt
+
+import numpy as np
+import pytest
+
+from confirms.core.calendar.business_calendar import BusinessCalendar
+from confirms.core.calendar.business_day_convention import BusinessDayConvention
+from confirms.core.schedule.schedule_generator import ScheduleGenerator
+
+
+def test_smoke():
+    """Test regular schedule for a single trade."""
+
+    schedule = ScheduleGenerator().generate_one("2000-01-15", "2005-01-15", "6M")
+    assert len(schedule.payment_date) == 11
+    assert schedule.unadj_end[:3] == [dt.date(2000, 1, 15), dt.date(2000, 7, 15), dt.date(2001, 1, 15)]
+    assert schedule.unadj_start[:2] == [dt.date(1999, 7, 15), dt.date(2000, 1, 15)]
+    assert schedule.unadj_end[-1] == dt.date(2005, 1, 15)
+
+    # 15 July 2000 is Saturday, 15 January 2005 is Saturday
+    assert schedule.adj_end[1] == dt.date(2000, 7, 17)
+    assert schedule.adj_end[-1] == dt.date(2005, 1, 17)
+    assert schedule.adj_start[2] == dt.date(2000, 7, 17)
+    assert schedule.payment_date == schedule.adj_end
+
+
+def test_stub_and_month_end():
+    """Test short front stub and roll day capped at month end."""
+
+    schedule = ScheduleGenerator().generate_one("2000-02-10", "2001-01-31", "3M")
+    assert schedule.unadj_end == [
+        dt.date(2000, 2, 10),
+        dt.date(2000, 4, 30),
+        dt.date(2000, 7, 31),
+        dt.date(2000, 10, 31),
+        dt.date(2001, 1, 31),
+    ]
+    # 30 April 2000 is Sunday and the following business day is in the next month
+    assert schedule.adj_end[1] == dt.date(2000, 4, 28)
+
+
+def test_holidays():
+    """Test that adjusted dates skip holidays."""
+
+    calendar = BusinessCalendar(name="Test", holidays=[dt.date(2024, 1, 18)])
+    generator = ScheduleGenerator(calendar=calendar, business_day_convention=BusinessDayConvention.FOLLOWING)
+    schedule = generator.generate_one("2023-10-18", "2024-04-18", "3M")
+    assert schedule.adj_end == [dt.date(2023, 10, 18), dt.date(2024, 1, 19), dt.date(2024, 4, 18)]
+
+
+def test_batch():
+    """Test that batch generation matches single trade generation."""
+
+    generator = ScheduleGenerator()
+    rng = np.random.default_rng(0)
+    first = np.datetime64("2020-01-01") + rng.integers(0, 1000, 200)
+    last = first + rng.integers(0, 3650, 200)
+    frequency = rng.choice(["1M", "3M", "6M", "12M", "1Y"], 200)
+
+    batch = generator.generate(first, last, frequency)
+    assert len(batch) == 200
+    assert np.all(batch.unadj_start < batch.unadj_end)
+    assert np.all(batch.get_trade_index()[batch.offsets[:-1]] == np.arange(200))
+    for trade_index in [0, 57, 199]:
+        single = generator.generate_one(first[trade_index], last[trade_index], frequency[trade_index])
+        assert batch.get_schedule(trade_index) == single
+        assert single.unadj_end[0] == first[trade_index].tolist()
+        assert single.unadj_end[-1] == last[trade_index].tolist()
+
+
+def test_invalid_input():
+    """Test errors for invalid frequency and date order."""
+
+    generator = ScheduleGenerator()
+    with pytest.raises(RuntimeError):
+        generator.generate_one("2000-01-15", "2005-01-15", "6W")
+    with pytest.raises(RuntimeError):
+        generator.generate_one("2005-01-15", "2000-01-15", "6M")
+
+
+if __name__ == '__main__':
+    pytest.main([__file__])
@@ -0,0 +1,143 @@
+# Copyright (C) 2023-present The Project Contributors
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#    http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+import datetime as dt
+import os
+from dataclasses import dataclass, field
+from pathlib import Path
+
+import pandas as pd
+import pytest
+
+from confirms.core.llm.grammar_registry import GrammarRegistry
+from confirms.core.schedule.interest_schedule_params import InterestScheduleParams
+from confirms.core.schedule.payment_frequency import PaymentFrequency
+from confirms.core.schedule.schedule_generator import ScheduleGenerator
+from confirms.core.schema.schema_compiler import SchemaCompiler
+
+
+@dataclass
+class _SampleParams:
+    """Sample parameters."""
+
+    notional: float = field(default=None)
+    """Notional amount."""
+
+    count: int = field(default=None)
+    """Number of periods."""
+
+    is_fixed: bool = field(default=None)
+    """True if the rate is fixed."""
+
+    currency: str = field(default=None)
+
+
+def test_smoke():
+    """Test that grammar file and function schema in the project match the compiled schema."""
+
+    compiler = SchemaCompiler.instance()
+    schema = compiler.compile(InterestScheduleParams)
+    assert compiler.compile(InterestScheduleParams) is schema
+
+    grammar_path = os.path.join(Path(os.path.dirname(__file__)).parent.parent.parent, "grammar")
+    with open(os.path.join(grammar_path, "payment_schedule_params.gbnf"), "r", encoding="utf-8") as file:
+        assert file.read() == schema.grammar
+
+    assert schema.function_schema["name"] == "interest_schedule_params"
+    parameters = schema.function_schema["parameters"]
+    assert parameters["required"] == [
+        "first_unadjusted_payment_date",
+        "last_unadjusted_payment_date",
+        "payment_frequency",
+    ]
+    assert parameters["properties"]["payment_frequency"]["enum"] == ["1M", "3M", "6M", "12M"]
+    assert parameters["properties"]["first_unadjusted_payment_date"] == {
+        "type": "string",
+        "description": "First unadjusted payment date using ISO 8601 date format yyyy-mm-dd.",
+    }
+
+
+def test_decode():
+    """Test decoding model output and function call arguments into the dataclass."""
+
+    schema = SchemaCompiler.instance().compile(InterestScheduleParams)
+    params = schema.decode(
+        "first_unadjusted_payment_date=2000-01-15,last_unadjusted_payment_date=2005-01-15,payment_frequency=12M\n"
+    )
+    assert params == InterestScheduleParams(
+        first_unadjusted_payment_date=dt.date(2000, 1, 15),
+        last_unadjusted_payment_date=dt.date(2005, 1, 15),
+        payment_frequency=PaymentFrequency.TWELVE_MONTHS,
+    )
+    assert len(ScheduleGenerator().generate_from_params(params).payment_date) == 6
+
+    arguments = {
+        "first_unadjusted_payment_date": "2000-01-15",
+        "last_unadjusted_payment_date": "2005-01-15",
+        "payment_frequency": "12M",
+    }
+    assert schema.decode_arguments(arguments) == params
+
+    with pytest.raises(RuntimeError, match="does not match"):
+        schema.decode("first_unadjusted_payment_date=2000-01-15,payment_frequency=6M")
+    with pytest.raises(RuntimeError, match="invalid value 2000-13-15"):
+        schema.decode(
+            "first_unadjusted_payment_date=2000-13-15,last_unadjusted_payment_date=2005-01-15,payment_frequency=6M"
+        )
+    with pytest.raises(RuntimeError, match="invalid value 2M"):
+        schema.decode_arguments(dict(arguments, payment_frequency="2M"))
+    with pytest.raises(RuntimeError, match="missing"):
+        schema.decode_arguments({"payment_frequency": "6M"})
+
+
+def test_decode_series():
+    """Test decoding many outputs at once."""
+
+    schema = SchemaCompiler.instance().compile(InterestScheduleParams)
+    outputs = pd.Series(
+        [
+            "first_unadjusted_payment_date=2023-10-18,last_unadjusted_payment_date=2033-07-18,payment_frequency=3M",
+            "not an answer",
+        ]
+    )
+    df = schema.decode_series(outputs)
+    assert list(df.columns) == ["first_unadjusted_payment_date", "last_unadjusted_payment_date", "payment_frequency"]
+    assert df["first_unadjusted_payment_date"].iloc[0] == pd.Timestamp(2023, 10, 18)
+    assert df["payment_frequency"].iloc[0] == "3M"
+    assert df.iloc[1].isna().all()
+
+
+def test_scalar_types():
+    """Test grammar, schema and decoder for scalar field types."""
+
+    schema = SchemaCompiler().compile(_SampleParams, function_name="get_sample")
+    assert schema.function_schema["description"] == "Sample parameters."
+    properties = schema.function_schema["parameters"]["properties"]
+    assert [properties[name]["type"] for name in properties] == ["number", "integer", "boolean", "string"]
+    assert properties["currency"]["description"] == "currency"
+
+    params = schema.decode("notional=1000.5,count=-3,is_fixed=true,currency=USD")
+    assert params == _SampleParams(notional=1000.5, count=-3, is_fixed=True, currency="USD")
+
+    registry = GrammarRegistry()
+    registry.register("get_sample.gbnf", schema.grammar)
+    with registry.acquire("get_sample.gbnf") as grammar:
+        assert grammar is not None
+
+    with pytest.raises(RuntimeError, match="can only be compiled for a dataclass"):
+        SchemaCompiler().compile(str)
+
+
+if __name__ == '__main__':
+    pytest.main([__file__])
@@ -0,0 +1,56 @@
+# Copyright (C) 2023-present The Project Contributors
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#    http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+import pytest
+
+from confirms.core.schedule.interest_schedule_params import InterestScheduleParams
+from confirms.core.schema.schema_compiler import SchemaCompiler
+from confirms.core.stream.max_words_stop_predicate import MaxWordsStopPredicate
+from confirms.core.stream.regex_stop_predicate import RegexStopPredicate
+from confirms.core.stream.schema_stop_predicate import SchemaStopPredicate
+
+
+def test_regex():
+    """Test that a word split across tokens is matched only once it is complete."""
+
+    predicate = RegexStopPredicate(r"\b(monthly|quarterly|semi-annual|annual)\b")
+    assert not predicate.is_stopped("Sure! The payment frequency is month")
+    assert not predicate.is_stopped("Sure! The payment frequency is monthly")
+    assert predicate.is_stopped("Sure! The payment frequency is monthly.")
+    assert RegexStopPredicate(r"\bQuarterly\b", is_final_match=True).is_stopped("quarterly")
+
+
+def test_max_words():
+    """Test that a word is counted once it is followed by whitespace."""
+
+    predicate = MaxWordsStopPredicate(max_words=1)
+    assert not predicate.is_stopped(" ")
+    assert not predicate.is_stopped(" Quar")
+    assert predicate.is_stopped(" Quarterly\n")
+    assert predicate.is_stopped(" Quarterly payments")
+
+
+def test_schema():
+    """Test that output is accepted once every field has a complete value."""
+
+    predicate = SchemaStopPredicate(SchemaCompiler.instance().compile(InterestScheduleParams))
+    output = (
+        "first_unadjusted_payment_date=2023-10-18,last_unadjusted_payment_date=2033-07-18,payment_frequency=3M"
+    )
+    assert not predicate.is_stopped(output[:-1])
+    assert predicate.is_stopped(output)
+
+
+if __name__ == '__main__':
+    pytest.main([__file__])
@@ -0,0 +1,63 @@
+# Copyright (C) 2023-present The Project Contributors
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#    http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+import openai
+import pytest
+
+from confirms.core.llm.gpt_native_llm import GptNativeLlm
+from confirms.core.settings import Settings
+
+
+def test_smoke(monkeypatch, restore_settings):
+    """Test that process-wide settings are loaded once and reloaded on request."""
+
+    monkeypatch.setenv("CONFIRMS_GPU_RAM_GB", "8")
+    settings = Settings.reload()
+    assert settings.gpu_ram_gb == 8
+
+    monkeypatch.setenv("CONFIRMS_GPU_RAM_GB", "16")
+    assert Settings.instance() is settings
+    assert Settings.load() is settings
+    assert Settings.instance().gpu_ram_gb == 8
+
+    assert Settings.reload().gpu_ram_gb == 16
+    assert Settings.instance() is not settings
+
+    monkeypatch.delenv("CONFIRMS_GPU_RAM_GB")
+    assert Settings.reload().gpu_ram_gb == 0
+
+
+def test_api_key_per_model(monkeypatch):
+    """Test that each model passes the OpenAI key from its own settings."""
+
+    api_keys = []
+
+    def create(*, model, messages, api_key, **kwargs):
+        api_keys.append(api_key)
+        return {"choices": [{"message": {"content": "answer"}}]}
+
+    monkeypatch.setattr(openai.ChatCompletion, "create", create)
+
+    first_settings = Settings()
+    first_settings.openai_api_key = "first-key"
+    second_settings = Settings()
+    second_settings.openai_api_key = "second-key"
+
+    GptNativeLlm(model_type="gpt-4", settings=first_settings).completion("question")
+    GptNativeLlm(model_type="gpt-4", settings=second_settings).completion("question")
+    assert api_keys == ["first-key", "second-key"]
+
+
+if __name__ == '__main__':
+    pytest.main([__file__])
@@ -0,0 +1,99 @@
+# Copyright (C) 2023-present The Project Contributors
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#    http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+from collections import Counter
+from dataclasses import dataclass, field
+from typing import List, Optional
+
+import pytest
+
+from confirms.core.extraction.frequency_extractor import FrequencyExtractor
+from confirms.core.llm.llm import Llm
+from confirms.core.vote.vote_params import VoteParams, normalize_answer
+from confirms.core.vote.vote_result import VoteResult
+
+
+@dataclass
+class ScriptedLlm(Llm):
+    """Stub LLM that returns scripted answers in order and records sample indices."""
+
+    script: List[str] = field(default_factory=list)
+    sample_indices: List[int] = field(default_factory=list)
+
+    def load_model(self):
+        """Load model after fields have been set."""
+
+    def _completion(self, question: str, *, prompt: Optional[str] = None) -> str:
+        """Simple completion with optional prompt."""
+        return self.script[len(self.sample_indices) - 1]
+
+    def _sample_completion(self, question: str, *, prompt: Optional[str] = None, sample_index: int) -> str:
+        """Completion for the sample with the specified index."""
+        self.sample_indices.append(sample_index)
+        return super()._sample_completion(question, prompt=prompt, sample_index=sample_index)
+
+
+def test_confidence():
+    """Test posterior probability that the leader is more likely than the runner-up."""
+
+    assert VoteResult.get_confidence(Counter()) == 0.0
+    assert VoteResult.get_confidence(Counter(a=1, b=1)) == 0.5
+    assert VoteResult.get_confidence(Counter(a=4)) == 1.0 - 1.0 / 32
+    assert VoteResult.get_confidence(Counter(a=8, b=2)) > VoteResult.get_confidence(Counter(a=4, b=1))
+    assert normalize_answer("  Two sisters.\n") == "two sisters"
+    assert normalize_answer(" ...") is None
+
+
+def test_smoke():
+    """Test that sampling stops early for unanimous answers and continues for split answers."""
+
+    llm = ScriptedLlm(model_type="stub", script=["Quarterly."] * 25)
+    result = llm.vote_completion("question")
+    assert result.answer == "quarterly" and result.is_decided
+    assert result.sample_count == 4 and llm.sample_indices == list(range(4))
+
+    llm = ScriptedLlm(model_type="stub", script=["monthly", "quarterly"] * 3)
+    result = llm.vote_completion("question", params=VoteParams(max_samples=6))
+    assert result.sample_count == 6 and not result.is_decided
+    assert result.votes == Counter(monthly=3, quarterly=3)
+
+
+def test_sally_riddle():
+    """Test that a split vote on the Sally riddle keeps sampling until the leading answer is decided."""
+
+    llm = ScriptedLlm(model_type="stub", script=["One.", "2", "One.", "One.", "One.", "One.", "2"] + ["One."] * 18)
+    result = llm.vote_completion("How many sisters does Sally have?", params=VoteParams(max_samples=25))
+    assert result.is_decided and result.answer == "one"
+    assert result.sample_count == 10 and llm.sample_indices == list(range(10))
+    assert result.votes == Counter({"one": 8, "2": 2})
+
+
+def test_extractor():
+    """Test that chatty answers vote for canonical values and answers without a value do not vote."""
+
+    script = ["Sure! The payment frequency is quarterly.", "I cannot tell.", "3M", "Payments are made quarterly", "x"]
+    llm = ScriptedLlm(model_type="stub", script=script)
+    params = VoteParams(max_samples=5, min_samples=1, normalize=FrequencyExtractor().extract)
+    result = llm.vote_completion("question", params=params)
+    assert result.answer == "3M" and result.votes == Counter({"3M": 3})
+    assert result.answers == script[:4]
+
+    # Leader that cannot be overtaken by the remaining samples is decided without high confidence
+    llm = ScriptedLlm(model_type="stub", script=["a", "a", "b"])
+    result = llm.vote_completion("question", params=VoteParams(max_samples=3, min_samples=2, confidence=0.999))
+    assert result.is_decided and result.sample_count == 2
+
+
+if __name__ == '__main__':
+    pytest.main([__file__])